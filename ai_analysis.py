@@ -1,188 +1,480 @@
 import google.generativeai as genai
+import hashlib
 import json
 import os
-from typing import Dict, List, Any
+import sqlite3
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, Iterator, List, Any, Optional
 import traceback
 from dotenv import load_dotenv
 
+from audit_prompt import AuditPromptBuilder, estimate_tokens
+
 # 환경변수 로드
 load_dotenv()
 
-# Gemini API 설정
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
-genai.configure(api_key=GEMINI_API_KEY)
+DEFAULT_MODEL_NAME = 'gemini-1.5-flash'
+
+_gemini_configured = False
+
+
+def create_gemini_model(model_name: str = DEFAULT_MODEL_NAME):
+    """
+    Gemini 모델 객체를 생성합니다.
+    API 키는 실제 모델을 처음 만들 때 확인하므로, 가짜 모델만 쓰는 경우에는 필요하지 않습니다.
+    """
+    global _gemini_configured
+    if not _gemini_configured:
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
+        genai.configure(api_key=api_key)
+        _gemini_configured = True
+    return genai.GenerativeModel(model_name)
+
+
+def token_usage(prompt: str, response_text: str, usage_metadata=None) -> Dict:
+    """
+    모델 호출의 토큰 사용량을 반환합니다.
+    응답에 usage_metadata가 있으면 그 값을, 없으면 근사치를 사용합니다.
+    """
+    prompt_tokens = getattr(usage_metadata, 'prompt_token_count', None)
+    output_tokens = getattr(usage_metadata, 'candidates_token_count', None)
+    return {
+        'prompt_tokens': prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt),
+        'output_tokens': output_tokens if output_tokens is not None else estimate_tokens(response_text),
+        'estimated': prompt_tokens is None or output_tokens is None
+    }
+
+
+class AnalysisCache:
+    """
+    AI 분석 결과를 로컬 디스크(SQLite)에 저장하는 캐시 클래스
+
+    키는 모델 이름과 생성된 프롬프트의 해시이므로, 같은 회사·연도·보고서라도 입력
+    재무데이터나 프롬프트가 바뀌면 새로 분석합니다. 같은 파일을 모든 워커가 공유합니다.
+    """
+
+    DEFAULT_TTL = 7 * 24 * 3600
+
+    def __init__(self, db_path: str = os.path.join('cache', 'ai_analyses.db'), ttl: int = DEFAULT_TTL):
+        self.db_path = db_path
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.refreshes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        cache_dir = os.path.dirname(db_path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+
+        conn = self._get_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS analyses (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_analyses_expires_at ON analyses(expires_at)')
+        conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """스레드/프로세스별 SQLite 연결을 반환합니다. (fork 이후에는 새로 연결)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        """모델 이름과 프롬프트로 캐시 키를 생성합니다."""
+        return hashlib.sha256(f"{model_name}\0{prompt}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        캐시된 분석 결과를 반환합니다. 없거나 만료된 경우 None을 반환합니다.
+
+        Returns:
+            {'analysis', 'raw_response', 'created_at'} 또는 None
+        """
+        now = time.time()
+        try:
+            conn = self._get_connection()
+            row = conn.execute(
+                'SELECT payload, created_at, expires_at FROM analyses WHERE cache_key = ?', (key,)
+            ).fetchone()
+
+            if row is None or row[2] < now:
+                if row is not None:
+                    conn.execute('DELETE FROM analyses WHERE cache_key = ?', (key,))
+                    conn.commit()
+                with self._lock:
+                    self.misses += 1
+                return None
+
+            # 적중 시에는 쓰기 없이 읽기만 함 (적중 수는 self.hits로 메모리에서 집계)
+            data = json.loads(zlib.decompress(row[0]).decode('utf-8'))
+            data['created_at'] = row[1]
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            print(f"분석 캐시 조회 오류: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def set(self, key: str, model_name: str, analysis: Dict, raw_response: str):
+        """분석 결과를 압축하여 저장하고 만료된 항목을 정리합니다."""
+        payload = zlib.compress(json.dumps({'analysis': analysis, 'raw_response': raw_response},
+                                           ensure_ascii=False).encode('utf-8'), 6)
+        now = time.time()
+        try:
+            conn = self._get_connection()
+            conn.execute('''
+                INSERT OR REPLACE INTO analyses (cache_key, model, payload, size, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (key, model_name, payload, len(payload), now, now + self.ttl))
+            conn.execute('DELETE FROM analyses WHERE expires_at < ?', (now,))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"분석 캐시 저장 오류: {e}")
+
+    def record_bypass(self, refresh: bool = False):
+        """캐시를 건너뛴 요청을 기록합니다. (refresh: 새로 분석해 덮어쓴 경우)"""
+        with self._lock:
+            if refresh:
+                self.refreshes += 1
+            else:
+                self.bypasses += 1
+
+    def clear(self):
+        """캐시를 모두 비웁니다."""
+        conn = self._get_connection()
+        conn.execute('DELETE FROM analyses')
+        conn.commit()
+
+    def stats(self) -> Dict:
+        """적중/실패 횟수와 저장 현황을 반환합니다."""
+        conn = self._get_connection()
+        entries, total_bytes = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analyses WHERE expires_at >= ?', (time.time(),)
+        ).fetchone()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            bypasses, refreshes = self.bypasses, self.refreshes
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0,
+            'bypasses': bypasses,
+            'refreshes': refreshes,
+            'entries': entries,
+            'total_bytes': total_bytes,
+            'ttl_seconds': self.ttl
+        }
+
+
+class JsonSectionParser:
+    """
+    스트리밍으로 받는 JSON 객체에서 완성된 최상위 키를 순서대로 꺼내는 파서
+
+    받은 텍스트는 한 번씩만 훑으며, 최상위 값 하나가 끝날 때마다 (키, 값)을 반환합니다.
+    첫 '{' 이전의 텍스트(```json 등)는 무시합니다.
+    """
 
-class AuditRiskAnalyzer:
     def __init__(self):
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.text = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self.done = False
+
+    def feed(self, chunk: str) -> List[tuple]:
+        """텍스트 조각을 추가하고 새로 완성된 (키, 값) 목록을 반환합니다."""
+        self.text += chunk
+        completed = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            if self.done:
+                break
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            if self._depth == 0:
+                if ch == '{':
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect_key:
+                        self._key_start = i
+                        self._expect_key = False
+                    elif self._value_start is None:
+                        self._value_start = i
+            elif self._depth == 1:
+                if ch in ',}':
+                    # 문자열·숫자 등 단일 값은 다음 구분자에서 끝남
+                    if self._value_start is not None:
+                        self._emit(completed, text[self._value_start:i].strip())
+                    self._expect_key = ch == ','
+                    if ch == '}':
+                        self.done = True
+                elif ch in '{[':
+                    self._value_start = i
+                    self._depth += 1
+                elif ch != ':' and not ch.isspace() and self._value_start is None and self._key is not None:
+                    self._value_start = i
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 1:
+                    # 객체·배열 값은 닫히는 즉시 완성
+                    self._emit(completed, text[self._value_start:i + 1])
+
+        self._pos = len(text)
+        return completed
+
+    def _emit(self, completed: List[tuple], value_text: str):
+        key, self._key, self._value_start = self._key, None, None
+        if key is None:
+            return
+        try:
+            completed.append((key, json.loads(value_text)))
+        except ValueError:
+            pass
+
+
+class AuditRiskAnalyzer:
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, cache: Optional[AnalysisCache] = None, model=None,
+                 prompt_builder: Optional[AuditPromptBuilder] = None):
+        """
+        Args:
+            model_name: 사용할 Gemini 모델 이름
+            cache: 분석 결과 캐시 (없으면 매번 모델을 호출)
+            model: generate_content를 제공하는 모델 객체 (테스트용 가짜 모델 등, 없으면 Gemini)
+            prompt_builder: 프롬프트 생성기 (없으면 기본 토큰 예산 사용)
+        """
+        self.model_name = model_name
+        self.model = model if model is not None else create_gemini_model(model_name)
+        self.cache = cache
+        self.prompt_builder = prompt_builder or AuditPromptBuilder()
+        
+        self._stats_lock = threading.Lock()
+        self._request_stats = {'count': 0, 'cached': 0, 'errors': 0, 'prompt_tokens': 0, 'latency': 0.0,
+                               'samples': deque(maxlen=500)}
+    
+    @staticmethod
+    def _prompt_info(built: Dict) -> Dict:
+        """결과에 함께 반환하는 프롬프트 크기 정보"""
+        return {key: value for key, value in built.items() if key != 'prompt'}
     
-    def analyze_financial_risks(self, company_data: Dict, financial_metrics: Dict, full_financial_data: Dict = None) -> Dict:
+    def _record_request(self, built: Optional[Dict], latency: Optional[float], cached: bool = False,
+                        error: bool = False):
+        """요청별 프롬프트 크기와 모델 응답 시간을 기록합니다. (캐시 적중은 건수만)"""
+        with self._stats_lock:
+            stats = self._request_stats
+            stats['count'] += 1
+            if cached:
+                stats['cached'] += 1
+            elif error:
+                stats['errors'] += 1
+            elif built is not None and latency is not None:
+                stats['prompt_tokens'] += built['prompt_tokens']
+                stats['latency'] += latency
+                stats['samples'].append((built['prompt_tokens'], latency))
+    
+    def get_request_stats(self) -> Dict:
+        """모델을 호출한 요청의 프롬프트 토큰 수와 응답 시간(ms) 통계를 반환합니다."""
+        with self._stats_lock:
+            stats = self._request_stats
+            called = stats['count'] - stats['cached'] - stats['errors']
+            tokens = sorted(sample[0] for sample in stats['samples'])
+            latencies = sorted(sample[1] for sample in stats['samples'])
+            result = {
+                'count': stats['count'],
+                'cached': stats['cached'],
+                'errors': stats['errors'],
+                'max_input_tokens': self.prompt_builder.max_input_tokens
+            }
+            if called:
+                result.update({
+                    'avg_prompt_tokens': round(stats['prompt_tokens'] / called),
+                    'p95_prompt_tokens': tokens[min(len(tokens) - 1, int(len(tokens) * 0.95))],
+                    'avg_latency_ms': round(stats['latency'] / called * 1000, 2),
+                    'p50_latency_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+                    'p95_latency_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2)
+                })
+            return result
+    
+    def _lookup_cache(self, prompt: str, use_cache: bool, refresh: bool) -> tuple:
+        """
+        캐시를 조회합니다.
+        
+        Returns:
+            (저장에 쓸 캐시 키 또는 None, 캐시된 결과 또는 None)
+        """
+        if self.cache is None:
+            return None, None
+        if not use_cache:
+            self.cache.record_bypass()
+            return None, None
+        
+        cache_key = AnalysisCache.make_key(self.model_name, prompt)
+        if refresh:
+            self.cache.record_bypass(refresh=True)
+            return cache_key, None
+        return cache_key, self.cache.get(cache_key)
+    
+    def _finish(self, cache_key: Optional[str], response_text: str, usage: Dict, built: Dict,
+                latency: float) -> Dict:
+        """모델 응답 전체를 파싱하고 캐시에 저장한 뒤 결과를 반환합니다."""
+        analysis_result = self._parse_gemini_response(response_text)
+        
+        # JSON 파싱에 실패한 대체 결과는 저장하지 않음
+        if cache_key is not None and 'raw_response' not in analysis_result:
+            self.cache.set(cache_key, self.model_name, analysis_result, response_text)
+        
+        self._record_request(built, latency)
+        return {
+            'success': True,
+            'analysis': analysis_result,
+            'raw_response': response_text,
+            'cached': False,
+            'usage': usage,
+            'prompt': self._prompt_info(built),
+            'latency_ms': round(latency * 1000, 2)
+        }
+    
+    def _cached_result(self, cached: Dict, built: Dict) -> Dict:
+        self._record_request(built, None, cached=True)
+        return {
+            'success': True,
+            'analysis': cached['analysis'],
+            'raw_response': cached['raw_response'],
+            'cached': True,
+            'cached_at': cached['created_at'],
+            'usage': {'prompt_tokens': 0, 'output_tokens': 0, 'estimated': False},
+            'prompt': self._prompt_info(built),
+            'latency_ms': 0
+        }
+    
+    def analyze_financial_risks(self, company_data: Dict, financial_metrics: Dict, full_financial_data: Dict = None,
+                                use_cache: bool = True, refresh: bool = False) -> Dict:
         """
         재무제표 감사업무용 리스크 분석 수행
+        
+        Args:
+            use_cache: False이면 캐시를 읽지도 저장하지도 않음
+            refresh: True이면 캐시를 읽지 않고 새로 분석한 결과로 덮어씀
         """
         try:
-            # 분석용 프롬프트 생성
-            prompt = self._create_audit_risk_prompt(company_data, financial_metrics, full_financial_data)
+            # 토큰 예산 안에서 분석용 프롬프트 생성
+            built = self.prompt_builder.build(company_data, financial_metrics, full_financial_data)
+            prompt = built['prompt']
+            
+            # 같은 모델·프롬프트로 분석한 결과가 있으면 재사용
+            cache_key, cached = self._lookup_cache(prompt, use_cache, refresh)
+            if cached is not None:
+                return self._cached_result(cached, built)
             
             # Gemini API 호출
+            started = time.perf_counter()
             response = self.model.generate_content(prompt)
+            latency = time.perf_counter() - started
             
             # 응답 파싱 및 구조화
-            analysis_result = self._parse_gemini_response(response.text)
-            
-            return {
-                'success': True,
-                'analysis': analysis_result,
-                'raw_response': response.text
-            }
+            usage = token_usage(prompt, response.text, getattr(response, 'usage_metadata', None))
+            return self._finish(cache_key, response.text, usage, built, latency)
             
         except Exception as e:
+            self._record_request(None, None, error=True)
             return {
                 'success': False,
                 'error': str(e),
                 'traceback': traceback.format_exc()
             }
     
-    def _create_audit_risk_prompt(self, company_data: Dict, financial_metrics: Dict, full_financial_data: Dict = None) -> str:
-        """
-        감사업무용 리스크 분석 프롬프트 생성
-        """
-        prompt = f"""
-        당신은 경험이 풍부한 공인회계사이며, 재무제표 감사업무의 전문가입니다.
-        다음 기업에 대한 감사업무 수임 후, 감사업무 개시 전 리스크 분석을 수행해야 합니다.
-
-        **기업 정보:**
-        - 회사명: {company_data.get('corp_name', 'N/A')}
-        - 기업코드: {company_data.get('corp_code', 'N/A')}
-        - 주식코드: {company_data.get('stock_code', 'N/A')}
-
-        **재무비율 분석 결과:**
-        - 유동비율: {financial_metrics.get('current_ratio', 0)}%
-        - 부채비율: {financial_metrics.get('debt_ratio', 0)}%
-        - 자기자본비율: {financial_metrics.get('equity_ratio', 0)}%
-        - 영업이익률: {financial_metrics.get('operating_margin', 0)}%
-        - 순이익률: {financial_metrics.get('net_margin', 0)}%
-        - ROA: {financial_metrics.get('roa', 0)}%
-        - ROE: {financial_metrics.get('roe', 0)}%
-
-        {self._format_full_financial_data(full_financial_data)}
-
-        다음 관점에서 종합적인 감사 리스크 분석을 수행하고, JSON 형태로 구조화된 보고서를 제공해주세요:
-
-        1. **재무적 리스크 (Financial Risks)**
-           - 유동성 위험
-           - 수익성 위험
-           - 레버리지 위험
-           - 자본 구조 위험
-
-        2. **감사 위험 요소 (Audit Risk Factors)**
-           - 고유위험 (Inherent Risk)
-           - 통제위험 (Control Risk)
-           - 발견위험 (Detection Risk)
-
-        3. **중요한 왜곡표시 위험 (Risk of Material Misstatement)**
-           - 수익 인식 관련 위험
-           - 자산 평가 위험
-           - 부채 누락 위험
-           - 공정가치 측정 위험
-
-        4. **권고사항 (Recommendations)**
-           - 추가 감사절차 필요 영역
-           - 집중 검토 대상 계정과목
-           - 리스크 완화 방안
-
-        5. **전체 리스크 등급**
-           - 높음/중간/낮음으로 분류
-           - 근거와 함께 제시
-
-        응답은 반드시 다음 JSON 구조를 따라주세요:
-
-        {{
-            "overall_risk_level": "높음/중간/낮음",
-            "overall_assessment": "전체적인 리스크 평가 요약",
-            "financial_risks": {{
-                "liquidity_risk": {{"level": "높음/중간/낮음", "description": "설명", "indicators": ["지표1", "지표2"]}},
-                "profitability_risk": {{"level": "높음/중간/낮음", "description": "설명", "indicators": ["지표1", "지표2"]}},
-                "leverage_risk": {{"level": "높음/중간/낮음", "description": "설명", "indicators": ["지표1", "지표2"]}},
-                "capital_structure_risk": {{"level": "높음/중간/낮음", "description": "설명", "indicators": ["지표1", "지표2"]}}
-            }},
-            "audit_risk_factors": {{
-                "inherent_risk": {{"level": "높음/중간/낮음", "description": "설명", "factors": ["요인1", "요인2"]}},
-                "control_risk": {{"level": "높음/중간/낮음", "description": "설명", "factors": ["요인1", "요인2"]}},
-                "detection_risk": {{"level": "높음/중간/낮음", "description": "설명", "factors": ["요인1", "요인2"]}}
-            }},
-            "material_misstatement_risks": [
-                {{"area": "수익인식", "risk_level": "높음/중간/낮음", "description": "설명", "audit_procedures": ["절차1", "절차2"]}},
-                {{"area": "자산평가", "risk_level": "높음/중간/낮음", "description": "설명", "audit_procedures": ["절차1", "절차2"]}},
-                {{"area": "부채", "risk_level": "높음/중간/낮음", "description": "설명", "audit_procedures": ["절차1", "절차2"]}}
-            ],
-            "recommendations": {{
-                "priority_areas": ["우선순위 영역1", "우선순위 영역2"],
-                "additional_procedures": ["추가 절차1", "추가 절차2"],
-                "focus_accounts": ["계정과목1", "계정과목2"],
-                "risk_mitigation": ["완화방안1", "완화방안2"]
-            }},
-            "key_insights": [
-                "핵심 인사이트 1",
-                "핵심 인사이트 2",
-                "핵심 인사이트 3"
-            ]
-        }}
-
-        한국 회계기준과 감사기준을 기반으로 전문적이고 실무적인 분석을 제공해주세요.
+    def stream_financial_risks(self, company_data: Dict, financial_metrics: Dict, full_financial_data: Dict = None,
+                               use_cache: bool = True, refresh: bool = False) -> Iterator[Dict]:
         """
+        스트리밍 생성으로 리스크 분석을 수행하며 진행 상황을 이벤트로 반환합니다.
         
-        return prompt
-    
-    def _format_full_financial_data(self, full_financial_data: Dict) -> str:
+        Yields:
+            {'type': 'section', 'key', 'value'}: 최상위 섹션이 완성될 때마다
+            {'type': 'complete', ...}: 마지막에 한 번 (analyze_financial_risks 결과와 같은 키)
+            {'type': 'error', 'error'}: 오류 시
         """
-        전체 재무제표 데이터를 프롬프트용으로 포맷팅
-        """
-        if not full_financial_data:
-            return "**전체 재무제표 데이터:** 데이터가 제공되지 않았습니다."
-        
-        formatted_text = "**상세 재무제표 정보:**\n"
-        
-        # 재무상태표 (BS) 주요 항목
-        bs_data = full_financial_data.get('BS', {})
-        if bs_data:
-            formatted_text += "\n📊 **재무상태표 주요 항목:**\n"
-            key_bs_accounts = ['자산총계', '유동자산', '비유동자산', '부채총계', '유동부채', '비유동부채', '자본총계', '자기자본']
-            for account in key_bs_accounts:
-                if account in bs_data:
-                    current_amount = bs_data[account].get('current_period', {}).get('amount', 0)
-                    previous_amount = bs_data[account].get('previous_period', {}).get('amount', 0)
-                    formatted_text += f"  - {account}: 당기 {current_amount:,}원, 전기 {previous_amount:,}원\n"
-        
-        # 손익계산서 (IS) 주요 항목  
-        is_data = full_financial_data.get('IS', {})
-        if is_data:
-            formatted_text += "\n📈 **손익계산서 주요 항목:**\n"
-            key_is_accounts = ['수익(매출액)', '매출액', '매출총이익', '영업이익', '법인세비용차감전순이익', '당기순이익']
-            for account in key_is_accounts:
-                if account in is_data:
-                    current_amount = is_data[account].get('current_period', {}).get('amount', 0)
-                    previous_amount = is_data[account].get('previous_period', {}).get('amount', 0)
-                    formatted_text += f"  - {account}: 당기 {current_amount:,}원, 전기 {previous_amount:,}원\n"
-        
-        # 현금흐름표 (CF) 주요 항목
-        cf_data = full_financial_data.get('CF', {})
-        if cf_data:
-            formatted_text += "\n💰 **현금흐름표 주요 항목:**\n"
-            key_cf_accounts = ['영업활동현금흐름', '투자활동현금흐름', '재무활동현금흐름', '현금및현금성자산의증가']
-            for account in key_cf_accounts:
-                if account in cf_data:
-                    current_amount = cf_data[account].get('current_period', {}).get('amount', 0)
-                    previous_amount = cf_data[account].get('previous_period', {}).get('amount', 0)
-                    formatted_text += f"  - {account}: 당기 {current_amount:,}원, 전기 {previous_amount:,}원\n"
-        
-        # 계정과목 수 정보
-        total_accounts = len(bs_data) + len(is_data) + len(cf_data) + len(full_financial_data.get('CIS', {})) + len(full_financial_data.get('SCE', {}))
-        formatted_text += f"\n📋 **전체 계정과목 수:** {total_accounts}개\n"
-        
-        return formatted_text
+        try:
+            built = self.prompt_builder.build(company_data, financial_metrics, full_financial_data)
+            prompt = built['prompt']
+            
+            cache_key, cached = self._lookup_cache(prompt, use_cache, refresh)
+            if cached is not None:
+                for key, value in cached['analysis'].items():
+                    yield {'type': 'section', 'key': key, 'value': value}
+                yield dict(self._cached_result(cached, built), type='complete')
+                return
+            
+            parser = JsonSectionParser()
+            sent = set()
+            usage_metadata = None
+            started = time.perf_counter()
+            for chunk in self.model.generate_content(prompt, stream=True):
+                # 사용량은 마지막 조각에 들어 있음
+                usage_metadata = getattr(chunk, 'usage_metadata', None) or usage_metadata
+                for key, value in parser.feed(chunk.text):
+                    sent.add(key)
+                    yield {'type': 'section', 'key': key, 'value': value}
+            
+            # 스트리밍 중 꺼내지 못한 섹션(대체 구조 등)은 전체 파싱 결과로 보냄
+            result = self._finish(cache_key, parser.text, token_usage(prompt, parser.text, usage_metadata), built,
+                                  time.perf_counter() - started)
+            for key, value in result['analysis'].items():
+                if key not in sent:
+                    yield {'type': 'section', 'key': key, 'value': value}
+            yield dict(result, type='complete')
+            
+        except Exception as e:
+            self._record_request(None, None, error=True)
+            yield {'type': 'error', 'error': str(e)}
     
     def _parse_gemini_response(self, response_text: str) -> Dict:
         """
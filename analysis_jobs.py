@@ -0,0 +1,351 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+
+class AnalysisJobQueue:
+    """
+    AI 분석 백그라운드 작업 큐
+
+    작업은 SQLite 파일에 저장되어 모든 워커 프로세스가 공유합니다. 프로세스마다 정해진 수의
+    작업 스레드가 대기 중인 작업을 하나씩 가져가(claim) 실행하므로, 쌓인 작업 수와 관계없이
+    동시에 실행되는 분석 수는 workers를 넘지 않고 웹 요청 스레드는 바로 응답할 수 있습니다.
+
+    같은 중복 키(회사·연도·보고서)의 작업이 대기 중이거나 실행 중이면 새로 만들지 않고 그
+    작업을 반환합니다. 실행 중인 작업은 lease_seconds 동안 유효한 임대(lease)를 가지며, 실행하는
+    프로세스가 주기적으로 갱신합니다. 프로세스가 종료되어 임대가 만료된 작업은 어느 프로세스든
+    다시 대기열에 넣고, 시작하는 프로세스는 자기 이름(호스트:PID)으로 남은 작업을 종료된 것으로 봅니다.
+    (컨테이너 재시작으로 PID가 같아지거나 재배포로 호스트 이름이 바뀌어도 작업이 멈춰 있지 않음)
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, runner: Callable[[Dict], Dict],
+                 db_path: str = os.path.join('cache', 'analysis_jobs.db'), workers: int = 2,
+                 result_ttl: float = 24 * 3600, poll_interval: float = 1.0, max_attempts: int = 2,
+                 lease_seconds: float = 120.0):
+        """
+        Args:
+            runner: 작업 파라미터를 받아 결과 딕셔너리를 반환하는 함수 (결과에 'error'가 있으면 실패)
+            db_path: 작업 저장 파일
+            workers: 프로세스별 작업 스레드 수
+            result_ttl: 끝난 작업 결과 보관 기간(초)
+            poll_interval: 다른 프로세스가 넣은 작업을 확인하는 주기(초)
+            max_attempts: 중단된 작업을 다시 실행할 최대 횟수
+            lease_seconds: 실행 중인 작업의 임대 기간(초). 이 시간 동안 갱신되지 않으면 중단된 것으로 봄
+        """
+        self.runner = runner
+        self.db_path = db_path
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+
+        self.completed = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.run_seconds = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._finished = threading.Condition()
+        self._threads = []
+        self._started_pid = None
+        self._last_cleanup = 0.0
+        self._last_reclaim = 0.0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._get_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                dedup_key TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result BLOB,
+                error TEXT,
+                owner TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                heartbeat_at REAL,
+                finished_at REAL
+            )
+        ''')
+        # 같은 중복 키로 대기/실행 중인 작업은 하나만 존재
+        conn.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_in_flight ON jobs(dedup_key)
+            WHERE status IN ('queued', 'running')
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)')
+        conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """스레드/프로세스별 SQLite 연결을 반환합니다. (fork 이후에는 새로 연결)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _owner() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        """현재 프로세스의 작업 스레드를 시작합니다. (fork 이후 호출되면 새로 시작)"""
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            self._threads = []
+        self._reclaim(include_own=True)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'analysis-job-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat, name='analysis-job-heartbeat', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _reclaim(self, include_own: bool = False):
+        """
+        임대가 만료된 실행 중 작업을 다시 대기열에 넣습니다. (반복해서 중단된 작업은 실패 처리)
+
+        Args:
+            include_own: True이면 현재 프로세스 이름으로 남은 작업도 포함 (시작 시점에는 이전
+                         프로세스가 남긴 것이므로)
+        """
+        owner = self._owner() if include_own else None
+        expired = time.time() - self.lease_seconds
+        stale = "status = 'running' AND (owner = ? OR COALESCE(heartbeat_at, started_at, 0) < ?)"
+        conn = self._get_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                f"UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE {stale} AND attempts >= ?",
+                ('작업이 반복해서 중단되었습니다.', time.time(), owner, expired, self.max_attempts)
+            )
+            conn.execute(f"UPDATE jobs SET status = 'queued', owner = NULL WHERE {stale}", (owner, expired))
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _heartbeat(self):
+        """현재 프로세스가 실행 중인 작업의 임대를 주기적으로 갱신합니다."""
+        while True:
+            time.sleep(self.lease_seconds / 4)
+            try:
+                self._get_connection().execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND owner = ?",
+                    (time.time(), self._owner())
+                )
+            except sqlite3.Error as e:
+                print(f"분석 작업 임대 갱신 오류: {e}")
+
+    def submit(self, dedup_key: str, params: Dict) -> Tuple[Dict, bool]:
+        """
+        작업을 대기열에 넣습니다.
+
+        Returns:
+            (작업 정보, 이미 대기/실행 중인 작업을 재사용했는지 여부)
+        """
+        self.start()
+        conn = self._get_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE dedup_key = ? AND status IN ('queued', 'running')",
+                (dedup_key,)
+            ).fetchone()
+            if row:
+                job_id, deduplicated = row[0], True
+            else:
+                job_id, deduplicated = uuid.uuid4().hex, False
+                conn.execute(
+                    'INSERT INTO jobs (job_id, dedup_key, params, status, created_at) VALUES (?, ?, ?, ?, ?)',
+                    (job_id, dedup_key, json.dumps(params, ensure_ascii=False), self.QUEUED, time.time())
+                )
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+
+        if deduplicated:
+            with self._lock:
+                self.deduplicated += 1
+        else:
+            self._wakeup.set()
+        return self.get(job_id), deduplicated
+
+    def _claim(self) -> Optional[Tuple[str, Dict]]:
+        """가장 오래 기다린 작업 하나를 실행 상태로 바꾸고 (작업 ID, 파라미터)를 반환합니다."""
+        now = time.time()
+        conn = self._get_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT job_id, params FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, started_at = ?, heartbeat_at = ?, "
+                    "attempts = attempts + 1 WHERE job_id = ?",
+                    (self._owner(), now, now, row[0])
+                )
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _finish(self, job_id: str, result: Optional[Dict], error: Optional[str]):
+        """작업 결과를 저장하고 기다리는 요청을 깨웁니다."""
+        payload = None
+        if result is not None:
+            payload = zlib.compress(json.dumps(result, ensure_ascii=False).encode('utf-8'), 6)
+        self._get_connection().execute(
+            'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?',
+            (self.FAILED if error else self.DONE, payload, error, time.time(), job_id)
+        )
+        with self._finished:
+            self._finished.notify_all()
+
+    def _work(self):
+        """작업 스레드: 대기 중인 작업을 하나씩 가져와 실행합니다."""
+        while True:
+            try:
+                claimed = self._claim()
+            except sqlite3.Error as e:
+                print(f"분석 작업 조회 오류: {e}")
+                claimed = None
+
+            if claimed is None:
+                self._reclaim_expired()
+                self._cleanup()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            job_id, params = claimed
+            started = time.perf_counter()
+            try:
+                result = self.runner(params)
+                error = result.get('error') if isinstance(result, dict) else None
+            except Exception as e:
+                traceback.print_exc()
+                result, error = None, str(e)
+            elapsed = time.perf_counter() - started
+
+            try:
+                self._finish(job_id, result, error)
+            except sqlite3.Error as e:
+                print(f"분석 작업 결과 저장 오류: {e}")
+            with self._lock:
+                self.run_seconds += elapsed
+                if error:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+    def _reclaim_expired(self):
+        """다른 프로세스가 남긴 만료된 작업을 다시 대기열에 넣습니다. (임대 기간의 절반에 한 번)"""
+        now = time.time()
+        if now - self._last_reclaim < self.lease_seconds / 2:
+            return
+        self._last_reclaim = now
+        try:
+            self._reclaim()
+        except sqlite3.Error as e:
+            print(f"분석 작업 회수 오류: {e}")
+
+    def _cleanup(self):
+        """보관 기간이 지난 끝난 작업을 삭제합니다. (10분에 한 번)"""
+        now = time.time()
+        if now - self._last_cleanup < 600:
+            return
+        self._last_cleanup = now
+        try:
+            self._get_connection().execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (now - self.result_ttl,)
+            )
+        except sqlite3.Error as e:
+            print(f"분석 작업 정리 오류: {e}")
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """작업 상태와 (끝났다면) 결과를 반환합니다. 없으면 None"""
+        conn = self._get_connection()
+        row = conn.execute(
+            'SELECT job_id, params, status, result, error, created_at, started_at, finished_at '
+            'FROM jobs WHERE job_id = ?', (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            'job_id': row[0],
+            'params': json.loads(row[1]),
+            'status': row[2],
+            'error': row[4],
+            'created_at': row[5],
+            'started_at': row[6],
+            'finished_at': row[7]
+        }
+        if row[3] is not None:
+            job['result'] = json.loads(zlib.decompress(row[3]).decode('utf-8'))
+        if row[2] == self.QUEUED:
+            job['queue_position'] = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (row[5],)
+            ).fetchone()[0] + 1
+        return job
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict]:
+        """작업이 끝나거나 timeout초가 지날 때까지 기다린 뒤 작업 정보를 반환합니다."""
+        self.start()
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job['status'] in (self.DONE, self.FAILED) or remaining <= 0:
+                return job
+            # 같은 프로세스의 작업은 끝나는 즉시, 다른 프로세스의 작업은 poll_interval마다 확인
+            with self._finished:
+                self._finished.wait(min(remaining, self.poll_interval))
+
+    def stats(self) -> Dict:
+        """상태별 작업 수와 현재 프로세스의 처리 통계를 반환합니다."""
+        counts = dict(self._get_connection().execute(
+            'SELECT status, COUNT(*) FROM jobs GROUP BY status'
+        ).fetchall())
+        with self._lock:
+            processed = self.completed + self.failed
+            return {
+                'queued': counts.get(self.QUEUED, 0),
+                'running': counts.get(self.RUNNING, 0),
+                'done': counts.get(self.DONE, 0),
+                'failed': counts.get(self.FAILED, 0),
+                'workers': self.workers,
+                'completed_here': self.completed,
+                'failed_here': self.failed,
+                'deduplicated': self.deduplicated,
+                'avg_run_seconds': round(self.run_seconds / processed, 2) if processed else 0
+            }
@@ -1,9 +1,22 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, url_for, stream_with_context
+import hashlib
+import json
 import sqlite3
 import os
-from opendart_api import OpenDartAPI
-from visualization import FinancialVisualizer
-from ai_analysis import AuditRiskAnalyzer
+import time
+import atexit
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from opendart_api import OpenDartAPI, DartResponseCache
+from financial_warehouse import FinancialWarehouse
+from visualization import FinancialVisualizer, ChartCache
+from ai_analysis import AuditRiskAnalyzer, AnalysisCache
+from audit_prompt import AuditPromptBuilder, DEFAULT_MAX_INPUT_TOKENS
+from analysis_jobs import AnalysisJobQueue
+from portfolio_audit import BudgetedModel, PortfolioAudit, SharedTokenRateLimiter
+from company_search import search_companies, AutocompleteIndexLoader
+from corp_code_refresh import CorpCodeRefresher
+from company_db import CompanyDatabase, COMPANY_DETAIL_SQL, COMPANY_SUMMARY_SQL
+from ratio_engine import accounts_from_history, compute_ratios, metrics_records
 from dotenv import load_dotenv
 
 # 환경변수 로드
@@ -16,32 +29,81 @@ OPENDART_API_KEY = os.getenv('OPENDART_API_KEY')
 if not OPENDART_API_KEY:
     raise ValueError("OPENDART_API_KEY 환경변수가 설정되지 않았습니다.")
 
-opendart_api = OpenDartAPI(OPENDART_API_KEY)
-visualizer = FinancialVisualizer()
-ai_analyzer = AuditRiskAnalyzer()
+# 오픈다트 응답 캐시 (모든 워커가 같은 파일을 공유)
+dart_cache = DartResponseCache(
+    os.getenv('DART_CACHE_PATH', os.path.join('cache', 'dart_responses.db')),
+    max_bytes=int(os.getenv('DART_CACHE_MAX_MB', '256')) * 1024 * 1024
+)
 
-def init_database():
-    """데이터베이스를 초기화합니다."""
-    try:
-        from xml_to_db import create_database, parse_xml_and_insert
-        print("데이터베이스를 초기화하는 중...")
-        conn = create_database()
-        parse_xml_and_insert(conn)
-        conn.close()
-        print("데이터베이스 초기화 완료!")
-    except Exception as e:
-        print(f"데이터베이스 초기화 중 오류 발생: {e}")
+# 한 번 받은 재무제표를 계정 단위로 보관하는 저장소 (만료 없음, 조회 시 우선 사용)
+financial_warehouse = FinancialWarehouse(
+    os.getenv('FINANCIAL_WAREHOUSE_PATH', os.path.join('data', 'financials.db'))
+)
+
+opendart_api = OpenDartAPI(
+    OPENDART_API_KEY,
+    cache=dart_cache,
+    warehouse=financial_warehouse,
+    pool_size=int(os.getenv('DART_POOL_SIZE', os.getenv('GUNICORN_THREADS', '10'))),
+    connect_timeout=float(os.getenv('DART_CONNECT_TIMEOUT', '3.05')),
+    read_timeout=float(os.getenv('DART_READ_TIMEOUT', '10')),
+    max_retries=int(os.getenv('DART_MAX_RETRIES', '3'))
+)
+# 렌더링된 차트 캐시 (모든 워커가 같은 디렉토리를 공유)
+chart_cache = ChartCache(
+    os.getenv('CHART_CACHE_DIR', os.path.join('cache', 'charts')),
+    max_bytes=int(os.getenv('CHART_CACHE_MAX_MB', '512')) * 1024 * 1024
+)
+visualizer = FinancialVisualizer(
+    cache=chart_cache,
+    render_workers=int(os.getenv('CHART_RENDER_WORKERS', '0')),
+    use_processes=os.getenv('CHART_RENDER_PROCESSES', 'False').lower() == 'true'
+)
+# AI 분석 결과 캐시 (같은 모델·프롬프트의 분석을 재사용, AI_ANALYSIS_CACHE_TTL_HOURS=0이면 사용 안 함)
+AI_ANALYSIS_CACHE_TTL_HOURS = float(os.getenv('AI_ANALYSIS_CACHE_TTL_HOURS', '168'))
+analysis_cache = AnalysisCache(
+    os.getenv('AI_ANALYSIS_CACHE_PATH', os.path.join('cache', 'ai_analyses.db')),
+    ttl=int(AI_ANALYSIS_CACHE_TTL_HOURS * 3600)
+) if AI_ANALYSIS_CACHE_TTL_HOURS > 0 else None
+# AI 분석 프롬프트 토큰 예산 (잔액·증감이 큰 계정부터 예산만큼 포함, 0이면 모든 계정 포함)
+prompt_builder = AuditPromptBuilder(
+    max_input_tokens=int(os.getenv('AI_PROMPT_MAX_TOKENS', str(DEFAULT_MAX_INPUT_TOKENS)))
+)
+ai_analyzer = AuditRiskAnalyzer(cache=analysis_cache, prompt_builder=prompt_builder)
+
+# 업스트림 동시 조회용 스레드 풀과 요청별 조회 제한 시간(초)
+upstream_executor = ThreadPoolExecutor(max_workers=int(os.getenv('UPSTREAM_WORKERS', '8')))
+AI_ANALYSIS_FETCH_DEADLINE = float(os.getenv('AI_ANALYSIS_FETCH_DEADLINE', '20'))
 
 def get_db_connection():
-    """데이터베이스 연결을 반환합니다."""
-    if not os.path.exists('companies.db'):
-        print("데이터베이스가 없습니다. 초기화를 시도합니다...")
-        init_database()
-        if not os.path.exists('companies.db'):
-            return None
-    conn = sqlite3.connect('companies.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    """연결 풀에서 읽기 전용 데이터베이스 연결을 빌려 반환합니다. (닫지 않음)"""
+    return company_db.connection()
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """요청이 끝나면 빌린 연결을 정리해 풀에 반납합니다."""
+    company_db.release()
+
+# 자동완성 인덱스 (워커별로 시작 시 로드하고, companies.db 파일이 바뀌면 다음 요청 때 다시 로드)
+autocomplete_indexes = AutocompleteIndexLoader('companies.db')
+autocomplete_indexes.get()
+
+# 회사 목록 갱신 작업 (CORP_CODE_SOURCE를 지정하면 다운로드 대신 로컬 파일 사용)
+corp_code_refresher = CorpCodeRefresher(
+    'companies.db',
+    api_key=OPENDART_API_KEY,
+    source=os.getenv('CORP_CODE_SOURCE') or None,
+    interval=float(os.getenv('CORP_CODE_REFRESH_HOURS', '24')) * 3600
+)
+
+# 읽기 전용 연결 풀 (회사 목록이 교체되면 다음 사용 시 다시 연결)
+company_db = CompanyDatabase(
+    'companies.db',
+    mmap_size=int(os.getenv('COMPANY_DB_MMAP_MB', '256')) * 1024 * 1024,
+    cache_size_kb=int(os.getenv('COMPANY_DB_CACHE_KB', '16384')),
+    generation=lambda: corp_code_refresher.generation
+)
+atexit.register(company_db.close_all)
 
 @app.route('/')
 def index():
@@ -52,6 +114,8 @@ def index():
 def search():
     """회사명으로 검색하는 API 엔드포인트입니다."""
     query = request.args.get('q', '').strip()
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', 50, type=int)
     
     if not query:
         return jsonify({'results': [], 'message': '검색어를 입력해주세요.'})
@@ -61,37 +125,34 @@ def search():
         return jsonify({'results': [], 'message': '데이터베이스에 연결할 수 없습니다.'})
     
     try:
-        # 회사명에서 부분 검색 수행
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT corp_code, corp_name, corp_eng_name, stock_code, modify_date
-            FROM companies 
-            WHERE corp_name LIKE ? OR corp_eng_name LIKE ?
-            ORDER BY corp_name
-            LIMIT 50
-        ''', (f'%{query}%', f'%{query}%'))
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'corp_code': row['corp_code'],
-                'corp_name': row['corp_name'],
-                'corp_eng_name': row['corp_eng_name'],
-                'stock_code': row['stock_code'],
-                'modify_date': row['modify_date']
-            })
-        
-        conn.close()
+        # 회사명에서 부분 검색 수행 (FTS5 트라이그램 인덱스, 관련도순)
+        page = search_companies(conn, query, limit=limit, cursor=cursor)
+        results = page['results']
         
         if results:
-            return jsonify({'results': results, 'message': f'{len(results)}개의 회사를 찾았습니다.'})
+            return jsonify({
+                'results': results,
+                'next_cursor': page['next_cursor'],
+                'message': f'{len(results)}개의 회사를 찾았습니다.'
+            })
         else:
-            return jsonify({'results': [], 'message': '검색 결과가 없습니다.'})
+            return jsonify({'results': [], 'next_cursor': None, 'message': '검색 결과가 없습니다.'})
             
     except Exception as e:
-        conn.close()
         return jsonify({'results': [], 'message': f'검색 중 오류가 발생했습니다: {str(e)}'})
 
+@app.route('/autocomplete')
+def autocomplete():
+    """검색어로 시작하는 회사를 메모리 인덱스에서 찾아 반환합니다. (초성 검색 지원)"""
+    query = request.args.get('q', '').strip()
+    k = max(1, min(request.args.get('k', 10, type=int), 50))
+    
+    index = autocomplete_indexes.get()
+    if not query or index is None:
+        return jsonify({'results': []})
+    
+    return jsonify({'results': index.search(query, k)})
+
 @app.route('/company/<corp_code>')
 def company_detail(corp_code):
     """특정 회사의 상세 정보를 반환합니다."""
@@ -100,15 +161,7 @@ def company_detail(corp_code):
         return jsonify({'error': '데이터베이스에 연결할 수 없습니다.'})
     
     try:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT corp_code, corp_name, corp_eng_name, stock_code, modify_date
-            FROM companies 
-            WHERE corp_code = ?
-        ''', (corp_code,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        row = conn.execute(COMPANY_DETAIL_SQL, (corp_code,)).fetchone()
         
         if row:
             return jsonify({
@@ -122,7 +175,6 @@ def company_detail(corp_code):
             return jsonify({'error': '회사를 찾을 수 없습니다.'})
             
     except Exception as e:
-        conn.close()
         return jsonify({'error': f'오류가 발생했습니다: {str(e)}'})
 
 @app.route('/financial/<corp_code>')
@@ -130,6 +182,7 @@ def get_financial_info(corp_code):
     """회사의 재무정보를 조회합니다."""
     year = request.args.get('year', '2022')  # 기본값: 2022년
     report_type = request.args.get('report', '11011')  # 기본값: 사업보고서
+    chart_mode = request.args.get('charts', 'url')  # url: 차트 이미지 URL, spec: 차트 명세 JSON
     
     try:
         # 오픈다트 API로 재무데이터 조회
@@ -142,15 +195,22 @@ def get_financial_info(corp_code):
         financial_data = opendart_api.parse_financial_data(raw_data)
         metrics = opendart_api.get_key_metrics(financial_data)
         
-        # 시각화 차트 생성
-        charts = {}
-        try:
-            charts['balance_sheet'] = visualizer.create_balance_sheet_chart(financial_data)
-            charts['income_statement'] = visualizer.create_income_statement_chart(financial_data)
-            charts['trend_analysis'] = visualizer.create_trend_analysis_chart(financial_data)
-        except Exception as chart_error:
-            print(f"차트 생성 오류: {chart_error}")
-            charts = {}
+        if chart_mode == 'spec':
+            # 클라이언트에서 직접 그릴 수 있는 차트 명세
+            charts = {
+                kind: visualizer.create_chart_spec(kind, financial_data, metrics)
+                for kind in FinancialVisualizer.CHART_KINDS
+            }
+        else:
+            # 차트는 /chart 엔드포인트에서 개별 렌더링 (브라우저가 병렬 로드/캐시)
+            chart_kinds = ('balance_sheet', 'income_statement', 'trend_analysis')
+            charts = {
+                kind: url_for('chart_image', corp_code=corp_code, kind=kind, fmt='png', year=year, report=report_type)
+                for kind in chart_kinds
+            }
+            # 렌더링 워커 풀이 있으면 백그라운드에서 차트를 미리 렌더링해 두어 /chart 요청은 캐시에서 응답 (응답은 기다리지 않음)
+            if visualizer.render_workers > 0:
+                visualizer.prerender(chart_kinds, financial_data)
         
         return jsonify({
             'basic_info': financial_data.get('basic_info', {}),
@@ -162,6 +222,70 @@ def get_financial_info(corp_code):
     except Exception as e:
         return jsonify({'error': f'재무정보 조회 중 오류가 발생했습니다: {str(e)}'})
 
+# 한 번에 조회할 수 있는 최대 연도 수
+MAX_HISTORY_YEARS = 30
+
+@app.route('/financial/<corp_code>/history')
+def get_financial_history(corp_code):
+    """여러 해의 주요계정과 재무지표를 최소한의 오픈다트 호출로 조회합니다."""
+    to_year = request.args.get('to', time.localtime().tm_year - 1, type=int)
+    from_year = request.args.get('from', to_year - 9, type=int)
+    report_type = request.args.get('report', '11011')
+    use_consolidated = request.args.get('fs', 'consolidated') != 'separate'
+    
+    if from_year > to_year or to_year - from_year + 1 > MAX_HISTORY_YEARS:
+        return jsonify({'error': f'조회 연도 구간이 올바르지 않습니다. (최대 {MAX_HISTORY_YEARS}년)'}), 400
+    
+    try:
+        history = opendart_api.get_financial_history(corp_code, from_year, to_year, report_type)
+        if not history['sources']:
+            return jsonify({'error': '재무데이터를 가져올 수 없습니다.'})
+        
+        ratios = compute_ratios(accounts_from_history(history, use_consolidated))
+        history['metrics'] = {str(year): metrics for year, metrics in metrics_records(ratios).items()}
+        return jsonify(history)
+        
+    except Exception as e:
+        return jsonify({'error': f'재무정보 조회 중 오류가 발생했습니다: {str(e)}'})
+
+@app.route('/chart/<corp_code>/<kind>.<fmt>')
+def chart_image(corp_code, kind, fmt):
+    """재무 차트 하나를 PNG/SVG 이미지로 렌더링하여 반환합니다."""
+    year = request.args.get('year', '2022')
+    report_type = request.args.get('report', '11011')
+    dpi = request.args.get('dpi', 150, type=int)
+    width = request.args.get('width', type=int)
+    
+    if kind not in FinancialVisualizer.CHART_KINDS or fmt not in FinancialVisualizer.IMAGE_FORMATS:
+        return jsonify({'error': '지원하지 않는 차트입니다.'}), 404
+    
+    try:
+        raw_data = opendart_api.get_financial_data(corp_code, year, report_type)
+        if not raw_data:
+            return jsonify({'error': '재무데이터를 가져올 수 없습니다.'}), 404
+        
+        financial_data = opendart_api.parse_financial_data(raw_data)
+        metrics = opendart_api.get_key_metrics(financial_data) if kind == 'financial_ratios' else None
+        
+        # 차트 입력 데이터와 렌더링 옵션이 같으면 같은 이미지
+        series = visualizer.chart_series(kind, financial_data, metrics)
+        render_dpi = visualizer.resolve_dpi(kind, series, dpi, width)
+        etag = visualizer.chart_key(kind, series, fmt, render_dpi)[:32]
+        
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            image = visualizer.render_series(kind, series, fmt, render_dpi)
+            response = Response(image, mimetype=FinancialVisualizer.IMAGE_FORMATS[fmt])
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=86400'
+        return response
+        
+    except Exception as e:
+        print(f"차트 생성 오류: {e}")
+        return jsonify({'error': f'차트 생성 중 오류가 발생했습니다: {str(e)}'}), 500
+
 @app.route('/financial-page/<corp_code>')
 def financial_page(corp_code):
     """재무정보 시각화 페이지를 렌더링합니다."""
@@ -171,15 +295,7 @@ def financial_page(corp_code):
         return "데이터베이스에 연결할 수 없습니다.", 500
     
     try:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT corp_code, corp_name, corp_eng_name, stock_code
-            FROM companies 
-            WHERE corp_code = ?
-        ''', (corp_code,))
-        
-        company = cursor.fetchone()
-        conn.close()
+        company = conn.execute(COMPANY_SUMMARY_SQL, (corp_code,)).fetchone()
         
         if not company:
             return "회사를 찾을 수 없습니다.", 404
@@ -187,40 +303,51 @@ def financial_page(corp_code):
         return render_template('financial.html', company=dict(company))
         
     except Exception as e:
-        conn.close()
         return f"오류가 발생했습니다: {str(e)}", 500
 
-@app.route('/ai-audit-analysis/<corp_code>')
-def ai_audit_analysis(corp_code):
-    """AI 감사 리스크 분석 API 엔드포인트"""
-    year = request.args.get('year', '2023')
-    report = request.args.get('report', '11011')
+def lookup_company(corp_code):
+    """AI 분석용 회사 정보를 조회합니다. DB 연결 실패 시 ConnectionError를 발생시킵니다."""
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError('데이터베이스 연결 실패')
+    
+    company = conn.execute(COMPANY_SUMMARY_SQL, (corp_code,)).fetchone()
+    return dict(company) if company else None
+
+def submit_analysis_inputs(corp_code, year, report):
+    """AI 분석에 필요한 회사 정보, 주요 계정, 전체 재무제표 조회를 동시에 시작합니다."""
+    return (
+        upstream_executor.submit(lookup_company, corp_code),
+        upstream_executor.submit(opendart_api.get_financial_data, corp_code, year, report),
+        upstream_executor.submit(opendart_api.get_full_financial_statements, corp_code, year, report, 'CFS')
+    )
+
+def run_ai_analysis(corp_code, year, report, use_cache=True, refresh=False):
+    """
+    입력 데이터를 조회해 AI 감사 리스크 분석을 수행하고 응답 본문을 반환합니다.
+    (동기 엔드포인트와 백그라운드 작업이 함께 사용, 실패 시 'error' 키 포함)
+    """
+    # 회사 정보, 주요 계정, 전체 재무제표를 동시에 조회
+    deadline = time.monotonic() + AI_ANALYSIS_FETCH_DEADLINE
+    company_future, financial_future, full_financial_future = submit_analysis_inputs(corp_code, year, report)
+    
+    def remaining():
+        return max(0, deadline - time.monotonic())
     
     try:
         # 회사 정보 조회
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({'error': '데이터베이스 연결 실패'})
-        
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT corp_code, corp_name, corp_eng_name, stock_code
-            FROM companies 
-            WHERE corp_code = ?
-        ''', (corp_code,))
-        
-        company = cursor.fetchone()
-        conn.close()
-        
-        if not company:
-            return jsonify({'error': '회사 정보를 찾을 수 없습니다.'})
+        try:
+            company_data = company_future.result(timeout=remaining())
+        except ConnectionError:
+            return {'error': '데이터베이스 연결 실패'}
         
-        company_data = dict(company)
+        if not company_data:
+            return {'error': '회사 정보를 찾을 수 없습니다.'}
         
         # 재무 데이터 조회 (기본 주요 계정)
-        raw_data = opendart_api.get_financial_data(corp_code, year, report)
+        raw_data = financial_future.result(timeout=remaining())
         if not raw_data:
-            return jsonify({'error': '재무 데이터를 가져올 수 없습니다.'})
+            return {'error': '재무 데이터를 가져올 수 없습니다.'}
         
         # 데이터 파싱
         financial_data = opendart_api.parse_financial_data(raw_data)
@@ -228,41 +355,324 @@ def ai_audit_analysis(corp_code):
         # 재무비율 계산
         metrics = opendart_api.get_key_metrics(financial_data)
         
-        # 전체 재무제표 데이터 조회 (AI 분석용)
-        full_financial_raw_data = opendart_api.get_full_financial_statements(corp_code, year, report, 'CFS')
+        # 전체 재무제표 데이터 (AI 분석용) - 제한 시간 내에 오지 않으면 주요 계정만으로 분석
         full_financial_data = {}
+        try:
+            full_financial_raw_data = full_financial_future.result(timeout=remaining())
+        except FuturesTimeoutError:
+            print(f"전체 재무제표 조회 시간 초과: {corp_code}")
+            full_financial_raw_data = None
         if full_financial_raw_data:
             full_financial_data = opendart_api.parse_full_financial_statements(full_financial_raw_data)
         
         # AI 감사 리스크 분석 수행 (전체 재무제표 데이터 포함)
-        analysis_result = ai_analyzer.analyze_financial_risks(company_data, metrics, full_financial_data)
+        analysis_result = ai_analyzer.analyze_financial_risks(company_data, metrics, full_financial_data,
+                                                              use_cache=use_cache, refresh=refresh)
         
         if not analysis_result['success']:
-            return jsonify({
+            return {
                 'error': 'AI 분석 중 오류가 발생했습니다.',
                 'details': analysis_result.get('error', '알 수 없는 오류')
-            })
+            }
         
-        return jsonify({
+        return {
             'success': True,
             'company': company_data,
             'metrics': metrics,
             'ai_analysis': analysis_result['analysis'],
+            'cached': analysis_result.get('cached', False),
+            'cached_at': analysis_result.get('cached_at'),
+            'prompt': analysis_result.get('prompt'),
+            'latency_ms': analysis_result.get('latency_ms'),
             'year': year,
             'report': report
-        })
+        }
         
+    except FuturesTimeoutError:
+        return {'error': '재무 데이터 조회 시간이 초과되었습니다.'}
     except Exception as e:
-        return jsonify({
+        return {
             'error': f'분석 중 오류가 발생했습니다: {str(e)}'
-        })
+        }
+    finally:
+        for future in (company_future, financial_future, full_financial_future):
+            future.cancel()
+
+@app.route('/ai-audit-analysis/<corp_code>')
+def ai_audit_analysis(corp_code):
+    """
+    AI 감사 리스크 분석 API 엔드포인트
+    
+    cache=0이면 분석 캐시를 사용하지 않고, refresh=1이면 새로 분석해 캐시를 덮어씁니다.
+    """
+    year = request.args.get('year', '2023')
+    report = request.args.get('report', '11011')
+    use_cache = request.args.get('cache', '1') != '0'
+    refresh = request.args.get('refresh', '0') == '1'
+    return jsonify(run_ai_analysis(corp_code, year, report, use_cache=use_cache, refresh=refresh))
+
+def run_analysis_job(params):
+    """백그라운드 작업으로 AI 분석을 실행합니다."""
+    return run_ai_analysis(params['corp_code'], params['year'], params['report'],
+                           use_cache=params.get('use_cache', True), refresh=params.get('refresh', False))
+
+# AI 분석 백그라운드 작업 큐 (프로세스별 작업 스레드 수만큼만 동시에 실행)
+analysis_jobs = AnalysisJobQueue(
+    run_analysis_job,
+    db_path=os.getenv('AI_JOB_DB_PATH', os.path.join('cache', 'analysis_jobs.db')),
+    workers=int(os.getenv('AI_JOB_WORKERS', '2')),
+    result_ttl=float(os.getenv('AI_JOB_RESULT_TTL_HOURS', '24')) * 3600
+)
+MAX_JOB_WAIT_SECONDS = 30
+
+@app.route('/ai-audit-analysis/<corp_code>/jobs', methods=['POST'])
+def submit_ai_audit_job(corp_code):
+    """
+    AI 감사 리스크 분석 작업을 대기열에 넣고 작업 ID를 바로 반환합니다.
+    
+    같은 회사·연도·보고서의 작업이 이미 대기/실행 중이면 그 작업을 반환합니다.
+    """
+    values = request.get_json(silent=True) or request.values
+    year = str(values.get('year', '2023'))
+    report = str(values.get('report', '11011'))
+    params = {
+        'corp_code': corp_code,
+        'year': year,
+        'report': report,
+        'use_cache': str(values.get('cache', '1')) != '0',
+        'refresh': str(values.get('refresh', '0')) == '1'
+    }
+    
+    try:
+        job, deduplicated = analysis_jobs.submit(f"{corp_code}:{year}:{report}", params)
+    except sqlite3.Error as e:
+        return jsonify({'error': f'작업을 등록할 수 없습니다: {str(e)}'}), 503
+    
+    return jsonify({
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'deduplicated': deduplicated,
+        'status_url': url_for('get_ai_audit_job', job_id=job['job_id'])
+    }), 202
+
+@app.route('/ai-audit-analysis/jobs/<job_id>')
+def get_ai_audit_job(job_id):
+    """
+    AI 분석 작업의 상태와 결과를 반환합니다.
+    
+    wait=초를 주면 작업이 끝날 때까지 최대 30초 기다린 뒤 응답합니다. (롱 폴링)
+    """
+    wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_JOB_WAIT_SECONDS)
+    job = analysis_jobs.wait(job_id, wait) if wait else analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify(job)
+
+# 포트폴리오 일괄 분석 (모델 호출은 PORTFOLIO_RPM/PORTFOLIO_TPM 한도 안에서, 작업은 하나씩 순서대로 실행)
+# 한도 기록은 작업 파일에 두어 모든 워커 프로세스와 CLI(portfolio_audit.py)가 함께 사용
+PORTFOLIO_JOB_DB_PATH = os.getenv('PORTFOLIO_JOB_DB_PATH', os.path.join('cache', 'portfolio_jobs.db'))
+portfolio_model = BudgetedModel(
+    ai_analyzer.model,
+    SharedTokenRateLimiter(PORTFOLIO_JOB_DB_PATH,
+                           int(os.getenv('PORTFOLIO_RPM', '15')), int(os.getenv('PORTFOLIO_TPM', '1000000')))
+)
+portfolio_analyzer = AuditRiskAnalyzer(cache=analysis_cache, model=portfolio_model, prompt_builder=prompt_builder)
+PORTFOLIO_LLM_WORKERS = int(os.getenv('PORTFOLIO_LLM_WORKERS', '4'))
+PORTFOLIO_OUTPUT_DIR = os.getenv('PORTFOLIO_OUTPUT_DIR', os.path.join('data', 'portfolio'))
+MAX_PORTFOLIO_COMPANIES = 500
 
+def run_portfolio_job(params):
+    """백그라운드 작업으로 포트폴리오 일괄 분석을 실행합니다."""
+    # 같은 회사 목록·연도·보고서는 같은 디렉토리를 사용하므로 재실행 시 성공한 회사는 건너뜀
+    output_dir = os.path.join(PORTFOLIO_OUTPUT_DIR, params['run_id'])
+    audit = PortfolioAudit(opendart_api, portfolio_analyzer, portfolio_model,
+                           output_dir=output_dir, llm_workers=PORTFOLIO_LLM_WORKERS)
+    portfolio = audit.run(params['corp_codes'], params['year'], params['report'], force=params.get('force', False))
+    portfolio['output_dir'] = output_dir
+    return portfolio
+
+portfolio_jobs = AnalysisJobQueue(
+    run_portfolio_job,
+    db_path=PORTFOLIO_JOB_DB_PATH,
+    workers=1,
+    result_ttl=float(os.getenv('AI_JOB_RESULT_TTL_HOURS', '24')) * 3600
+)
+
+@app.route('/portfolio-audit', methods=['POST'])
+def submit_portfolio_audit():
+    """
+    여러 회사의 AI 감사 리스크 분석 작업을 대기열에 넣고 작업 ID를 바로 반환합니다.
+    
+    본문: {"corp_codes": [...], "year": "2024", "report": "11011", "force": false}
+    """
+    values = request.get_json(silent=True) or {}
+    corp_codes = values.get('corp_codes')
+    if not isinstance(corp_codes, list) or not corp_codes:
+        return jsonify({'error': 'corp_codes 목록이 필요합니다.'}), 400
+    corp_codes = list(dict.fromkeys(str(corp_code).strip() for corp_code in corp_codes if str(corp_code).strip()))
+    if len(corp_codes) > MAX_PORTFOLIO_COMPANIES:
+        return jsonify({'error': f'한 번에 최대 {MAX_PORTFOLIO_COMPANIES}개 회사까지 분석할 수 있습니다.'}), 400
+    
+    year = str(values.get('year', '2023'))
+    report = str(values.get('report', '11011'))
+    digest = hashlib.sha256(','.join(sorted(corp_codes)).encode('utf-8')).hexdigest()[:16]
+    params = {
+        'corp_codes': corp_codes,
+        'year': year,
+        'report': report,
+        'force': bool(values.get('force', False)),
+        'run_id': f"{year}_{report}_{digest}"
+    }
+    
+    try:
+        job, deduplicated = portfolio_jobs.submit(params['run_id'], params)
+    except sqlite3.Error as e:
+        return jsonify({'error': f'작업을 등록할 수 없습니다: {str(e)}'}), 503
+    
+    return jsonify({
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'companies': len(corp_codes),
+        'deduplicated': deduplicated,
+        'status_url': url_for('get_portfolio_audit_job', job_id=job['job_id'])
+    }), 202
+
+@app.route('/portfolio-audit/jobs/<job_id>')
+def get_portfolio_audit_job(job_id):
+    """
+    포트폴리오 분석 작업의 상태와 결과를 반환합니다.
+    
+    wait=초를 주면 작업이 끝날 때까지 최대 30초 기다린 뒤 응답합니다. summary=1이면 회사별 결과를 뺍니다.
+    """
+    wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_JOB_WAIT_SECONDS)
+    job = portfolio_jobs.wait(job_id, wait) if wait else portfolio_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    if request.args.get('summary', '0') == '1' and job.get('result'):
+        job['result'].pop('results', None)
+    return jsonify(job)
+
+def sse_event(event, data):
+    """Server-Sent Events 형식의 메시지를 만듭니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/ai-audit-analysis/<corp_code>/stream')
+def ai_audit_analysis_stream(corp_code):
+    """
+    AI 감사 리스크 분석 스트리밍 엔드포인트 (Server-Sent Events)
+    
+    이벤트 순서: metrics(재무비율) → section(완성된 최상위 섹션마다) → complete 또는 error
+    파라미터는 /ai-audit-analysis와 같습니다.
+    """
+    year = request.args.get('year', '2023')
+    report = request.args.get('report', '11011')
+    use_cache = request.args.get('cache', '1') != '0'
+    refresh = request.args.get('refresh', '0') == '1'
+    
+    deadline = time.monotonic() + AI_ANALYSIS_FETCH_DEADLINE
+    futures = submit_analysis_inputs(corp_code, year, report)
+    company_future, financial_future, full_financial_future = futures
+    
+    def remaining():
+        return max(0, deadline - time.monotonic())
+    
+    def generate():
+        try:
+            try:
+                company_data = company_future.result(timeout=remaining())
+            except ConnectionError:
+                yield sse_event('error', {'error': '데이터베이스 연결 실패'})
+                return
+            if not company_data:
+                yield sse_event('error', {'error': '회사 정보를 찾을 수 없습니다.'})
+                return
+            
+            raw_data = financial_future.result(timeout=remaining())
+            if not raw_data:
+                yield sse_event('error', {'error': '재무 데이터를 가져올 수 없습니다.'})
+                return
+            
+            # 재무비율은 AI 분석을 기다리지 않고 바로 전송
+            metrics = opendart_api.get_key_metrics(opendart_api.parse_financial_data(raw_data))
+            yield sse_event('metrics', {'company': company_data, 'metrics': metrics, 'year': year, 'report': report})
+            
+            full_financial_data = {}
+            try:
+                full_financial_raw_data = full_financial_future.result(timeout=remaining())
+            except FuturesTimeoutError:
+                print(f"전체 재무제표 조회 시간 초과: {corp_code}")
+                full_financial_raw_data = None
+            if full_financial_raw_data:
+                full_financial_data = opendart_api.parse_full_financial_statements(full_financial_raw_data)
+            
+            for event in ai_analyzer.stream_financial_risks(company_data, metrics, full_financial_data,
+                                                            use_cache=use_cache, refresh=refresh):
+                if event['type'] == 'section':
+                    yield sse_event('section', {'key': event['key'], 'value': event['value']})
+                elif event['type'] == 'complete':
+                    yield sse_event('complete', {
+                        'success': True,
+                        'ai_analysis': event['analysis'],
+                        'cached': event['cached'],
+                        'cached_at': event.get('cached_at'),
+                        'prompt': event.get('prompt'),
+                        'latency_ms': event.get('latency_ms')
+                    })
+                else:
+                    yield sse_event('error', {'error': 'AI 분석 중 오류가 발생했습니다.', 'details': event['error']})
+        
+        except FuturesTimeoutError:
+            yield sse_event('error', {'error': '재무 데이터 조회 시간이 초과되었습니다.'})
+        except Exception as e:
+            yield sse_event('error', {'error': f'분석 중 오류가 발생했습니다: {str(e)}'})
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    # 프록시가 응답을 모아 두지 않도록 버퍼링을 끔
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/stats')
+def service_stats():
+    """캐시 적중률, 업스트림 응답 시간 등 운영 통계를 반환합니다."""
+    return jsonify({
+        'dart_cache': dart_cache.stats(),
+        'dart_latency': opendart_api.get_latency_stats(),
+        'financial_warehouse': financial_warehouse.stats(),
+        'chart_cache': chart_cache.stats(),
+        'corp_codes': corp_code_refresher.stats(),
+        'company_db': company_db.stats(),
+        'ai_analysis_cache': analysis_cache.stats() if analysis_cache else None,
+        'ai_requests': ai_analyzer.get_request_stats(),
+        'analysis_jobs': analysis_jobs.stats(),
+        'portfolio_jobs': portfolio_jobs.stats(),
+        'portfolio_model': {
+            'requests': portfolio_model.requests,
+            'failures': portfolio_model.failures,
+            'prompt_tokens': portfolio_model.prompt_tokens,
+            'output_tokens': portfolio_model.output_tokens,
+            'rate_limit_wait_s': round(portfolio_model.limiter.waited, 2)
+        }
+    })
 
 
 if __name__ == '__main__':
     if not os.path.exists('companies.db'):
-        print("데이터베이스가 없습니다. 먼저 xml_to_db.py를 실행해주세요.")
+        print("데이터베이스가 없습니다. 회사 목록을 받아 생성하는 중...")
+        corp_code_refresher.refresh()
+    
+    if not os.path.exists('companies.db'):
+        print("데이터베이스를 만들 수 없습니다. xml_to_db.py를 실행하거나 CORP_CODE_SOURCE를 확인해주세요.")
     else:
+        # 회사 목록 백그라운드 갱신 (CORP_CODE_REFRESH_HOURS=0이면 사용 안 함)
+        if corp_code_refresher.interval > 0:
+            corp_code_refresher.start()
+        
+        # 이전 실행에서 남은 AI 분석 작업 처리
+        analysis_jobs.start()
+        portfolio_jobs.start()
+        
         # Flask 설정을 환경변수에서 가져오기
         flask_debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
         flask_host = os.getenv('FLASK_HOST', '0.0.0.0')
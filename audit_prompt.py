@@ -0,0 +1,224 @@
+"""
+감사 리스크 분석 프롬프트 생성기
+
+프롬프트 토큰 수를 예산(max_input_tokens) 안으로 맞춥니다. 지시문과 응답 JSON 구조는
+한 번만 짧게 적고, 남은 예산에는 재무제표(BS/IS/CIS/CF/SCE) 전체에서 잔액이 크거나
+전기 대비 증감이 큰 계정부터 채웁니다. 금액은 백만원 단위로 표시합니다.
+"""
+import json
+from typing import Dict, List, Optional, Tuple
+
+# 재무제표 구분과 표시 이름 (프롬프트에 나오는 순서)
+STATEMENTS = (
+    ('BS', '재무상태표'),
+    ('IS', '손익계산서'),
+    ('CIS', '포괄손익계산서'),
+    ('CF', '현금흐름표'),
+    ('SCE', '자본변동표'),
+)
+
+# 예산이 허락하는 한 점수와 관계없이 먼저 넣는 핵심 계정
+KEY_ACCOUNTS = {
+    'BS': ('자산총계', '유동자산', '비유동자산', '부채총계', '유동부채', '비유동부채', '자본총계', '자기자본'),
+    'IS': ('수익(매출액)', '매출액', '매출총이익', '영업이익', '법인세비용차감전순이익', '당기순이익'),
+    'CF': ('영업활동현금흐름', '투자활동현금흐름', '재무활동현금흐름', '현금및현금성자산의증가'),
+}
+
+# 증감액은 잔액보다 가중치를 두어 평가 (분석적 절차는 변동이 큰 계정에 집중)
+CHANGE_WEIGHT = 2.0
+
+DEFAULT_MAX_INPUT_TOKENS = 1000
+
+_LEVEL = '높음/중간/낮음'
+
+RESPONSE_SCHEMA = {
+    "overall_risk_level": _LEVEL,
+    "overall_assessment": "전체 평가 요약",
+    "financial_risks": {
+        key: {"level": _LEVEL, "description": "설명", "indicators": ["지표"]}
+        for key in ('liquidity_risk', 'profitability_risk', 'leverage_risk', 'capital_structure_risk')
+    },
+    "audit_risk_factors": {
+        key: {"level": _LEVEL, "description": "설명", "factors": ["요인"]}
+        for key in ('inherent_risk', 'control_risk', 'detection_risk')
+    },
+    "material_misstatement_risks": [
+        {"area": area, "risk_level": _LEVEL, "description": "설명", "audit_procedures": ["절차"]}
+        for area in ('수익인식', '자산평가', '부채')
+    ],
+    "recommendations": {
+        "priority_areas": ["영역"],
+        "additional_procedures": ["절차"],
+        "focus_accounts": ["계정과목"],
+        "risk_mitigation": ["완화방안"]
+    },
+    "key_insights": ["인사이트 3개 내외"]
+}
+
+INSTRUCTIONS = (
+    "당신은 재무제표 감사 전문 공인회계사입니다. 아래 기업의 감사 착수 전 리스크 분석을 "
+    "한국 회계기준과 감사기준에 따라 실무적으로 수행하세요.\n"
+    "다룰 내용: 재무적 리스크(유동성·수익성·레버리지·자본구조), 감사위험(고유·통제·발견), "
+    "중요한 왜곡표시 위험(수익인식·자산평가·부채 누락·공정가치 측정), 추가 감사절차와 집중 검토 계정, "
+    "전체 리스크 등급과 근거."
+)
+
+ACCOUNTS_TITLE = "[재무제표 주요 계정, 백만원, 당기 / 전기]"
+OMITTED_NOTE = "(금액이 작거나 변동이 적은 {count}개 계정 생략)"
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사치 (ASCII는 약 4자, 한글 등은 약 1.5자당 1토큰)"""
+    if not text:
+        return 0
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return int(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5) + 1
+
+
+def _statement_rows(table) -> List[Tuple[str, int, int]]:
+    """재무제표 하나의 (계정명, 당기 금액, 전기 금액) 목록 (CompactStatement는 딕셔너리를 만들지 않고 읽음)"""
+    if hasattr(table, 'column'):
+        current = table.column('thstrm_amount')
+        previous = table.column('frmtrm_amount')
+        return [(name, current[row], previous[row]) for name, row in
+                ((name, table.find_row(name)) for name in table)]
+
+    rows = []
+    for name, account in table.items():
+        rows.append((name,
+                     (account.get('current_period') or {}).get('amount') or 0,
+                     (account.get('previous_period') or {}).get('amount') or 0))
+    return rows
+
+
+def _format_millions(amount: int) -> str:
+    return f"{round(amount / 1_000_000):,}"
+
+
+def format_account_line(name: str, current: int, previous: int) -> str:
+    """계정 한 줄: '- 계정명: 당기 / 전기 (증감률)' (백만원)"""
+    if previous:
+        change = f" ({(current - previous) / abs(previous) * 100:+.1f}%)"
+    elif current:
+        change = " (신규)"
+    else:
+        change = ""
+    return f"- {name}: {_format_millions(current)} / {_format_millions(previous)}{change}"
+
+
+class AuditPromptBuilder:
+    """토큰 예산 안에서 정보량이 많은 계정을 골라 감사 리스크 분석 프롬프트를 만듭니다."""
+
+    def __init__(self, max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS):
+        """
+        Args:
+            max_input_tokens: 프롬프트 최대 토큰 수 (근사치 기준, 0이면 모든 계정 포함)
+        """
+        self.max_input_tokens = max_input_tokens
+        self._schema_text = json.dumps(RESPONSE_SCHEMA, ensure_ascii=False, separators=(',', ':'))
+
+    def _base_prompt(self, company_data: Dict, financial_metrics: Dict) -> Tuple[str, str]:
+        """계정 목록 앞뒤에 들어가는 고정 부분 (머리말, 꼬리말)"""
+        metrics = financial_metrics or {}
+        head = (
+            f"{INSTRUCTIONS}\n\n"
+            f"[기업] {company_data.get('corp_name', 'N/A')} "
+            f"(기업코드 {company_data.get('corp_code', 'N/A')}, 주식코드 {company_data.get('stock_code', 'N/A')})\n"
+            f"[재무비율 %] 유동비율 {metrics.get('current_ratio', 0)}, 부채비율 {metrics.get('debt_ratio', 0)}, "
+            f"자기자본비율 {metrics.get('equity_ratio', 0)}, 영업이익률 {metrics.get('operating_margin', 0)}, "
+            f"순이익률 {metrics.get('net_margin', 0)}, ROA {metrics.get('roa', 0)}, ROE {metrics.get('roe', 0)}\n"
+        )
+        tail = (
+            f"\n응답은 다음 JSON 구조로만 작성하세요 (level·risk_level 값은 {_LEVEL}):\n"
+            f"{self._schema_text}"
+        )
+        return head, tail
+
+    @staticmethod
+    def rank_accounts(full_financial_data: Dict) -> List[Dict]:
+        """
+        모든 재무제표의 계정을 정보량 순으로 정렬합니다.
+
+        점수는 재무제표별 최대 잔액 대비 (잔액 + 증감액 × CHANGE_WEIGHT)이며, 핵심 계정이 가장 앞에 옵니다.
+        손익계산서와 포괄손익계산서에 같은 금액으로 중복된 계정은 한 번만 남깁니다.
+        """
+        candidates = []
+        seen = set()
+        for order, (sj_div, _) in enumerate(STATEMENTS):
+            table = full_financial_data.get(sj_div)
+            if not table:
+                continue
+            rows = [row for row in _statement_rows(table) if row[1] or row[2]]
+            if not rows:
+                continue
+            scale = max(max(abs(current), abs(previous)) for _, current, previous in rows)
+            key_accounts = KEY_ACCOUNTS.get(sj_div, ())
+            for position, (name, current, previous) in enumerate(rows):
+                if (name, current, previous) in seen:
+                    continue
+                seen.add((name, current, previous))
+                score = (max(abs(current), abs(previous)) + CHANGE_WEIGHT * abs(current - previous)) / scale
+                candidates.append({
+                    'sj_div': sj_div,
+                    'name': name,
+                    'current': current,
+                    'previous': previous,
+                    'key': name in key_accounts,
+                    'score': score,
+                    'position': (order, position)
+                })
+        candidates.sort(key=lambda candidate: (not candidate['key'], -candidate['score']))
+        return candidates
+
+    def build(self, company_data: Dict, financial_metrics: Dict, full_financial_data: Optional[Dict] = None) -> Dict:
+        """
+        프롬프트를 만듭니다.
+
+        Returns:
+            {'prompt', 'prompt_tokens', 'prompt_chars', 'accounts_total', 'accounts_included', 'max_input_tokens'}
+        """
+        head, tail = self._base_prompt(company_data, financial_metrics)
+        candidates = self.rank_accounts(full_financial_data) if full_financial_data else []
+
+        names = dict(STATEMENTS)
+        budget = self.max_input_tokens or float('inf')
+        # 고정 부분과 목록 제목·생략 안내 줄을 먼저 예산에서 뺌
+        used = (estimate_tokens(head) + estimate_tokens(tail) + estimate_tokens(ACCOUNTS_TITLE)
+                + estimate_tokens(OMITTED_NOTE.format(count=len(candidates))))
+        selected = []
+        headed = set()
+        for candidate in candidates:
+            line = format_account_line(candidate['name'], candidate['current'], candidate['previous'])
+            cost = estimate_tokens(line)
+            if candidate['sj_div'] not in headed:
+                cost += estimate_tokens(f"{names[candidate['sj_div']]}:")
+            if used + cost > budget:
+                continue
+            used += cost
+            headed.add(candidate['sj_div'])
+            selected.append((candidate['position'], candidate['sj_div'], line))
+
+        lines = []
+        if selected:
+            lines.append(ACCOUNTS_TITLE)
+            current_div = None
+            for _, sj_div, line in sorted(selected):
+                if sj_div != current_div:
+                    lines.append(f"{names[sj_div]}:")
+                    current_div = sj_div
+                lines.append(line)
+            omitted = len(candidates) - len(selected)
+            if omitted:
+                lines.append(OMITTED_NOTE.format(count=omitted))
+        elif not full_financial_data:
+            lines.append("[재무제표] 상세 데이터가 제공되지 않았습니다.")
+
+        prompt = head + ('\n'.join(lines) + '\n' if lines else '') + tail
+        return {
+            'prompt': prompt,
+            'prompt_tokens': estimate_tokens(prompt),
+            'prompt_chars': len(prompt),
+            'accounts_total': len(candidates),
+            'accounts_included': len(selected),
+            'max_input_tokens': self.max_input_tokens
+        }
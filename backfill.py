@@ -0,0 +1,413 @@
+"""
+과거 재무제표 일괄 적재 도구
+
+회사 목록 × 사업연도 × 보고서 코드 조합을 오픈다트에서 받아 재무 저장소(FinancialWarehouse)에
+기록합니다. 진행 상황은 체크포인트 데이터베이스에 저장되므로 중단 후 같은 명령을 다시
+실행하면 남은 작업부터 이어서 진행합니다.
+
+주요계정은 다중회사 API(fnlttMultiAcnt)로 100개 회사씩 묶어 받으므로 상장사 2,500개 × 10년
+사업보고서도 약 250회 호출이면 끝납니다. 전체 재무제표(--datasets full)는 회사마다 호출합니다.
+
+사용법:
+    python backfill.py --from-year 2015 --to-year 2024
+    python backfill.py --companies all --datasets key,full --reports 11011,11012 --daily-quota 19000 --wait
+    python backfill.py --stock-codes 005930,000660 --from-year 2020 --to-year 2024 --datasets full
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from financial_warehouse import FinancialWarehouse
+from opendart_api import OpenDartAPI
+
+# 오픈다트 호출 한도는 한국 시간 자정에 초기화됨
+KST = timezone(timedelta(hours=9))
+
+REPORT_CODES = ('11011', '11012', '11013', '11014')
+
+
+class RateLimiter:
+    """초당 요청 수를 제한하는 스레드 안전 레이트 리미터"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """다음 요청 가능 시각까지 대기합니다."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+class BackfillCheckpoint:
+    """
+    적재 진행 상황과 일별 호출 수를 저장하는 체크포인트 (SQLite)
+
+    작업 단위는 (dataset, corp_code, bsns_year, reprt_code, fs_div)이며 상태는
+    done(저장 완료), empty(데이터 없음), pending(재시도 대상) 중 하나입니다.
+    """
+
+    def __init__(self, db_path: str = os.path.join('data', 'backfill_checkpoint.db')):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        data_dir = os.path.dirname(db_path)
+        if data_dir and not os.path.exists(data_dir):
+            os.makedirs(data_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                dataset TEXT NOT NULL,
+                corp_code TEXT NOT NULL,
+                bsns_year TEXT NOT NULL,
+                reprt_code TEXT NOT NULL,
+                fs_div TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (dataset, bsns_year, reprt_code, fs_div, corp_code)
+            );
+
+            CREATE TABLE IF NOT EXISTS quota (
+                day TEXT PRIMARY KEY,
+                calls INTEGER NOT NULL
+            );
+        ''')
+        self.conn.commit()
+
+    def finished(self, dataset: str, bsns_year: str, reprt_code: str, fs_div: str, max_attempts: int) -> set:
+        """완료했거나 재시도 횟수를 다 쓴 회사의 고유번호 집합을 반환합니다."""
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT corp_code FROM tasks
+                WHERE dataset = ? AND bsns_year = ? AND reprt_code = ? AND fs_div = ?
+                  AND (status != 'pending' OR attempts >= ?)
+            ''', (dataset, bsns_year, reprt_code, fs_div, max_attempts)).fetchall()
+        return {row[0] for row in rows}
+
+    def record(self, dataset: str, bsns_year: str, reprt_code: str, fs_div: str,
+               results: Dict[str, str]):
+        """
+        회사별 결과를 기록합니다.
+
+        Args:
+            results: {고유번호: 'done' | 'empty' | 'pending'}
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany('''
+                INSERT INTO tasks (dataset, corp_code, bsns_year, reprt_code, fs_div, status, attempts, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT(dataset, bsns_year, reprt_code, fs_div, corp_code) DO UPDATE SET
+                    status = excluded.status,
+                    attempts = tasks.attempts + 1,
+                    updated_at = excluded.updated_at
+            ''', [(dataset, corp_code, bsns_year, reprt_code, fs_div, status, now)
+                  for corp_code, status in results.items()])
+
+    def calls_today(self, day: str) -> int:
+        """해당 날짜(한국 시간)에 사용한 호출 수를 반환합니다."""
+        with self._lock:
+            row = self.conn.execute('SELECT calls FROM quota WHERE day = ?', (day,)).fetchone()
+        return row[0] if row else 0
+
+    def add_calls(self, day: str, calls: int):
+        """해당 날짜의 호출 수를 늘립니다."""
+        if calls <= 0:
+            return
+        with self._lock, self.conn:
+            self.conn.execute('''
+                INSERT INTO quota (day, calls) VALUES (?, ?)
+                ON CONFLICT(day) DO UPDATE SET calls = quota.calls + excluded.calls
+            ''', (day, calls))
+
+    def summary(self) -> Dict[str, int]:
+        """상태별 작업 수를 반환합니다."""
+        with self._lock:
+            rows = self.conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall()
+        return dict(rows)
+
+
+class Backfill:
+    """체크포인트와 일일 호출 한도를 지키며 재무제표를 일괄 적재합니다."""
+
+    def __init__(self, api: OpenDartAPI, checkpoint: BackfillCheckpoint, concurrency: int = 4,
+                 rate_limit: float = 5, daily_quota: int = 19000, max_attempts: int = 3,
+                 wait_for_quota: bool = False):
+        """
+        Args:
+            api: 재무 저장소가 설정된 OpenDartAPI
+            checkpoint: 진행 상황 저장소
+            concurrency: 동시에 실행할 호출 수
+            rate_limit: 초당 최대 호출 수
+            daily_quota: 하루(한국 시간) 최대 호출 수 (오픈다트 기본 한도는 20,000회)
+            max_attempts: 응답이 없을 때 재시도할 최대 횟수 (이후에는 건너뜀)
+            wait_for_quota: 한도를 다 쓰면 다음 날까지 기다렸다가 계속할지 여부
+        """
+        self.api = api
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.daily_quota = daily_quota
+        self.max_attempts = max_attempts
+        self.wait_for_quota = wait_for_quota
+
+        self._calls_seen = self._total_calls()
+        self.completed = 0
+        self.stored = 0
+
+    def _total_calls(self) -> int:
+        """지금까지 실제로 보낸 HTTP 요청 수 (재시도 포함)"""
+        return sum(stats['count'] for stats in self.api.get_latency_stats().values())
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(KST).strftime('%Y-%m-%d')
+
+    def _sync_quota(self) -> int:
+        """새로 보낸 요청 수를 체크포인트에 반영하고 오늘 남은 호출 수를 반환합니다."""
+        total = self._total_calls()
+        day = self._today()
+        self.checkpoint.add_calls(day, total - self._calls_seen)
+        self._calls_seen = total
+        return self.daily_quota - self.checkpoint.calls_today(day)
+
+    def _work_items(self, corp_codes: List[str], years: List[str], reports: List[str],
+                    datasets: List[str], fs_div: str) -> Iterator[Tuple[str, str, str, str, List[str]]]:
+        """남은 작업을 (dataset, bsns_year, reprt_code, fs_div, 회사 목록) 단위로 만듭니다."""
+        for bsns_year in years:
+            for reprt_code in reports:
+                for dataset in datasets:
+                    task_fs_div = fs_div if dataset == FinancialWarehouse.SOURCE_FULL else ''
+                    finished = self.checkpoint.finished(dataset, bsns_year, reprt_code, task_fs_div,
+                                                        self.max_attempts)
+                    pending = [corp_code for corp_code in corp_codes if corp_code not in finished]
+                    if dataset == FinancialWarehouse.SOURCE_KEY:
+                        size = OpenDartAPI.MULTI_ACCOUNT_MAX_CORPS
+                        for i in range(0, len(pending), size):
+                            yield dataset, bsns_year, reprt_code, task_fs_div, pending[i:i + size]
+                    else:
+                        for corp_code in pending:
+                            yield dataset, bsns_year, reprt_code, task_fs_div, [corp_code]
+
+    def _run_item(self, dataset: str, bsns_year: str, reprt_code: str, fs_div: str,
+                  corp_codes: List[str]) -> int:
+        """작업 하나를 실행하고 결과를 체크포인트에 기록합니다. 저장한 회사 수를 반환합니다."""
+        self.rate_limiter.acquire()
+
+        # 호출이 성공했거나(000) 데이터가 없다는 응답(013)이면 결과가 확정된 것이고,
+        # 네트워크/HTTP 오류나 요청 제한(020) 등은 다음 실행에서 다시 시도
+        if dataset == FinancialWarehouse.SOURCE_KEY:
+            warehouse = self.api.warehouse
+            results = {corp_code: 'done' for corp_code in corp_codes
+                       if warehouse.has_filing(dataset, corp_code, bsns_year, reprt_code)}
+            missing = [corp_code for corp_code in corp_codes if corp_code not in results]
+            if missing:
+                found, status = self.api.fetch_multi_account(missing, bsns_year, reprt_code)
+                for corp_code in missing:
+                    if corp_code in found:
+                        results[corp_code] = 'done'
+                    else:
+                        results[corp_code] = 'empty' if status in ('000', '013') else 'pending'
+        else:
+            raw_data, status = self.api.fetch_full_financial_statements(corp_codes[0], bsns_year, reprt_code, fs_div)
+            if raw_data:
+                results = {corp_codes[0]: 'done'}
+            else:
+                results = {corp_codes[0]: 'empty' if status == '013' else 'pending'}
+
+        self.checkpoint.record(dataset, bsns_year, reprt_code, fs_div, results)
+        return sum(1 for status in results.values() if status == 'done')
+
+    def _wait_until_tomorrow(self):
+        """다음 날 한국 시간 자정(+1분)까지 기다립니다."""
+        now = datetime.now(KST)
+        resume_at = (now + timedelta(days=1)).replace(hour=0, minute=1, second=0, microsecond=0)
+        print(f"일일 호출 한도에 도달했습니다. {resume_at:%Y-%m-%d %H:%M} (KST)까지 대기합니다.")
+        time.sleep((resume_at - now).total_seconds())
+
+    def run(self, corp_codes: List[str], years: List[str], reports: List[str],
+            datasets: List[str], fs_div: str = 'CFS') -> bool:
+        """
+        남은 작업을 모두 실행합니다.
+
+        Returns:
+            모든 작업을 마쳤으면 True, 호출 한도나 중단으로 멈췄으면 False
+        """
+        items = self._work_items(corp_codes, years, reports, datasets, fs_div)
+        started = time.perf_counter()
+        in_flight = {}
+        exhausted = False
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            while True:
+                # 남은 한도 안에서만 새 작업 투입 (진행 중인 작업도 한 번씩 호출한다고 가정)
+                remaining = self._sync_quota() - len(in_flight)
+                while not exhausted and len(in_flight) < self.concurrency and remaining > 0:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    in_flight[executor.submit(self._run_item, *item)] = item
+                    remaining -= 1
+
+                if not in_flight:
+                    if exhausted:
+                        return True
+                    if not self.wait_for_quota:
+                        print("일일 호출 한도에 도달했습니다. 같은 명령을 다시 실행하면 이어서 진행합니다.")
+                        return False
+                    self._wait_until_tomorrow()
+                    continue
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dataset, bsns_year, reprt_code, _, chunk = in_flight.pop(future)
+                    try:
+                        self.stored += future.result()
+                    except Exception as e:
+                        print(f"적재 오류 ({dataset} {bsns_year} {reprt_code}): {e}")
+                    self.completed += 1
+                    if self.completed % 50 == 0:
+                        self._print_progress(started)
+        except KeyboardInterrupt:
+            print("\n중단 요청을 받았습니다. 진행 중인 호출을 마무리합니다...")
+            for future in in_flight:
+                future.cancel()
+            return False
+        finally:
+            executor.shutdown(wait=True)
+            self._sync_quota()
+            self._print_progress(started)
+
+    def _print_progress(self, started: float):
+        elapsed = time.perf_counter() - started
+        used = self.checkpoint.calls_today(self._today())
+        print(f"작업 {self.completed:,}건 완료, 회사-보고서 {self.stored:,}건 저장, "
+              f"오늘 호출 {used:,}/{self.daily_quota:,}회, {elapsed:.0f}초 경과")
+
+
+def select_companies(db_path: str, companies: str, stock_codes: Optional[str]) -> List[str]:
+    """
+    적재할 회사의 고유번호 목록을 만듭니다.
+
+    Args:
+        db_path: 회사 데이터베이스 경로
+        companies: 'listed'(상장사) 또는 'all'(전체)
+        stock_codes: 쉼표로 구분한 주식코드 또는 '@파일경로' (지정하면 companies 무시)
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        if stock_codes:
+            if stock_codes.startswith('@'):
+                with open(stock_codes[1:], 'r', encoding='utf-8') as f:
+                    codes = [line.strip() for line in f if line.strip()]
+            else:
+                codes = [code.strip() for code in stock_codes.split(',') if code.strip()]
+            placeholders = ', '.join('?' * len(codes))
+            rows = conn.execute(
+                f'SELECT corp_code, trim(stock_code) FROM companies WHERE trim(stock_code) IN ({placeholders})',
+                codes
+            ).fetchall()
+            found = {stock_code for _, stock_code in rows}
+            for code in codes:
+                if code not in found:
+                    print(f"주식코드 {code}에 해당하는 회사를 찾을 수 없습니다.")
+            return [corp_code for corp_code, _ in rows]
+
+        if companies == 'listed':
+            rows = conn.execute(
+                "SELECT corp_code FROM companies WHERE trim(coalesce(stock_code, '')) != '' ORDER BY corp_code"
+            ).fetchall()
+        else:
+            rows = conn.execute('SELECT corp_code FROM companies ORDER BY corp_code').fetchall()
+        return [row[0] for row in rows]
+    finally:
+        conn.close()
+
+
+def main():
+    """메인 함수"""
+    load_dotenv()
+    current_year = datetime.now(KST).year
+
+    parser = argparse.ArgumentParser(description='오픈다트 재무제표 일괄 적재 (중단 후 이어서 실행 가능)')
+    parser.add_argument('--companies', choices=('listed', 'all'), default='listed', help='적재할 회사 범위')
+    parser.add_argument('--stock-codes', help="쉼표로 구분한 주식코드 또는 '@파일경로' (지정하면 --companies 무시)")
+    parser.add_argument('--from-year', type=int, default=current_year - 10, help='시작 사업연도')
+    parser.add_argument('--to-year', type=int, default=current_year - 1, help='마지막 사업연도')
+    parser.add_argument('--reports', default='11011', help='쉼표로 구분한 보고서 코드 (11011,11012,11013,11014)')
+    parser.add_argument('--datasets', default='key', help='key(주요계정), full(전체 재무제표) 중 쉼표로 구분')
+    parser.add_argument('--fs-div', default='CFS', choices=('CFS', 'OFS'), help='전체 재무제표의 연결/개별 구분')
+    parser.add_argument('--concurrency', type=int, default=4, help='동시 호출 수')
+    parser.add_argument('--rate-limit', type=float, default=5, help='초당 최대 호출 수')
+    parser.add_argument('--daily-quota', type=int, default=19000, help='하루 최대 호출 수 (한국 시간 기준)')
+    parser.add_argument('--max-attempts', type=int, default=3, help='응답이 없는 작업의 최대 시도 횟수')
+    parser.add_argument('--wait', action='store_true', help='호출 한도를 다 쓰면 다음 날까지 기다렸다가 계속')
+    parser.add_argument('--db', default='companies.db', help='회사 데이터베이스 경로')
+    parser.add_argument('--warehouse', default=os.getenv('FINANCIAL_WAREHOUSE_PATH', os.path.join('data', 'financials.db')),
+                        help='재무 저장소 경로')
+    parser.add_argument('--checkpoint', default=os.path.join('data', 'backfill_checkpoint.db'), help='체크포인트 경로')
+    args = parser.parse_args()
+
+    api_key = os.getenv('OPENDART_API_KEY')
+    if not api_key:
+        print("OPENDART_API_KEY 환경변수가 설정되지 않았습니다.")
+        return 1
+
+    reports = [code.strip() for code in args.reports.split(',') if code.strip()]
+    datasets = [name.strip() for name in args.datasets.split(',') if name.strip()]
+    invalid = [code for code in reports if code not in REPORT_CODES]
+    invalid += [name for name in datasets if name not in (FinancialWarehouse.SOURCE_KEY, FinancialWarehouse.SOURCE_FULL)]
+    if invalid:
+        print(f"알 수 없는 보고서 코드/데이터셋: {', '.join(invalid)}")
+        return 1
+
+    corp_codes = select_companies(args.db, args.companies, args.stock_codes)
+    years = [str(year) for year in range(args.from_year, args.to_year + 1)]
+    if not corp_codes or not years:
+        print("적재할 회사 또는 사업연도가 없습니다.")
+        return 1
+
+    print(f"회사 {len(corp_codes):,}개 × {len(years)}개 연도 × 보고서 {', '.join(reports)} "
+          f"({', '.join(datasets)}) 적재를 시작합니다.")
+
+    api = OpenDartAPI(api_key, warehouse=FinancialWarehouse(args.warehouse), pool_size=args.concurrency)
+    backfill = Backfill(
+        api,
+        BackfillCheckpoint(args.checkpoint),
+        concurrency=args.concurrency,
+        rate_limit=args.rate_limit,
+        daily_quota=args.daily_quota,
+        max_attempts=args.max_attempts,
+        wait_for_quota=args.wait
+    )
+
+    finished = backfill.run(corp_codes, years, reports, datasets, args.fs_div)
+    print(f"작업 상태: {backfill.checkpoint.summary()}")
+    if finished:
+        print("적재가 완료되었습니다!")
+        return 0
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
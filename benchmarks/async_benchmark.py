@@ -0,0 +1,124 @@
+"""
+비동기 일괄 조회 벤치마크: 로컬 가짜 DART 서버로 OpenDartAPI 순차 조회와 AsyncOpenDartAPI 동시 조회를 비교합니다.
+
+가짜 서버는 응답마다 지정한 지연을 두고, 일부 회사는 첫 요청에 503을 돌려주며(재시도 확인),
+일부 회사는 013(조회된 데이터 없음)을 돌려줍니다. 두 방식의 결과가 같은지, 서버에 동시에
+들어온 요청 수가 concurrency를 넘지 않았는지 확인합니다.
+
+사용법:
+    python benchmarks/async_benchmark.py --companies 200 --latency 0.05 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from opendart_api import OpenDartAPI
+from opendart_async import AsyncOpenDartAPI
+
+
+class StubDartServer:
+    """fnlttSinglAcnt.json / fnlttSinglAcntAll.json만 흉내 내는 가짜 DART 서버"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self._failed_once = set()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        corp_code = request.query['corp_code']
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            number = int(corp_code)
+            if number % 10 == 3 and corp_code not in self._failed_once:
+                self._failed_once.add(corp_code)
+                return web.Response(status=503)
+            if number % 10 == 7:
+                return web.json_response({'status': '013', 'message': '조회된 데이타가 없습니다.'})
+            return web.json_response({'status': '000', 'message': '정상', 'list': [
+                {'corp_code': corp_code, 'bsns_year': request.query['bsns_year'], 'fs_div': 'CFS', 'sj_div': 'BS',
+                 'account_nm': '자산총계', 'thstrm_amount': f"{number * 1000:,}", 'frmtrm_amount': '0'}
+            ]})
+        finally:
+            self.in_flight -= 1
+
+
+def start_server(stub: StubDartServer, port: int) -> str:
+    """가짜 서버를 별도 스레드의 이벤트 루프에서 실행하고 base_url을 반환합니다."""
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.router.add_get('/api/{endpoint}', stub.handle)
+    runner = web.AppRunner(app, access_log=None)
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', port).start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return f"http://127.0.0.1:{port}/api"
+
+
+async def fetch_async(base_url: str, corp_codes, concurrency: int, rate_limit: float):
+    results = {}
+    async with AsyncOpenDartAPI('stub', concurrency=concurrency, rate_limit=rate_limit, backoff_base=0.05) as api:
+        api.base_url = base_url
+        async for corp_code, raw in api.fetch_financial_data_many(corp_codes, '2023'):
+            results[corp_code] = raw
+        stats = api.get_latency_stats()
+    return results, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='비동기 일괄 조회 벤치마크 (가짜 DART 서버)')
+    parser.add_argument('--companies', type=int, default=200, help='조회할 회사 수')
+    parser.add_argument('--latency', type=float, default=0.05, help='가짜 서버 응답 지연(초)')
+    parser.add_argument('--concurrency', type=int, default=20, help='비동기 동시 요청 수')
+    parser.add_argument('--rate-limit', type=float, default=0, help='초당 최대 요청 수 (0이면 제한 없음)')
+    parser.add_argument('--port', type=int, default=8765, help='가짜 서버 포트')
+    args = parser.parse_args()
+
+    stub = StubDartServer(args.latency)
+    base_url = start_server(stub, args.port)
+    corp_codes = [f"{number:08d}" for number in range(1, args.companies + 1)]
+
+    sync_api = OpenDartAPI('stub', backoff_base=0.05)
+    sync_api.base_url = base_url
+    started = time.perf_counter()
+    sync_results = {corp_code: sync_api.get_financial_data(corp_code, '2023') for corp_code in corp_codes}
+    sync_s = time.perf_counter() - started
+
+    stub.max_in_flight = 0
+    stub._failed_once.clear()
+    started = time.perf_counter()
+    async_results, stats = asyncio.run(fetch_async(base_url, corp_codes, args.concurrency, args.rate_limit))
+    async_s = time.perf_counter() - started
+
+    endpoint = stats.get('fnlttSinglAcnt.json', {})
+    found = sum(1 for raw in async_results.values() if raw)
+    print(f"회사 수             {len(corp_codes)} (데이터 있음 {found}, 없음 {len(corp_codes) - found})")
+    print(f"순차 조회           {sync_s:6.2f}s")
+    print(f"비동기 조회         {async_s:6.2f}s ({sync_s / async_s:.1f}배)")
+    print(f"최대 동시 요청      {stub.max_in_flight} (concurrency {args.concurrency})")
+    print(f"비동기 재시도       {endpoint.get('retries', 0)}")
+    print(f"결과 일치           {sync_results == async_results}")
+    print(f"동시 요청 제한 준수 {stub.max_in_flight <= args.concurrency}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+corpCode.xml 적재 벤치마크: 기존 ET.parse 방식과 스트리밍(iterparse) 방식을 비교합니다.
+
+corp.xml의 회사들을 복제해 지정한 건수의 XML(및 zip)을 만들고, 각 방식의
+적재 시간과 파이썬 힙 최대 사용량(tracemalloc)을 측정합니다.
+(tracemalloc 추적 때문에 실제 적재 시간보다 느리게 측정되며, 방식 간 비교용입니다.)
+
+사용법:
+    python benchmarks/ingest_benchmark.py --rows 100000 --rows 400000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+import zipfile
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xml_to_db import COMPANY_FIELDS, create_database, iter_companies, parse_xml_and_insert
+
+
+def build_xml(source_path: str, rows: int, directory: str) -> str:
+    """원본 corp.xml을 복제하여 지정한 건수의 XML 파일을 만듭니다."""
+    companies = list(iter_companies(source_path))
+    path = os.path.join(directory, f'corp_{rows}.xml')
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<result>\n')
+        for i in range(rows):
+            values = list(companies[i % len(companies)])
+            values[0] = f'{i:08d}'
+            f.write('  <list>\n')
+            for field, value in zip(COMPANY_FIELDS, values):
+                f.write(f'    <{field}>{escape(value)}</{field}>\n')
+            f.write('  </list>\n')
+        f.write('</result>\n')
+    return path
+
+
+def build_zip(xml_path: str) -> str:
+    """DART 다운로드와 같은 형태(CORPCODE.xml 하나가 든 zip)로 압축합니다."""
+    path = xml_path[:-4] + '.zip'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.write(xml_path, 'CORPCODE.xml')
+    return path
+
+
+def legacy_ingest(conn: sqlite3.Connection, xml_path: str):
+    """기존 방식: 전체 트리와 목록을 메모리에 만든 뒤 한 번에 삽입합니다."""
+    root = ET.parse(xml_path).getroot()
+    companies_data = []
+    for list_item in root.findall('list'):
+        companies_data.append(tuple(
+            list_item.find(field).text if list_item.find(field) is not None else ''
+            for field in COMPANY_FIELDS
+        ))
+    conn.executemany('''
+        INSERT INTO companies (corp_code, corp_name, corp_eng_name, stock_code, modify_date)
+        VALUES (?, ?, ?, ?, ?)
+    ''', companies_data)
+    conn.commit()
+
+
+def streaming_ingest(conn: sqlite3.Connection, xml_path: str):
+    parse_xml_and_insert(conn, xml_path)
+
+
+def measure(func, source_path: str, directory: str):
+    """빈 데이터베이스에 적재하며 소요 시간(초)과 최대 힙 사용량(MB)을 측정합니다."""
+    db_path = os.path.join(directory, 'ingest_bench.db')
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = create_database(db_path)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(conn, source_path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = conn.execute('SELECT COUNT(*) FROM companies').fetchone()[0]
+    conn.close()
+    return elapsed, peak / 1024 / 1024, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='corpCode.xml 적재 벤치마크')
+    parser.add_argument('--source', default='corp.xml', help='원본 corp.xml 경로')
+    parser.add_argument('--rows', type=int, action='append', help='XML 건수 (여러 번 지정 가능)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    for rows in args.rows or [100000]:
+        xml_path = build_xml(args.source, rows, directory)
+        zip_path = build_zip(xml_path)
+        print(f"\n{rows:,}건 (XML {os.path.getsize(xml_path) / 1024 / 1024:.1f}MB, "
+              f"zip {os.path.getsize(zip_path) / 1024 / 1024:.1f}MB)")
+
+        cases = (
+            ('ET.parse', legacy_ingest, xml_path),
+            ('iterparse', streaming_ingest, xml_path),
+            ('iterparse(zip)', streaming_ingest, zip_path),
+        )
+        for name, func, path in cases:
+            elapsed, peak_mb, count = measure(func, path, directory)
+            print(f"{name:<15} {elapsed:7.2f}s  최대 힙 {peak_mb:8.1f}MB  {count:,}건")
+
+
+if __name__ == '__main__':
+    main()
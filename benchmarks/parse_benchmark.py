@@ -0,0 +1,215 @@
+"""
+재무제표 파싱 벤치마크: 기존 딕셔너리 파서와 compact_statements 파서를 비교합니다.
+
+가상의 전체 재무제표(fnlttSinglAcntAll) 응답과 주요계정(fnlttSinglAcnt) 응답을
+회사 수만큼 만들어, 파서마다 별도 프로세스에서 파싱 시간, 파싱 후 RSS 증가량,
+원본 응답을 버린 뒤 파싱 결과가 차지하는 메모리(tracemalloc)와 전체 계정 조회
+시간을 측정하고, 두 파서의 결과가 같은지 확인합니다. (RSS는 Linux에서만 측정)
+
+전체 계정 조회는 두 가지로 잽니다. 딕셔너리 조회는 계정마다 account['current_period']['amount']로
+읽는 기존 호출 방식이고, 열 조회는 audit_prompt처럼 column()으로 금액 열을 읽는 방식입니다.
+(기존 파서는 열 조회도 딕셔너리 방식으로 읽음)
+
+사용법:
+    python benchmarks/parse_benchmark.py --companies 500
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact_statements import CompactStatement, parse_full_statements, parse_key_accounts, to_plain
+from opendart_api import OpenDartAPI
+
+# 재무제표별 가상 계정 수 (실제 사업보고서 응답과 비슷한 규모)
+FULL_STATEMENT_ROWS = {'BS': 120, 'IS': 60, 'CIS': 30, 'CF': 150, 'SCE': 120}
+KEY_ACCOUNT_NAMES = ['유동자산', '비유동자산', '자산총계', '유동부채', '비유동부채', '부채총계',
+                     '이익잉여금', '자본총계', '매출액', '영업이익', '법인세차감전 순이익', '당기순이익']
+
+PARSERS = ('legacy_full', 'compact_full', 'legacy_key', 'compact_key')
+
+
+def _amount(rng: random.Random) -> str:
+    if rng.random() < 0.1:
+        return ''
+    return f"{rng.randint(-10 ** 9, 10 ** 13):,}"
+
+
+def build_full_response(corp: int, rng: random.Random) -> dict:
+    """전체 재무제표 응답과 같은 형식의 가상 데이터를 만듭니다."""
+    items = []
+    for sj_div, rows in FULL_STATEMENT_ROWS.items():
+        for row in range(rows):
+            items.append({
+                'rcept_no': '20250311001085', 'reprt_code': '11011', 'bsns_year': '2024',
+                'corp_code': f'{corp:08d}', 'sj_div': sj_div, 'sj_nm': sj_div,
+                'account_id': f'ifrs-full_{sj_div}Account{row}' if row % 4 else '-서브계정',
+                'account_nm': f'{sj_div} 계정 {row}', 'account_detail': '-',
+                'thstrm_nm': '제 56 기', 'thstrm_amount': _amount(rng), 'thstrm_add_amount': _amount(rng),
+                'frmtrm_nm': '제 55 기', 'frmtrm_amount': _amount(rng),
+                'frmtrm_q_nm': '', 'frmtrm_q_amount': '', 'frmtrm_add_amount': _amount(rng),
+                'bfefrmtrm_nm': '제 54 기', 'bfefrmtrm_amount': _amount(rng),
+                'ord': str(row + 1), 'currency': 'KRW'
+            })
+    return {'status': '000', 'message': '정상', 'list': items}
+
+
+def build_key_response(corp: int, rng: random.Random) -> dict:
+    """주요계정 응답과 같은 형식의 가상 데이터를 만듭니다."""
+    items = []
+    for fs_div in ('CFS', 'OFS'):
+        for row, account_nm in enumerate(KEY_ACCOUNT_NAMES):
+            items.append({
+                'rcept_no': '20250311001085', 'bsns_year': '2024', 'corp_code': f'{corp:08d}',
+                'stock_code': f'{corp:06d}', 'reprt_code': '11011', 'account_nm': account_nm,
+                'fs_div': fs_div, 'fs_nm': fs_div, 'sj_div': 'BS' if row < 8 else 'IS', 'sj_nm': '',
+                'thstrm_nm': '제 56 기', 'thstrm_dt': '2024.12.31 현재', 'thstrm_amount': _amount(rng),
+                'frmtrm_nm': '제 55 기', 'frmtrm_dt': '2023.12.31 현재', 'frmtrm_amount': _amount(rng),
+                'bfefrmtrm_nm': '제 54 기', 'bfefrmtrm_dt': '2022.12.31 현재', 'bfefrmtrm_amount': _amount(rng),
+                'ord': str(row + 1), 'currency': 'KRW'
+            })
+    return {'status': '000', 'message': '정상', 'list': items}
+
+
+def build_responses(parser_name: str, companies: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    build = build_full_response if parser_name.endswith('_full') else build_key_response
+    return [build(corp, rng) for corp in range(companies)]
+
+
+def get_parser(parser_name: str):
+    api = OpenDartAPI('benchmark')
+    return {
+        'legacy_full': api.parse_full_financial_statements,
+        'compact_full': parse_full_statements,
+        'legacy_key': api.parse_financial_data,
+        'compact_key': parse_key_accounts,
+    }[parser_name]
+
+
+def rss_mb() -> float:
+    """현재 프로세스의 RSS(MB). /proc이 없으면 0"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        return 0.0
+
+
+def read_all_amounts(parsed_list: list) -> int:
+    """모든 계정의 당기 금액을 딕셔너리 방식으로 조회합니다. (기존 호출 코드의 접근 비용)"""
+    total = 0
+    for parsed in parsed_list:
+        for key, statements in parsed.items():
+            if key == 'basic_info':
+                continue
+            tables = statements.values() if 'balance_sheet' in statements else [statements]
+            for table in tables:
+                for account in table.values():
+                    total += account['current_period']['amount']
+    return total
+
+
+def read_amount_columns(parsed_list: list) -> int:
+    """모든 계정의 당기 금액을 열 단위로 조회합니다. (CompactStatement는 column(), 딕셔너리는 기존 방식)"""
+    total = 0
+    for parsed in parsed_list:
+        for key, statements in parsed.items():
+            if key == 'basic_info':
+                continue
+            tables = statements.values() if 'balance_sheet' in statements else [statements]
+            for table in tables:
+                if isinstance(table, CompactStatement):
+                    total += sum(table.column('thstrm_amount'))
+                else:
+                    total += sum(account['current_period']['amount'] for account in table.values())
+    return total
+
+
+def run_child(parser_name: str, companies: int, repeat: int) -> dict:
+    """한 파서를 측정합니다. (별도 프로세스에서 실행)"""
+    parse = get_parser(parser_name)
+    responses = build_responses(parser_name, companies)
+    gc.collect()
+
+    # 첫 회차의 RSS 증가량과 전체 회차 중 가장 빠른 파싱 시간을 기록
+    rss_before = rss_mb()
+    parse_ms = rss_growth = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parsed = [parse(raw_data) for raw_data in responses]
+        elapsed = (time.perf_counter() - started) * 1000
+        parse_ms = elapsed if parse_ms is None else min(parse_ms, elapsed)
+        if rss_growth is None:
+            rss_growth = rss_mb() - rss_before
+
+    started = time.perf_counter()
+    read_all_amounts(parsed)
+    read_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    read_amount_columns(parsed)
+    column_ms = (time.perf_counter() - started) * 1000
+
+    # 파싱 결과가 원본 응답과 별도로 차지하는 메모리
+    del parsed
+    gc.collect()
+    tracemalloc.start()
+    parsed = [parse(raw_data) for raw_data in responses]
+    del responses
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+    tracemalloc.stop()
+
+    return {'parse_ms': parse_ms, 'rss_growth_mb': rss_growth, 'retained_mb': retained, 'read_ms': read_ms,
+            'column_ms': column_ms}
+
+
+def check_equal(companies: int) -> int:
+    """기존 파서와 compact 파서의 결과가 다른 회사 수를 반환합니다."""
+    mismatches = 0
+    for kind in ('full', 'key'):
+        legacy = get_parser(f'legacy_{kind}')
+        compact = get_parser(f'compact_{kind}')
+        for raw_data in build_responses(f'legacy_{kind}', companies):
+            if to_plain(compact(raw_data)) != legacy(raw_data):
+                mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='재무제표 파싱 벤치마크')
+    parser.add_argument('--companies', type=int, default=500, help='회사 수')
+    parser.add_argument('--repeat', type=int, default=3, help='파싱 반복 횟수 (가장 빠른 시간 사용)')
+    parser.add_argument('--child', choices=PARSERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.companies, args.repeat)))
+        return
+
+    rows = sum(FULL_STATEMENT_ROWS.values())
+    print(f"{args.companies:,}개 회사 (전체 재무제표 {rows}행, 주요계정 {len(KEY_ACCOUNT_NAMES) * 2}행)")
+    print(f"{'파서':<14}{'파싱':>11}{'RSS 증가':>12}{'결과 메모리':>13}{'딕셔너리 조회':>13}{'열 조회':>10}")
+    for parser_name in PARSERS:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', parser_name, '--companies', str(args.companies),
+             '--repeat', str(args.repeat)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{parser_name:<14}{result['parse_ms']:9.1f}ms{result['rss_growth_mb']:10.1f}MB"
+              f"{result['retained_mb']:11.1f}MB{result['read_ms']:11.1f}ms{result['column_ms']:8.1f}ms")
+
+    print(f"결과가 다른 회사        {check_equal(min(args.companies, 50)):d}")
+
+
+if __name__ == '__main__':
+    main()
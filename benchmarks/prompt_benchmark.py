@@ -0,0 +1,300 @@
+"""
+AI 분석 프롬프트 벤치마크: 기존 프롬프트와 토큰 예산 프롬프트(audit_prompt)를 비교합니다.
+
+고정 시드로 만든 표본 회사들의 전체 재무제표로 두 방식의 프롬프트를 만들어 토큰 수·글자 수,
+포함한 계정 수, 정보량 반영률(포함한 계정의 잔액+증감 점수 합 / 전체 점수 합)을 예산별로
+측정합니다. 모델 응답 시간은 입력 1,000토큰당 처리 시간을 흉내 내는 가짜 모델로 측정하며,
+--gemini를 주면 실제 Gemini로 처음 몇 개 회사를 측정합니다. (GEMINI_API_KEY 필요)
+
+사용법:
+    python benchmarks/prompt_benchmark.py --companies 20
+    python benchmarks/prompt_benchmark.py --gemini 3
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_analysis import AuditRiskAnalyzer
+from audit_prompt import AuditPromptBuilder, DEFAULT_MAX_INPUT_TOKENS, estimate_tokens, format_account_line
+from compact_statements import parse_full_statements
+from fake_model import FakeGenerativeModel
+
+# 재무제표별 계정명 (실제 사업보고서 전체 재무제표와 비슷한 구성, 부족한 행은 세부 계정으로 채움)
+ACCOUNT_NAMES = {
+    'BS': ['유동자산', '현금및현금성자산', '단기금융상품', '매출채권', '미수금', '선급금', '선급비용', '재고자산',
+           '기타유동자산', '비유동자산', '장기금융상품', '관계기업 투자', '유형자산', '무형자산', '사용권자산',
+           '투자부동산', '이연법인세자산', '기타비유동자산', '자산총계', '유동부채', '매입채무', '단기차입금',
+           '미지급금', '선수금', '예수금', '미지급비용', '당기법인세부채', '유동성장기부채', '충당부채',
+           '비유동부채', '사채', '장기차입금', '장기미지급금', '순확정급여부채', '이연법인세부채', '리스부채',
+           '부채총계', '자본금', '주식발행초과금', '이익잉여금', '기타자본항목', '비지배지분', '자본총계'],
+    'IS': ['매출액', '매출원가', '매출총이익', '판매비와관리비', '영업이익', '기타수익', '기타비용', '금융수익',
+           '금융비용', '지분법이익', '법인세비용차감전순이익', '법인세비용', '당기순이익', '지배기업 소유주지분',
+           '비지배지분', '기본주당이익', '희석주당이익'],
+    'CIS': ['당기순이익', '기타포괄손익', '확정급여제도의 재측정요소', '해외사업환산손익', '총포괄손익',
+            '지배기업 소유주지분', '비지배지분'],
+    'CF': ['영업활동현금흐름', '당기순이익', '조정', '영업활동으로 인한 자산부채의 변동', '이자의 수취',
+           '이자의 지급', '배당금의 수취', '법인세 납부액', '투자활동현금흐름', '단기금융상품의 순감소',
+           '유형자산의 처분', '유형자산의 취득', '무형자산의 취득', '관계기업 투자의 취득', '재무활동현금흐름',
+           '단기차입금의 순증가', '사채의 발행', '장기차입금의 상환', '배당금의 지급', '자기주식의 취득',
+           '현금및현금성자산의증가', '기초현금및현금성자산', '기말현금및현금성자산'],
+    'SCE': ['기초자본', '당기순이익', '기타포괄손익', '배당금', '자기주식의 취득', '주식보상비용',
+            '연결범위변동', '기말자본'],
+}
+STATEMENT_ROWS = {'BS': 120, 'IS': 60, 'CIS': 30, 'CF': 150, 'SCE': 120}
+
+
+def build_company(corp: int, rng: random.Random) -> dict:
+    """표본 회사 하나의 전체 재무제표 응답을 만듭니다. (규모와 변동폭은 회사·계정마다 다름)"""
+    scale = 10 ** rng.randint(10, 14)
+    items = []
+    for sj_div, rows in STATEMENT_ROWS.items():
+        names = ACCOUNT_NAMES[sj_div]
+        for row in range(rows):
+            base = names[row % len(names)]
+            name = base if row < len(names) else f"{base} - 세부항목 {row // len(names)}"
+            # 앞쪽 계정(합계·주요 계정)일수록 금액이 큼
+            previous = int(scale * rng.random() / (1 + row * rng.uniform(0.2, 2)))
+            current = int(previous * rng.lognormvariate(0, 0.3)) if rng.random() > 0.05 else 0
+            items.append({
+                'corp_code': f'{corp:08d}', 'bsns_year': '2024', 'reprt_code': '11011', 'sj_div': sj_div,
+                'account_id': '-', 'account_nm': name, 'account_detail': '-',
+                'thstrm_nm': '제 56 기', 'thstrm_amount': str(current), 'thstrm_add_amount': '',
+                'frmtrm_nm': '제 55 기', 'frmtrm_amount': str(previous), 'frmtrm_q_nm': '', 'frmtrm_q_amount': '',
+                'frmtrm_add_amount': '', 'bfefrmtrm_nm': '제 54 기', 'bfefrmtrm_amount': '',
+                'ord': str(row + 1), 'currency': 'KRW'
+            })
+    return {'status': '000', 'message': '정상', 'list': items}
+
+
+def build_sample(companies: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    sample = []
+    for corp in range(companies):
+        company = {'corp_name': f'표본회사{corp:02d}', 'corp_code': f'{corp:08d}', 'stock_code': f'{corp:06d}'}
+        metrics = {'current_ratio': round(rng.uniform(50, 250), 2), 'debt_ratio': round(rng.uniform(20, 400), 2),
+                   'equity_ratio': round(rng.uniform(10, 80), 2), 'operating_margin': round(rng.uniform(-10, 25), 2),
+                   'net_margin': round(rng.uniform(-15, 20), 2), 'roa': round(rng.uniform(-5, 12), 2),
+                   'roe': round(rng.uniform(-10, 25), 2)}
+        sample.append((company, metrics, parse_full_statements(build_company(corp, rng))))
+    return sample
+
+
+def legacy_prompt(company_data: dict, financial_metrics: dict, full_financial_data: dict) -> str:
+    """기존 _create_audit_risk_prompt와 같은 프롬프트 (비교용)"""
+    details = "**전체 재무제표 데이터:** 데이터가 제공되지 않았습니다."
+    if full_financial_data:
+        details = "**상세 재무제표 정보:**\n"
+        sections = (
+            ('BS', "\n📊 **재무상태표 주요 항목:**\n",
+             ['자산총계', '유동자산', '비유동자산', '부채총계', '유동부채', '비유동부채', '자본총계', '자기자본']),
+            ('IS', "\n📈 **손익계산서 주요 항목:**\n",
+             ['수익(매출액)', '매출액', '매출총이익', '영업이익', '법인세비용차감전순이익', '당기순이익']),
+            ('CF', "\n💰 **현금흐름표 주요 항목:**\n",
+             ['영업활동현금흐름', '투자활동현금흐름', '재무활동현금흐름', '현금및현금성자산의증가']),
+        )
+        for sj_div, title, accounts in sections:
+            data = full_financial_data.get(sj_div, {})
+            if data:
+                details += title
+                for account in accounts:
+                    if account in data:
+                        current_amount = data[account].get('current_period', {}).get('amount', 0)
+                        previous_amount = data[account].get('previous_period', {}).get('amount', 0)
+                        details += f"  - {account}: 당기 {current_amount:,}원, 전기 {previous_amount:,}원\n"
+        total_accounts = sum(len(full_financial_data.get(key, {})) for key in ('BS', 'IS', 'CF', 'CIS', 'SCE'))
+        details += f"\n📋 **전체 계정과목 수:** {total_accounts}개\n"
+
+    return f"""
+        당신은 경험이 풍부한 공인회계사이며, 재무제표 감사업무의 전문가입니다.
+        다음 기업에 대한 감사업무 수임 후, 감사업무 개시 전 리스크 분석을 수행해야 합니다.
+
+        **기업 정보:**
+        - 회사명: {company_data.get('corp_name', 'N/A')}
+        - 기업코드: {company_data.get('corp_code', 'N/A')}
+        - 주식코드: {company_data.get('stock_code', 'N/A')}
+
+        **재무비율 분석 결과:**
+        - 유동비율: {financial_metrics.get('current_ratio', 0)}%
+        - 부채비율: {financial_metrics.get('debt_ratio', 0)}%
+        - 자기자본비율: {financial_metrics.get('equity_ratio', 0)}%
+        - 영업이익률: {financial_metrics.get('operating_margin', 0)}%
+        - 순이익률: {financial_metrics.get('net_margin', 0)}%
+        - ROA: {financial_metrics.get('roa', 0)}%
+        - ROE: {financial_metrics.get('roe', 0)}%
+
+        {details}
+
+        다음 관점에서 종합적인 감사 리스크 분석을 수행하고, JSON 형태로 구조화된 보고서를 제공해주세요:
+
+        1. **재무적 리스크 (Financial Risks)**
+           - 유동성 위험
+           - 수익성 위험
+           - 레버리지 위험
+           - 자본 구조 위험
+
+        2. **감사 위험 요소 (Audit Risk Factors)**
+           - 고유위험 (Inherent Risk)
+           - 통제위험 (Control Risk)
+           - 발견위험 (Detection Risk)
+
+        3. **중요한 왜곡표시 위험 (Risk of Material Misstatement)**
+           - 수익 인식 관련 위험
+           - 자산 평가 위험
+           - 부채 누락 위험
+           - 공정가치 측정 위험
+
+        4. **권고사항 (Recommendations)**
+           - 추가 감사절차 필요 영역
+           - 집중 검토 대상 계정과목
+           - 리스크 완화 방안
+
+        5. **전체 리스크 등급**
+           - 높음/중간/낮음으로 분류
+           - 근거와 함께 제시
+
+        응답은 반드시 다음 JSON 구조를 따라주세요:
+
+        {{
+            "overall_risk_level": "높음/중간/낮음",
+            "overall_assessment": "전체적인 리스크 평가 요약",
+            "financial_risks": {{
+                "liquidity_risk": {{"level": "높음/중간/낮음", "description": "설명", "indicators": ["지표1", "지표2"]}},
+                "profitability_risk": {{"level": "높음/중간/낮음", "description": "설명", "indicators": ["지표1", "지표2"]}},
+                "leverage_risk": {{"level": "높음/중간/낮음", "description": "설명", "indicators": ["지표1", "지표2"]}},
+                "capital_structure_risk": {{"level": "높음/중간/낮음", "description": "설명", "indicators": ["지표1", "지표2"]}}
+            }},
+            "audit_risk_factors": {{
+                "inherent_risk": {{"level": "높음/중간/낮음", "description": "설명", "factors": ["요인1", "요인2"]}},
+                "control_risk": {{"level": "높음/중간/낮음", "description": "설명", "factors": ["요인1", "요인2"]}},
+                "detection_risk": {{"level": "높음/중간/낮음", "description": "설명", "factors": ["요인1", "요인2"]}}
+            }},
+            "material_misstatement_risks": [
+                {{"area": "수익인식", "risk_level": "높음/중간/낮음", "description": "설명", "audit_procedures": ["절차1", "절차2"]}},
+                {{"area": "자산평가", "risk_level": "높음/중간/낮음", "description": "설명", "audit_procedures": ["절차1", "절차2"]}},
+                {{"area": "부채", "risk_level": "높음/중간/낮음", "description": "설명", "audit_procedures": ["절차1", "절차2"]}}
+            ],
+            "recommendations": {{
+                "priority_areas": ["우선순위 영역1", "우선순위 영역2"],
+                "additional_procedures": ["추가 절차1", "추가 절차2"],
+                "focus_accounts": ["계정과목1", "계정과목2"],
+                "risk_mitigation": ["완화방안1", "완화방안2"]
+            }},
+            "key_insights": [
+                "핵심 인사이트 1",
+                "핵심 인사이트 2",
+                "핵심 인사이트 3"
+            ]
+        }}
+
+        한국 회계기준과 감사기준을 기반으로 전문적이고 실무적인 분석을 제공해주세요.
+        """
+
+
+def coverage(full_financial_data: dict, included_names: set) -> float:
+    """포함한 계정의 정보량 점수 합 / 전체 점수 합 (핵심 계정 가산점 제외)"""
+    ranked = AuditPromptBuilder.rank_accounts(full_financial_data)
+    total = sum(candidate['score'] for candidate in ranked)
+    covered = sum(candidate['score'] for candidate in ranked if (candidate['sj_div'], candidate['name']) in included_names)
+    return covered / total if total else 0.0
+
+
+def legacy_included(full_financial_data: dict) -> set:
+    accounts = {
+        'BS': ['자산총계', '유동자산', '비유동자산', '부채총계', '유동부채', '비유동부채', '자본총계', '자기자본'],
+        'IS': ['수익(매출액)', '매출액', '매출총이익', '영업이익', '법인세비용차감전순이익', '당기순이익'],
+        'CF': ['영업활동현금흐름', '투자활동현금흐름', '재무활동현금흐름', '현금및현금성자산의증가'],
+    }
+    return {(sj_div, name) for sj_div, names in accounts.items() for name in names
+            if name in full_financial_data.get(sj_div, {})}
+
+
+def builder_included(builder: AuditPromptBuilder, built: dict, full_financial_data: dict) -> set:
+    """프롬프트에 실제로 들어간 (재무제표, 계정명) 집합"""
+    lines = set(built['prompt'].splitlines())
+    return {(candidate['sj_div'], candidate['name']) for candidate in builder.rank_accounts(full_financial_data)
+            if format_account_line(candidate['name'], candidate['current'], candidate['previous']) in lines}
+
+
+def measure_latency(model, prompts: list) -> list:
+    latencies = []
+    for prompt in prompts:
+        started = time.perf_counter()
+        model.generate_content(prompt)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI 분석 프롬프트 벤치마크')
+    parser.add_argument('--companies', type=int, default=20, help='표본 회사 수')
+    parser.add_argument('--seed', type=int, default=0, help='표본 생성 시드')
+    parser.add_argument('--budgets', default=f'0,2000,{DEFAULT_MAX_INPUT_TOKENS},800',
+                        help='비교할 토큰 예산 (쉼표 구분, 0은 제한 없음)')
+    parser.add_argument('--seconds-per-1k-tokens', type=float, default=0.25,
+                        help='가짜 모델의 입력 1,000토큰당 처리 시간(초)')
+    parser.add_argument('--fake-seconds', type=float, default=0.5, help='가짜 모델의 출력 생성 시간(초)')
+    parser.add_argument('--gemini', type=int, default=0, help='실제 Gemini로 응답 시간을 잴 회사 수')
+    args = parser.parse_args()
+
+    sample = build_sample(args.companies, args.seed)
+    budgets = [int(budget) for budget in args.budgets.split(',')]
+
+    print(f"표본 회사 {len(sample)}개 (회사당 전체 재무제표 {sum(STATEMENT_ROWS.values())}행)")
+    print(f"{'방식':<16}{'평균 토큰':>10}{'최대 토큰':>10}{'평균 글자':>10}{'포함 계정':>10}{'정보량 반영':>12}")
+
+    legacy_prompts = [legacy_prompt(*entry) for entry in sample]
+    tokens = [estimate_tokens(prompt) for prompt in legacy_prompts]
+    included = [legacy_included(entry[2]) for entry in sample]
+    print(f"{'기존':<16}{statistics.mean(tokens):10.0f}{max(tokens):10d}"
+          f"{statistics.mean(len(prompt) for prompt in legacy_prompts):10.0f}"
+          f"{statistics.mean(len(names) for names in included):10.1f}"
+          f"{statistics.mean(coverage(entry[2], names) for entry, names in zip(sample, included)) * 100:11.1f}%")
+
+    default_prompts = None
+    for budget in budgets:
+        builder = AuditPromptBuilder(budget)
+        started = time.perf_counter()
+        builds = [builder.build(*entry) for entry in sample]
+        build_ms = (time.perf_counter() - started) * 1000 / len(sample)
+        tokens = [built['prompt_tokens'] for built in builds]
+        covered = [coverage(entry[2], builder_included(builder, built, entry[2]))
+                   for entry, built in zip(sample, builds)]
+        label = f"예산 {budget}" if budget else "예산 없음"
+        print(f"{label:<16}{statistics.mean(tokens):10.0f}{max(tokens):10d}"
+              f"{statistics.mean(built['prompt_chars'] for built in builds):10.0f}"
+              f"{statistics.mean(built['accounts_included'] for built in builds):10.1f}"
+              f"{statistics.mean(covered) * 100:11.1f}%   (생성 {build_ms:.2f}ms/회사)")
+        if budget == DEFAULT_MAX_INPUT_TOKENS:
+            default_prompts = [built['prompt'] for built in builds]
+
+    if default_prompts is None:
+        default_prompts = [AuditPromptBuilder().build(*entry)['prompt'] for entry in sample]
+
+    model = FakeGenerativeModel(total_time=args.fake_seconds, first_chunk_delay=0,
+                                seconds_per_1k_prompt_tokens=args.seconds_per_1k_tokens)
+    before = measure_latency(model, legacy_prompts)
+    after = measure_latency(model, default_prompts)
+    print(f"\n가짜 모델 응답 시간 (입력 1,000토큰당 {args.seconds_per_1k_tokens}s + 출력 {args.fake_seconds}s)")
+    print(f"  기존            평균 {statistics.mean(before) * 1000:7.0f}ms")
+    print(f"  예산 {DEFAULT_MAX_INPUT_TOKENS:<10} 평균 {statistics.mean(after) * 1000:7.0f}ms")
+
+    if args.gemini:
+        analyzer = AuditRiskAnalyzer()
+        for name, prompts in (('기존', legacy_prompts), (f'예산 {DEFAULT_MAX_INPUT_TOKENS}', default_prompts)):
+            results = []
+            for prompt in prompts[:args.gemini]:
+                started = time.perf_counter()
+                response = analyzer.model.generate_content(prompt)
+                metadata = getattr(response, 'usage_metadata', None)
+                results.append((time.perf_counter() - started, getattr(metadata, 'prompt_token_count', 0)))
+            print(f"  Gemini {name:<9} 평균 {statistics.mean(r[0] for r in results) * 1000:7.0f}ms, "
+                  f"입력 {statistics.mean(r[1] for r in results):.0f}토큰")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+재무지표 계산 벤치마크: get_key_metrics 반복 호출과 ratio_engine 일괄 계산을 비교합니다.
+
+시장 전체(기본 2,500개 회사 × 10년)에 해당하는 가상의 주요계정 데이터를 만들어
+두 방식의 소요 시간을 측정하고, 결과가 같은지 확인합니다.
+
+사용법:
+    python benchmarks/ratio_benchmark.py --companies 2500 --years 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from opendart_api import OpenDartAPI
+from ratio_engine import ACCOUNTS, accounts_from_parsed, compute_ratios, metrics_records
+
+
+def build_parsed(companies: int, years: int, seed: int = 0) -> dict:
+    """parse_financial_data와 같은 구조의 가상 재무데이터를 만듭니다."""
+    rng = random.Random(seed)
+    parsed = {}
+    for corp in range(companies):
+        for year in range(2024 - years + 1, 2025):
+            data = {'consolidated': {'balance_sheet': {}, 'income_statement': {}}}
+            for statement, account_nm in ACCOUNTS.values():
+                if rng.random() < 0.95:
+                    data['consolidated'][statement][account_nm] = {
+                        'current_period': {'amount': rng.randint(-10 ** 10, 10 ** 13)},
+                        'previous_period': {'amount': rng.randint(-10 ** 10, 10 ** 13)}
+                    }
+            parsed[(f'{corp:08d}', str(year))] = data
+    return parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='재무지표 계산 벤치마크')
+    parser.add_argument('--companies', type=int, default=2500, help='회사 수')
+    parser.add_argument('--years', type=int, default=10, help='연도 수')
+    args = parser.parse_args()
+
+    api = OpenDartAPI('benchmark')
+    parsed = build_parsed(args.companies, args.years)
+    print(f"{len(parsed):,}개 회사-연도")
+
+    started = time.perf_counter()
+    expected = {key: api.get_key_metrics(data) for key, data in parsed.items()}
+    loop_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    accounts = accounts_from_parsed(parsed)
+    layout_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    ratios = compute_ratios(accounts)
+    compute_ms = (time.perf_counter() - started) * 1000
+
+    records = metrics_records(ratios)
+    mismatches = sum(
+        records[key][name] != value
+        for key, metrics in expected.items()
+        for name, value in metrics.items()
+    )
+
+    print(f"get_key_metrics 반복    {loop_ms:9.1f}ms")
+    print(f"계정 배열 구성          {layout_ms:9.1f}ms")
+    print(f"일괄 지표 계산          {compute_ms:9.1f}ms ({len(ratios.columns)}개 지표)")
+    print(f"불일치 값               {mismatches:9d}")
+
+
+if __name__ == '__main__':
+    main()
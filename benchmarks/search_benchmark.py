@@ -0,0 +1,135 @@
+"""
+회사 검색 벤치마크: 기존 LIKE 쿼리와 FTS5 트라이그램 검색을 비교합니다.
+
+실제 corpCode.xml 규모(약 10만 건)를 재현하기 위해 companies.db의 회사들을
+복제한 임시 데이터베이스를 만들어 측정합니다.
+
+사용법:
+    python benchmarks/search_benchmark.py --rows 100000 --repeat 200 --threads 8
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from company_search import search_companies
+from xml_to_db import create_search_index
+
+QUERIES = ['삼성전자', '현대자동차', '테크놀로지', '바이오', 'Samsung', 'Electronics', '에너지솔루션', 'holdings']
+
+LIKE_SQL = '''
+    SELECT corp_code, corp_name, corp_eng_name, stock_code, modify_date
+    FROM companies
+    WHERE corp_name LIKE ? OR corp_eng_name LIKE ?
+    ORDER BY corp_name
+    LIMIT 50
+'''
+
+
+def build_database(source_path: str, rows: int) -> str:
+    """원본 회사 목록을 복제하여 지정한 행 수의 벤치마크용 데이터베이스를 만듭니다."""
+    source = sqlite3.connect(source_path)
+    companies = source.execute(
+        'SELECT corp_code, corp_name, corp_eng_name, stock_code, modify_date FROM companies'
+    ).fetchall()
+    source.close()
+
+    path = os.path.join(tempfile.mkdtemp(), 'companies_bench.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE companies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            corp_code TEXT NOT NULL,
+            corp_name TEXT NOT NULL,
+            corp_eng_name TEXT,
+            stock_code TEXT,
+            modify_date TEXT
+        )
+    ''')
+    conn.execute('CREATE INDEX idx_corp_name ON companies(corp_name)')
+
+    batch = []
+    for i in range(rows):
+        corp_code, corp_name, corp_eng_name, stock_code, modify_date = companies[i % len(companies)]
+        copy = i // len(companies)
+        if copy:
+            # 비상장 법인을 흉내 내어 이름을 변형하고 주식코드를 비움
+            corp_name = f'{corp_name}{copy}'
+            corp_eng_name = f'{corp_eng_name} {copy}' if corp_eng_name else corp_eng_name
+            stock_code = ' '
+        batch.append((f'{i:08d}', corp_name, corp_eng_name, stock_code, modify_date))
+    conn.executemany(
+        'INSERT INTO companies (corp_code, corp_name, corp_eng_name, stock_code, modify_date) VALUES (?, ?, ?, ?, ?)',
+        batch
+    )
+    conn.commit()
+    create_search_index(conn)
+    conn.close()
+    return path
+
+
+def run_like(conn: sqlite3.Connection, query: str):
+    return conn.execute(LIKE_SQL, (f'%{query}%', f'%{query}%')).fetchall()
+
+
+def run_fts(conn: sqlite3.Connection, query: str):
+    return search_companies(conn, query, limit=50)
+
+
+def measure(db_path: str, func, repeat: int, threads: int) -> list:
+    """쿼리별 소요 시간(ms)을 여러 스레드에서 동시에 측정합니다."""
+    timings = []
+    lock = threading.Lock()
+
+    def worker():
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        local = []
+        for i in range(repeat):
+            query = QUERIES[i % len(QUERIES)]
+            started = time.perf_counter()
+            func(conn, query)
+            local.append((time.perf_counter() - started) * 1000)
+        conn.close()
+        with lock:
+            timings.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return sorted(timings)
+
+
+def report(name: str, timings: list, elapsed: float):
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:<6} p50 {statistics.median(timings):8.3f}ms  p95 {p95:8.3f}ms  "
+          f"처리량 {len(timings) / elapsed:9.1f} qps")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='회사 검색 LIKE vs FTS5 벤치마크')
+    parser.add_argument('--source', default='companies.db', help='원본 companies.db 경로')
+    parser.add_argument('--rows', type=int, default=100000, help='벤치마크 데이터베이스 행 수')
+    parser.add_argument('--repeat', type=int, default=200, help='스레드당 쿼리 수')
+    parser.add_argument('--threads', type=int, default=4, help='동시 검색 스레드 수')
+    args = parser.parse_args()
+
+    db_path = build_database(args.source, args.rows)
+    print(f"벤치마크 데이터베이스: {db_path} ({args.rows:,}건)")
+
+    for name, func in (('LIKE', run_like), ('FTS5', run_fts)):
+        measure(db_path, func, len(QUERIES), 1)  # 워밍업
+        started = time.perf_counter()
+        timings = measure(db_path, func, args.repeat, args.threads)
+        report(name, timings, time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+AI 분석 스트리밍 벤치마크: 전체 응답을 기다리는 방식과 섹션 스트리밍 방식을 비교합니다.
+
+로컬 가짜 모델(fake_model.FakeGenerativeModel)이 분석 JSON을 지정한 시간에 걸쳐
+조각으로 보내는 동안, 첫 섹션·섹션별 도착 시각과 전체 완료 시각을 측정하고,
+스트리밍으로 받은 섹션이 전체 파싱 결과와 같은지 확인합니다.
+
+사용법:
+    python benchmarks/stream_benchmark.py --total-time 10
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_analysis import AuditRiskAnalyzer
+from fake_model import FakeGenerativeModel
+
+COMPANY = {'corp_name': '샘플전자', 'corp_code': '00000001', 'stock_code': '000001'}
+METRICS = {'current_ratio': 101.5, 'debt_ratio': 180.2, 'equity_ratio': 35.7, 'operating_margin': 2.1,
+           'net_margin': 0.8, 'roa': 0.6, 'roe': 1.7}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI 분석 스트리밍 벤치마크')
+    parser.add_argument('--total-time', type=float, default=10.0, help='가짜 모델의 전체 생성 시간(초)')
+    parser.add_argument('--first-chunk-delay', type=float, default=0.5, help='첫 조각까지 걸리는 시간(초)')
+    args = parser.parse_args()
+
+    model = FakeGenerativeModel(total_time=args.total_time, first_chunk_delay=args.first_chunk_delay)
+    analyzer = AuditRiskAnalyzer(model=model)
+
+    started = time.perf_counter()
+    blocking = analyzer.analyze_financial_risks(COMPANY, METRICS)
+    blocking_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    arrivals = []
+    sections = {}
+    complete = None
+    for event in analyzer.stream_financial_risks(COMPANY, METRICS):
+        if event['type'] == 'section':
+            arrivals.append((event['key'], time.perf_counter() - started))
+            sections[event['key']] = event['value']
+        elif event['type'] == 'complete':
+            complete = event
+    streaming_s = time.perf_counter() - started
+
+    print(f"전체 응답 대기      {blocking_s:6.2f}s")
+    print(f"스트리밍 전체 완료  {streaming_s:6.2f}s")
+    for key, elapsed in arrivals:
+        print(f"  {key:<30}{elapsed:6.2f}s")
+    print(f"첫 섹션까지         {arrivals[0][1] if arrivals else float('nan'):6.2f}s")
+    print(f"결과 일치           {sections == blocking['analysis'] == complete['analysis']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,387 @@
+"""
+재무제표 응답을 적은 메모리로 보관하는 열(column) 기반 파서
+
+parse_financial_data / parse_full_financial_statements는 계정마다 기간별 딕셔너리를
+중첩해 만들기 때문에 회사 수가 많아지면 파싱 시간과 메모리 대부분을 차지합니다.
+여기서는 재무제표(sj_div)마다 계정명·텍스트 필드를 열 단위 리스트로, 금액을
+array('q') 열로 보관하고, 계정명/계정ID로 행 번호를 찾는 인덱스를 둡니다.
+
+CompactStatement는 {계정명: 계정 데이터} 매핑처럼 동작하므로(get, in, items, len 등)
+기존 코드는 그대로 쓸 수 있습니다. 계정 데이터 딕셔너리는 조회할 때 만들어지며,
+수정해도 원본에는 반영되지 않습니다. JSON 응답 등 순수 딕셔너리가 필요하면
+to_plain()으로 변환합니다.
+
+조회할 때마다 딕셔너리를 만들기 때문에, 모든 계정을 딕셔너리 방식으로 읽으면 기존
+파서보다 훨씬 느립니다. (benchmarks/parse_benchmark.py의 '딕셔너리 조회') 많은 계정을
+읽는 코드는 amount()나 column()으로 금액만 읽습니다. (audit_prompt, ratio_engine)
+"""
+from array import array
+from collections.abc import Mapping
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_TEXT = 0
+_AMOUNT = 1
+_NESTED = 2
+
+# 행을 찾는 데 쓰는 필드 (항상 앞의 두 텍스트 열로 보관)
+INDEX_FIELDS = ('account_nm', 'account_id')
+
+
+class StatementLayout:
+    """
+    계정 데이터 딕셔너리의 구조 정의
+
+    entries는 ((키, 원본 필드 또는 하위 entries), ...) 형식이며, 원본 필드 이름이
+    '_amount'로 끝나면 금액 열, 그 밖은 텍스트 열로 보관합니다.
+    """
+
+    __slots__ = ('entries', 'text_fields', 'amount_fields', 'amount_index', 'shared_fields', 'plan', 'builder')
+
+    def __init__(self, entries: Tuple):
+        self.entries = entries
+        text_fields = list(INDEX_FIELDS)
+        amount_fields = []
+        self._collect(entries, text_fields, amount_fields)
+        self.text_fields = tuple(text_fields)
+        self.amount_fields = tuple(amount_fields)
+        self.amount_index = {field: i for i, field in enumerate(self.amount_fields)}
+        # 기간명·날짜처럼 행마다 반복되는 값은 같은 문자열 객체를 공유
+        self.shared_fields = frozenset(field for field in self.text_fields
+                                       if field not in INDEX_FIELDS and field != 'ord')
+        self.plan = self._compile(entries)
+        self.builder = self._compile_builder(self.plan)
+
+    def _collect(self, entries: Tuple, text_fields: List[str], amount_fields: List[str]):
+        for _, spec in entries:
+            if isinstance(spec, tuple):
+                self._collect(spec, text_fields, amount_fields)
+            elif spec.endswith('_amount'):
+                if spec not in amount_fields:
+                    amount_fields.append(spec)
+            elif spec not in text_fields:
+                text_fields.append(spec)
+
+    def _compile(self, entries: Tuple) -> Tuple:
+        """entries를 (키, 종류, 열 위치 또는 하위 plan) 목록으로 바꿉니다."""
+        plan = []
+        for key, spec in entries:
+            if isinstance(spec, tuple):
+                plan.append((key, _NESTED, self._compile(spec)))
+            elif spec.endswith('_amount'):
+                plan.append((key, _AMOUNT, self.amount_fields.index(spec)))
+            else:
+                plan.append((key, _TEXT, self.text_fields.index(spec)))
+        return tuple(plan)
+
+    @staticmethod
+    def _compile_builder(plan: Tuple):
+        """
+        plan대로 계정 데이터 딕셔너리를 만드는 함수 builder(texts, amounts, row)를 생성합니다.
+
+        조회할 때마다 plan을 재귀로 훑지 않도록 중첩 dict 리터럴 하나로 만듭니다.
+        (키와 열 위치는 모듈에 정의된 레이아웃에서만 오므로 eval에 외부 입력이 들어가지 않음)
+        """
+        def source(plan: Tuple) -> str:
+            parts = []
+            for key, kind, spec in plan:
+                if kind == _TEXT:
+                    value = f"t[{spec}][r]"
+                elif kind == _AMOUNT:
+                    value = f"a[{spec}][r]"
+                else:
+                    value = source(spec)
+                parts.append(f"{key!r}: {value}")
+            return '{' + ', '.join(parts) + '}'
+
+        return eval(f"lambda t, a, r: {source(plan)}", {})
+
+
+# parse_financial_data(주요계정)와 같은 계정 데이터 구조
+KEY_ACCOUNT_LAYOUT = StatementLayout((
+    ('current_period', (('name', 'thstrm_nm'), ('date', 'thstrm_dt'), ('amount', 'thstrm_amount'))),
+    ('previous_period', (('name', 'frmtrm_nm'), ('date', 'frmtrm_dt'), ('amount', 'frmtrm_amount'))),
+    ('before_previous_period', (('name', 'bfefrmtrm_nm'), ('date', 'bfefrmtrm_dt'),
+                                ('amount', 'bfefrmtrm_amount'))),
+))
+
+# parse_full_financial_statements(전체 재무제표)와 같은 계정 데이터 구조
+FULL_STATEMENT_LAYOUT = StatementLayout((
+    ('account_id', 'account_id'),
+    ('account_detail', 'account_detail'),
+    ('current_period', (('name', 'thstrm_nm'), ('amount', 'thstrm_amount'),
+                        ('add_amount', 'thstrm_add_amount'))),
+    ('previous_period', (('name', 'frmtrm_nm'), ('amount', 'frmtrm_amount'), ('q_name', 'frmtrm_q_nm'),
+                         ('q_amount', 'frmtrm_q_amount'), ('add_amount', 'frmtrm_add_amount'))),
+    ('before_previous_period', (('name', 'bfefrmtrm_nm'), ('amount', 'bfefrmtrm_amount'))),
+    ('ord', 'ord'),
+))
+
+
+def _parse_amount(amount_str: Optional[str]) -> int:
+    """금액 문자열을 정수로 변환합니다. (OpenDartAPI._parse_amount와 같은 규칙)"""
+    if not amount_str:
+        return 0
+    try:
+        return int(amount_str.replace(',', ''))
+    except ValueError:
+        return 0
+
+
+def _amount_column(values: List[Optional[str]]):
+    """
+    금액 문자열 열을 정수 열로 만듭니다.
+    64비트 정수 범위를 넘는 값이 있으면 리스트로 보관합니다.
+    """
+    try:
+        # 대부분의 열은 숫자 문자열뿐이므로 먼저 한 번에 변환하고, 실패하면 값마다 변환
+        amounts = [int(value.replace(',', '')) if value else 0 for value in values]
+    except ValueError:
+        amounts = [_parse_amount(value) for value in values]
+    try:
+        return array('q', amounts)
+    except OverflowError:
+        return amounts
+
+
+def _columns(items: List[Dict], fields: Tuple[str, ...]) -> List[Tuple]:
+    """응답 항목 목록을 필드별 열(tuple) 목록으로 바꿉니다. 없는 필드는 None"""
+    if not items:
+        return [()] * len(fields)
+
+    # 첫 항목에 있는 필드는 itemgetter로 한 번에 꺼내고, 나머지는 get으로 채움
+    present = [field for field in fields if field in items[0]]
+    try:
+        if len(present) > 1:
+            found = dict(zip(present, zip(*map(itemgetter(*present), items))))
+        else:
+            found = {field: tuple(item[field] for item in items) for field in present}
+    except KeyError:
+        # 항목마다 필드 구성이 다른 경우
+        found = {}
+    return [found[field] if field in found else tuple(item.get(field) for item in items)
+            for field in fields]
+
+
+class CompactStatement(Mapping):
+    """
+    재무제표 하나(예: 연결 재무상태표)를 열 단위로 보관하는 {계정명: 계정 데이터} 매핑
+
+    계정명이 중복되면 기존 파서처럼 마지막 행이 값이 되고, 순서는 처음 나온 위치를 따릅니다.
+    """
+
+    __slots__ = ('layout', 'texts', 'amounts', '_by_name', '_by_id')
+
+    def __init__(self, layout: StatementLayout, items: List[Dict], shared: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            layout: 계정 데이터 구조
+            items: 이 재무제표에 속한 API 응답 항목 목록
+            shared: 반복되는 문자열을 공유할 사전 (같은 응답의 재무제표끼리 함께 사용)
+        """
+        texts, amounts, _ = _column_data(layout, items, {} if shared is None else shared)
+        self._assign(layout, texts, amounts)
+
+    @classmethod
+    def from_columns(cls, layout: StatementLayout, texts: List[List], amounts: List) -> 'CompactStatement':
+        """이미 열로 나눈 데이터로 만듭니다. (응답 전체를 한 번에 변환한 뒤 재무제표별로 나눌 때)"""
+        statement = cls.__new__(cls)
+        statement._assign(layout, texts, amounts)
+        return statement
+
+    def _assign(self, layout: StatementLayout, texts: List[List], amounts: List):
+        self.layout = layout
+        self.texts = texts
+        self.amounts = amounts
+        # 계정명이 중복되면 위치는 처음 나온 곳, 값은 마지막 행
+        self._by_name = dict(zip(texts[0], range(len(texts[0]))))
+        self._by_id = None
+
+    def __getitem__(self, account_nm: str) -> Dict:
+        return self.layout.builder(self.texts, self.amounts, self._by_name[account_nm])
+
+    def __contains__(self, account_nm) -> bool:
+        return account_nm in self._by_name
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_name)
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __repr__(self) -> str:
+        return f"<CompactStatement accounts={len(self._by_name)} rows={self.row_count}>"
+
+    @property
+    def row_count(self) -> int:
+        """응답 항목 수 (중복 계정명 포함)"""
+        return len(self.texts[0])
+
+    def find_row(self, account: str) -> Optional[int]:
+        """계정명 또는 계정ID로 행 번호를 찾습니다. (계정명 우선)"""
+        row = self._by_name.get(account)
+        if row is not None:
+            return row
+        return self._id_index().get(account)
+
+    def _id_index(self) -> Dict[str, int]:
+        """계정ID 인덱스 (처음 쓸 때 만들며, 표준계정코드가 없는 '-'는 제외)"""
+        if self._by_id is None:
+            self._by_id = {account_id: row for row, account_id in enumerate(self.texts[1])
+                           if account_id and account_id != '-'}
+        return self._by_id
+
+    def by_account_id(self, account_id: str) -> Optional[Dict]:
+        """계정ID(예: ifrs-full_Assets)로 계정 데이터를 반환합니다."""
+        row = self._id_index().get(account_id)
+        return self.layout.builder(self.texts, self.amounts, row) if row is not None else None
+
+    def amount(self, account: str, field: str = 'thstrm_amount', default: int = 0) -> int:
+        """
+        딕셔너리를 만들지 않고 금액 하나를 읽습니다.
+
+        Args:
+            account: 계정명 또는 계정ID
+            field: 원본 금액 필드 (thstrm_amount, frmtrm_amount 등)
+            default: 계정이 없을 때 반환할 값
+        """
+        row = self._by_name.get(account)
+        if row is None:
+            row = self._id_index().get(account)
+            if row is None:
+                return default
+        return self.amounts[self.layout.amount_index[field]][row]
+
+    def column(self, field: str):
+        """원본 필드 하나의 열 전체를 반환합니다. (금액은 array('q'), 텍스트는 list)"""
+        if field in self.layout.amount_index:
+            return self.amounts[self.layout.amount_index[field]]
+        return self.texts[self.layout.text_fields.index(field)]
+
+    def to_dict(self) -> Dict:
+        """기존 파서와 같은 순수 딕셔너리로 변환합니다."""
+        builder, texts, amounts = self.layout.builder, self.texts, self.amounts
+        return {name: builder(texts, amounts, row) for name, row in self._by_name.items()}
+
+
+def _column_data(layout: StatementLayout, items: List[Dict], shared: Dict[str, str],
+                 extra_fields: Tuple[str, ...] = ()) -> Tuple[List, List, List[Tuple]]:
+    """응답 항목 목록을 (텍스트 열 목록, 금액 열 목록, extra_fields 열 목록)으로 나눕니다."""
+    columns = _columns(items, layout.text_fields + layout.amount_fields + extra_fields)
+    text_end = len(layout.text_fields)
+    amount_end = text_end + len(layout.amount_fields)
+
+    texts = []
+    for field, column in zip(layout.text_fields, columns[:text_end]):
+        if field in layout.shared_fields:
+            texts.append(list(map(shared.setdefault, column, column)))
+        else:
+            texts.append(list(column))
+    amounts = [_amount_column(column) for column in columns[text_end:amount_end]]
+    return texts, amounts, columns[amount_end:]
+
+
+def _take(column, selector):
+    """열에서 selector(slice 또는 [start, end) 구간 목록)에 해당하는 행을 순서대로 모은 새 열을 반환합니다."""
+    if isinstance(selector, slice):
+        return column[selector]
+    taken = column[0:0]
+    for start, end in selector:
+        taken += column[start:end]
+    return taken
+
+
+def _split_statements(layout: StatementLayout, items: List[Dict], key_fields: Tuple[str, ...]) -> Dict:
+    """
+    응답 전체를 한 번에 열로 변환한 뒤, key_fields 값이 같은 행끼리 CompactStatement로 나눕니다.
+
+    응답은 보통 재무제표별로 연속해 있으므로 재무제표마다 열을 새로 만드는 대신
+    연속 구간을 잘라 씁니다. (재무제표마다 행이 적은 주요계정 응답에서 특히 효과가 큼)
+
+    Returns:
+        {key_fields 값(필드가 하나면 값, 여러 개면 튜플): CompactStatement}
+    """
+    texts, amounts, keys = _column_data(layout, items, {}, key_fields)
+    keys = list(zip(*keys)) if len(key_fields) > 1 else keys[0]
+
+    spans = {}
+    start = 0
+    for key, run in groupby(keys):
+        end = start + sum(1 for _ in run)
+        spans.setdefault(key, []).append((start, end))
+        start = end
+
+    statements = {}
+    for key, key_spans in spans.items():
+        selector = slice(*key_spans[0]) if len(key_spans) == 1 else key_spans
+        statements[key] = CompactStatement.from_columns(layout, [_take(column, selector) for column in texts],
+                                                        [_take(column, selector) for column in amounts])
+    return statements
+
+
+def parse_key_accounts(raw_data: Dict) -> Dict:
+    """
+    주요계정 응답을 parse_financial_data와 같은 구조로 파싱합니다.
+    각 재무제표는 CompactStatement로 보관합니다.
+    """
+    if not raw_data or 'list' not in raw_data:
+        return {}
+
+    items = raw_data['list']
+    statements = _split_statements(KEY_ACCOUNT_LAYOUT, items, ('fs_div', 'sj_div'))
+
+    financial_data = {}
+    for data_type, fs_div in (('consolidated', 'CFS'), ('separate', 'OFS')):
+        financial_data[data_type] = {
+            'balance_sheet': statements.get((fs_div, 'BS')) or CompactStatement(KEY_ACCOUNT_LAYOUT, []),
+            'income_statement': statements.get((fs_div, 'IS')) or CompactStatement(KEY_ACCOUNT_LAYOUT, [])
+        }
+
+    financial_data['basic_info'] = {}
+    if items:
+        first = items[0]
+        financial_data['basic_info'] = {
+            'corp_code': first.get('corp_code'),
+            'stock_code': first.get('stock_code'),
+            'bsns_year': first.get('bsns_year'),
+            'reprt_code': first.get('reprt_code'),
+            'currency': first.get('currency', 'KRW')
+        }
+    return financial_data
+
+
+def parse_full_statements(raw_data: Dict) -> Dict:
+    """
+    전체 재무제표 응답을 parse_full_financial_statements와 같은 구조로 파싱합니다.
+    각 재무제표(BS, IS, CIS, CF, SCE)는 CompactStatement로 보관합니다.
+    """
+    if not raw_data or 'list' not in raw_data:
+        return {}
+
+    items = raw_data['list']
+    statements = _split_statements(FULL_STATEMENT_LAYOUT, items, ('sj_div',))
+
+    financial_statements = {
+        sj_div: statements.get(sj_div) or CompactStatement(FULL_STATEMENT_LAYOUT, [])
+        for sj_div in ('BS', 'IS', 'CIS', 'CF', 'SCE')
+    }
+    financial_statements['basic_info'] = {}
+    if items:
+        first = items[0]
+        financial_statements['basic_info'] = {
+            'corp_code': first.get('corp_code'),
+            'bsns_year': first.get('bsns_year'),
+            'reprt_code': first.get('reprt_code'),
+            'currency': first.get('currency', 'KRW')
+        }
+    return financial_statements
+
+
+def to_plain(data):
+    """CompactStatement가 들어 있는 파싱 결과를 순수 딕셔너리로 변환합니다. (JSON 응답용)"""
+    if isinstance(data, CompactStatement):
+        return data.to_dict()
+    if isinstance(data, Mapping):
+        return {key: to_plain(value) for key, value in data.items()}
+    return data
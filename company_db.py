@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional
+
+# 자주 실행되는 조회 쿼리 (SQL 문자열이 같아야 연결별 prepared statement 캐시를 재사용함)
+COMPANY_DETAIL_SQL = '''
+    SELECT corp_code, corp_name, corp_eng_name, stock_code, modify_date
+    FROM companies
+    WHERE corp_code = ?
+'''
+
+COMPANY_SUMMARY_SQL = '''
+    SELECT corp_code, corp_name, corp_eng_name, stock_code
+    FROM companies
+    WHERE corp_code = ?
+'''
+
+
+class _ReadConnection(sqlite3.Connection):
+    """연결을 연 시점의 프로세스/데이터베이스 정보를 함께 보관하는 연결"""
+    pid = None
+    generation = None
+    file_id = None
+    checked_at = 0.0
+
+
+class CompanyDatabase:
+    """
+    회사 데이터베이스 읽기 전용 연결 관리자
+
+    프로세스마다 연결 풀을 두고, 요청을 처리하는 스레드가 연결을 빌려 쓴 뒤
+    요청이 끝나면(release) 돌려줍니다. 연결은 읽기 전용 모드로 열고 메모리 맵 I/O와
+    페이지 캐시를 설정하며, 같은 SQL 문자열은 연결의 statement 캐시로 다시
+    준비(prepare)하지 않습니다. 요청 밖의 작업 스레드는 release 없이 자기 연결을
+    계속 재사용합니다.
+
+    데이터베이스 파일이 교체되면(generation 변경 또는 파일 inode 변경) 기존 연결은
+    다음 checkout 때 버리고 새 파일로 다시 연결합니다.
+    """
+
+    def __init__(self, db_path: str = 'companies.db', mmap_size: int = 256 * 1024 * 1024,
+                 cache_size_kb: int = 16 * 1024, cached_statements: int = 64, max_idle: int = 16,
+                 generation: Optional[Callable[[], int]] = None, stat_interval: float = 5.0):
+        """
+        Args:
+            db_path: 회사 데이터베이스 경로
+            mmap_size: 메모리 맵 크기(바이트)
+            cache_size_kb: 연결별 페이지 캐시 크기(KB)
+            cached_statements: 연결별 prepared statement 캐시 크기
+            max_idle: 풀에 보관할 유휴 연결 최대 수
+            generation: 데이터베이스 교체 횟수를 반환하는 함수 (CorpCodeRefresher 등)
+            stat_interval: 다른 프로세스의 파일 교체를 확인하는 주기(초)
+        """
+        self.db_path = db_path
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.cached_statements = cached_statements
+        self.max_idle = max_idle
+        self.generation = generation or (lambda: 0)
+        self.stat_interval = stat_interval
+
+        self.opened = 0
+        self.reused = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle: List[_ReadConnection] = []
+        self._connections: List[_ReadConnection] = []
+
+    def _file_id(self) -> Optional[tuple]:
+        """데이터베이스 파일 식별자 (교체 여부 확인용). 파일이 없으면 None"""
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (stat.st_dev, stat.st_ino)
+
+    def _open(self, file_id: tuple) -> _ReadConnection:
+        """읽기 전용으로 튜닝된 새 연결을 엽니다."""
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        # 스레드 간에 넘겨 쓰지만 한 번에 한 스레드만 사용하므로 check_same_thread=False
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               cached_statements=self.cached_statements, factory=_ReadConnection)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        conn.execute(f'PRAGMA cache_size={-int(self.cache_size_kb)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA query_only=1')
+
+        conn.pid = os.getpid()
+        conn.generation = self.generation()
+        conn.file_id = file_id
+        conn.checked_at = time.monotonic()
+        with self._lock:
+            self._connections.append(conn)
+            self.opened += 1
+        return conn
+
+    def _is_current(self, conn: _ReadConnection) -> bool:
+        """연결이 현재 프로세스와 현재 데이터베이스 파일을 가리키는지 확인합니다."""
+        if conn.pid != os.getpid() or conn.generation != self.generation():
+            return False
+        now = time.monotonic()
+        if now - conn.checked_at >= self.stat_interval:
+            conn.checked_at = now
+            return conn.file_id == self._file_id()
+        return True
+
+    def _discard(self, conn: _ReadConnection):
+        """연결을 닫고 목록에서 제거합니다."""
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """
+        현재 스레드가 사용할 연결을 반환합니다. 데이터베이스가 없으면 None을 반환합니다.
+
+        호출한 쪽에서 닫지 않습니다. (요청이 끝나면 release로 반납)
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            if self._is_current(conn):
+                return conn
+            self._discard(conn)
+            self._local.conn = None
+
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                break
+            if self._is_current(conn):
+                self.reused += 1
+                self._local.conn = conn
+                return conn
+            self._discard(conn)
+
+        file_id = self._file_id()
+        if file_id is None:
+            return None
+        self._local.conn = self._open(file_id)
+        return self._local.conn
+
+    def release(self):
+        """현재 스레드의 연결을 정리해 풀에 반납합니다. (요청 종료 시 호출)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+
+        if conn.in_transaction:
+            conn.rollback()
+        if conn.pid == os.getpid() and conn.generation == self.generation():
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    return
+        self._discard(conn)
+
+    def close_all(self):
+        """열린 연결을 모두 닫습니다. (프로세스 종료 시 호출)"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+            self._idle.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> dict:
+        """연결 풀 통계를 반환합니다."""
+        with self._lock:
+            return {
+                'open_connections': len(self._connections),
+                'idle_connections': len(self._idle),
+                'opened_total': self.opened,
+                'reused_total': self.reused,
+                'mmap_size': self.mmap_size,
+                'cache_size_kb': self.cache_size_kb
+            }
@@ -0,0 +1,354 @@
+import base64
+import bisect
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# 트라이그램 인덱스는 3글자 이상부터 사용할 수 있음
+MIN_FTS_QUERY_LENGTH = 3
+MAX_PAGE_SIZE = 100
+
+# 정확히 일치(0) → 접두어 일치(1) → 부분 일치(2), 같은 순위에서는 상장사 우선
+_RANKED_SELECT = '''
+    SELECT c.id, c.corp_code, c.corp_name, c.corp_eng_name, c.stock_code, c.modify_date,
+           CASE
+               WHEN c.corp_name = :query OR lower(c.corp_eng_name) = lower(:query) THEN 0
+               WHEN c.corp_name LIKE :prefix ESCAPE '\\' OR c.corp_eng_name LIKE :prefix ESCAPE '\\' THEN 1
+               ELSE 2
+           END AS match_rank,
+           CASE WHEN trim(coalesce(c.stock_code, '')) = '' THEN 1 ELSE 0 END AS unlisted
+'''
+
+_FTS_SOURCE = '''
+    FROM companies_fts f
+    JOIN companies c ON c.id = f.rowid
+    WHERE companies_fts MATCH :match
+'''
+
+_LIKE_SOURCE = '''
+    FROM companies c
+    WHERE c.corp_name LIKE :contains ESCAPE '\\' OR c.corp_eng_name LIKE :contains ESCAPE '\\'
+'''
+
+_PAGE = '''
+    SELECT * FROM ({select} {source})
+    WHERE (match_rank, unlisted, corp_name, id) > (:after_rank, :after_unlisted, :after_name, :after_id)
+    ORDER BY match_rank, unlisted, corp_name, id
+    LIMIT :limit
+'''
+
+# 매번 같은 SQL 문자열을 써야 연결의 prepared statement 캐시가 재사용됨
+_FTS_PAGE_SQL = _PAGE.format(select=_RANKED_SELECT, source=_FTS_SOURCE)
+_LIKE_PAGE_SQL = _PAGE.format(select=_RANKED_SELECT, source=_LIKE_SOURCE)
+
+
+def _escape_like(text: str) -> str:
+    """LIKE 패턴의 특수문자를 이스케이프합니다."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fts_phrase(text: str) -> str:
+    """검색어를 FTS5 구문(phrase) 문자열로 변환합니다."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def encode_cursor(row: Dict) -> str:
+    """마지막 결과 행으로 다음 페이지 커서를 생성합니다."""
+    key = [row['match_rank'], row['unlisted'], row['corp_name'], row['id']]
+    return base64.urlsafe_b64encode(json.dumps(key, ensure_ascii=False).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: Optional[str]) -> List:
+    """커서를 정렬 키로 복원합니다. 없거나 잘못된 커서는 첫 페이지로 처리합니다."""
+    if cursor:
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            if isinstance(key, list) and len(key) == 4:
+                return key
+        except (ValueError, UnicodeError):
+            pass
+    return [-1, -1, '', -1]
+
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    """FTS5 검색 인덱스가 있는지 확인합니다."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'companies_fts'"
+    ).fetchone()
+    return row is not None
+
+
+def search_companies(conn: sqlite3.Connection, query: str, limit: int = 50,
+                     cursor: Optional[str] = None, use_fts: Optional[bool] = None) -> Dict:
+    """
+    회사명(국문/영문)으로 회사를 검색합니다.
+
+    3글자 이상이면 FTS5 트라이그램 인덱스를, 그보다 짧으면 LIKE 검색을 사용하며
+    정확히 일치 → 접두어 일치 → 부분 일치, 상장사 우선 순으로 정렬합니다.
+
+    Args:
+        conn: companies 테이블이 있는 SQLite 연결
+        query: 검색어
+        limit: 페이지 크기 (최대 MAX_PAGE_SIZE)
+        cursor: 이전 응답의 next_cursor (키셋 페이지네이션)
+        use_fts: FTS 사용 여부 강제 (None이면 자동 선택)
+
+    Returns:
+        {'results': 회사 목록, 'next_cursor': 다음 페이지 커서 또는 None}
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if use_fts is None:
+        use_fts = len(query) >= MIN_FTS_QUERY_LENGTH and has_search_index(conn)
+
+    after_rank, after_unlisted, after_name, after_id = decode_cursor(cursor)
+    params = {
+        'query': query,
+        'prefix': _escape_like(query) + '%',
+        'contains': '%' + _escape_like(query) + '%',
+        'match': _fts_phrase(query),
+        'after_rank': after_rank,
+        'after_unlisted': after_unlisted,
+        'after_name': after_name,
+        'after_id': after_id,
+        'limit': limit + 1
+    }
+
+    sql = _FTS_PAGE_SQL if use_fts else _LIKE_PAGE_SQL
+    previous_factory = conn.row_factory
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.row_factory = previous_factory
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    results = [{
+        'corp_code': row['corp_code'],
+        'corp_name': row['corp_name'],
+        'corp_eng_name': row['corp_eng_name'],
+        'stock_code': row['stock_code'],
+        'modify_date': row['modify_date']
+    } for row in rows]
+
+    return {
+        'results': results,
+        'next_cursor': encode_cursor(rows[-1]) if has_more else None
+    }
+
+
+# 한글 초성 (유니코드 호환 자모)
+CHOSEONG = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+_CHOSEONG_SET = set(CHOSEONG)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+
+
+def normalize_name(text: Optional[str]) -> str:
+    """자동완성 비교용으로 소문자화하고 공백을 제거합니다."""
+    if not text:
+        return ''
+    return ''.join(text.lower().split())
+
+
+def to_choseong(text: str) -> str:
+    """한글 음절을 초성으로 변환합니다. (한글 외 문자는 그대로 유지)"""
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            chars.append(CHOSEONG[(code - _HANGUL_BASE) // 588])
+        else:
+            chars.append(ch)
+    return ''.join(chars)
+
+
+def _matches_mixed(name: str, query: str) -> bool:
+    """초성과 완성형이 섞인 검색어가 이름의 접두어와 글자 단위로 일치하는지 확인합니다."""
+    if len(name) < len(query):
+        return False
+    for name_ch, query_ch in zip(name, query):
+        if query_ch in _CHOSEONG_SET:
+            if to_choseong(name_ch) != query_ch:
+                return False
+        elif name_ch != query_ch:
+            return False
+    return True
+
+
+class AutocompleteIndex:
+    """
+    회사 자동완성용 메모리 인덱스
+
+    정규화된 국문명, 영문명, 주식코드, 국문명 초성을 하나의 정렬 배열에 담아
+    이진 탐색으로 접두어 일치 항목을 찾습니다. "ㅅㅅㅈㅈ"처럼 초성만 입력하거나
+    "삼ㅅ"처럼 섞어 입력해도 찾을 수 있습니다.
+
+    상장사 키만 담은 정렬 배열을 따로 두어, 접두어가 짧아 후보가 MAX_CANDIDATES개를
+    넘더라도 순위가 높은 상장사가 후보에서 빠지지 않습니다.
+    """
+
+    # 접두어 범위에서 순위 계산을 위해 살펴볼 최대 후보 수 (전체 배열, 상장사 배열 각각)
+    MAX_CANDIDATES = 2000
+
+    def __init__(self, companies: List[Tuple[str, str, str, str]]):
+        """
+        Args:
+            companies: (corp_code, corp_name, corp_eng_name, stock_code) 목록
+        """
+        self.companies = []
+        keyed = []
+
+        for corp_code, corp_name, corp_eng_name, stock_code in companies:
+            stock_code = (stock_code or '').strip()
+            company_id = len(self.companies)
+            self.companies.append((corp_code, corp_name, corp_eng_name or '', stock_code))
+
+            name_key = normalize_name(corp_name)
+            keys = {name_key, to_choseong(name_key), normalize_name(corp_eng_name), stock_code}
+            for key in keys:
+                if key:
+                    keyed.append((key, company_id))
+
+        keyed.sort()
+        self._keys = [key for key, _ in keyed]
+        self._ids = [company_id for _, company_id in keyed]
+        listed = [(key, company_id) for key, company_id in keyed if self.companies[company_id][3]]
+        self._listed_keys = [key for key, _ in listed]
+        self._listed_ids = [company_id for _, company_id in listed]
+
+    @classmethod
+    def from_database(cls, db_path: str = 'companies.db') -> 'AutocompleteIndex':
+        """companies 테이블에서 인덱스를 만들고 로드 시간과 메모리 사용량을 출력합니다."""
+        started = time.perf_counter()
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(
+                'SELECT corp_code, corp_name, corp_eng_name, stock_code FROM companies'
+            ).fetchall()
+        finally:
+            conn.close()
+
+        index = cls(rows)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"자동완성 인덱스 로드 완료: {len(index.companies):,}개 회사, "
+              f"{len(index._keys):,}개 키, {index.memory_bytes() / 1024 / 1024:.1f}MB, {elapsed:.0f}ms")
+        return index
+
+    def memory_bytes(self) -> int:
+        """인덱스가 사용하는 메모리(추정치, 바이트)를 반환합니다."""
+        total = sys.getsizeof(self.companies) + sys.getsizeof(self._keys) + sys.getsizeof(self._ids)
+        total += sys.getsizeof(self._listed_keys) + sys.getsizeof(self._listed_ids)
+        total += sum(sys.getsizeof(key) for key in self._keys)
+        for company in self.companies:
+            total += sys.getsizeof(company) + sum(sys.getsizeof(value) for value in company)
+        return total
+
+    @classmethod
+    def _prefix_range(cls, keys: List[str], ids: List[int], prefix: str) -> List[int]:
+        """정렬된 키 배열에서 접두어로 시작하는 키의 회사 번호를 최대 MAX_CANDIDATES개 반환합니다."""
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + '\U0010ffff', lo=start)
+        return ids[start:min(end, start + cls.MAX_CANDIDATES)]
+
+    def _prefix_ids(self, prefix: str) -> List[int]:
+        """
+        접두어로 시작하는 키의 회사 번호 후보를 반환합니다.
+
+        키가 접두어와 같은 회사(정확히 일치)는 범위 맨 앞에 있으므로 항상 포함되고,
+        상장사는 상장사 배열에서 따로 찾아 전체 배열의 후보 수 제한과 관계없이 포함합니다.
+        """
+        return (self._prefix_range(self._listed_keys, self._listed_ids, prefix)
+                + self._prefix_range(self._keys, self._ids, prefix))
+
+    def search(self, query: str, k: int = 10) -> List[Dict]:
+        """
+        검색어로 시작하는 회사를 최대 k개 반환합니다.
+
+        정확히 일치 → 상장사 → 짧은 이름 순으로 정렬합니다.
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+
+        has_choseong = any(ch in _CHOSEONG_SET for ch in query)
+        if has_choseong:
+            # 초성이 섞인 검색어는 초성 키로 후보를 찾은 뒤 글자 단위로 확인
+            candidates = {
+                company_id for company_id in self._prefix_ids(to_choseong(query))
+                if _matches_mixed(normalize_name(self.companies[company_id][1]), query)
+            }
+        else:
+            candidates = set(self._prefix_ids(query))
+
+        def rank(company_id: int):
+            corp_code, corp_name, corp_eng_name, stock_code = self.companies[company_id]
+            exact = query in (normalize_name(corp_name), normalize_name(corp_eng_name), stock_code)
+            return (not exact, not stock_code, len(corp_name), corp_name)
+
+        return [{
+            'corp_code': self.companies[company_id][0],
+            'corp_name': self.companies[company_id][1],
+            'corp_eng_name': self.companies[company_id][2],
+            'stock_code': self.companies[company_id][3]
+        } for company_id in sorted(candidates, key=rank)[:k]]
+
+
+class AutocompleteIndexLoader:
+    """
+    회사 데이터베이스 파일이 바뀌면 자동완성 인덱스를 다시 만드는 로더
+
+    파일 식별자(장치, inode, 수정 시각)를 stat_interval마다 확인하므로, 파일을 교체한 것이
+    다른 프로세스(다른 워커의 CorpCodeRefresher, xml_to_db.py 등)여도 각 프로세스가 다음
+    요청 때 새 목록으로 인덱스를 다시 만듭니다. 다시 만드는 동안 다른 스레드는 기존 인덱스를 사용합니다.
+    """
+
+    def __init__(self, db_path: str = 'companies.db', stat_interval: float = 5.0):
+        """
+        Args:
+            db_path: 회사 데이터베이스 경로
+            stat_interval: 파일 교체를 확인하는 주기(초)
+        """
+        self.db_path = db_path
+        self.stat_interval = stat_interval
+        self.reloads = 0
+        self._index: Optional[AutocompleteIndex] = None
+        self._file_id = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_file_id(self) -> Optional[tuple]:
+        """데이터베이스 파일 식별자. 파일이 없으면 None"""
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+    def get(self) -> Optional[AutocompleteIndex]:
+        """현재 데이터베이스 파일의 인덱스를 반환합니다. 데이터베이스가 없으면 None"""
+        if time.monotonic() - self._checked_at < self.stat_interval:
+            return self._index
+
+        # 처음 로드할 때만 기다리고, 다시 만드는 중이면 기존 인덱스로 응답
+        if not self._lock.acquire(blocking=self._index is None):
+            return self._index
+        try:
+            if time.monotonic() - self._checked_at >= self.stat_interval:
+                file_id = self._current_file_id()
+                if file_id is not None and file_id != self._file_id:
+                    try:
+                        self._index = AutocompleteIndex.from_database(self.db_path)
+                        self._file_id = file_id
+                        self.reloads += 1
+                    except sqlite3.Error as e:
+                        print(f"자동완성 인덱스 로드 오류: {e}")
+                self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return self._index
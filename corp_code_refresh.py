@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from xml_to_db import create_database, create_search_index, parse_xml_and_insert
+
+
+class CorpCodeRefresher:
+    """
+    DART 고유번호(corpCode) 목록을 주기적으로 받아 회사 데이터베이스를 교체하는 작업
+
+    새 데이터베이스는 같은 디렉토리의 임시 파일로 만들고 검증한 뒤 os.replace로
+    한 번에 교체합니다. 교체 전까지 앱은 기존 파일로 계속 응답하며, 교체 후 새로
+    여는 연결부터 새 파일을 사용합니다. 연결을 재사용하는 쪽은 generation 값이
+    바뀌었는지 보고 다시 연결하면 됩니다.
+
+    source를 지정하면 다운로드 대신 로컬 파일(corp.xml 또는 corpCode zip)을 사용합니다.
+    """
+
+    CORP_CODE_URL = "https://opendart.fss.or.kr/api/corpCode.xml"
+
+    def __init__(self, db_path: str = 'companies.db', api_key: Optional[str] = None,
+                 source: Optional[str] = None, interval: float = 24 * 3600,
+                 state_path: str = os.path.join('cache', 'corp_code_state.json'),
+                 min_rows: int = 1000, timeout: float = 60):
+        """
+        Args:
+            db_path: 교체할 회사 데이터베이스 경로
+            api_key: 오픈다트 API 키 (source가 없을 때 다운로드에 사용)
+            source: 다운로드 대신 사용할 로컬 corp.xml 또는 zip 경로
+            interval: 백그라운드 갱신 주기(초)
+            state_path: 마지막 갱신 정보(해시, ETag 등)를 저장할 파일
+            min_rows: 새 데이터베이스가 가져야 할 최소 회사 수
+            timeout: 다운로드 제한 시간(초)
+        """
+        self.db_path = db_path
+        self.api_key = api_key
+        self.source = source
+        self.interval = interval
+        self.state_path = state_path
+        self.min_rows = min_rows
+        self.timeout = timeout
+
+        self.generation = 0
+        self.last_result = None
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict:
+        """마지막 갱신 정보를 읽습니다."""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        """갱신 정보를 원자적으로 저장합니다."""
+        state_dir = os.path.dirname(self.state_path)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """데이터베이스가 교체된 뒤 호출할 함수를 등록합니다. (인자: 데이터베이스 경로)"""
+        self._listeners.append(callback)
+
+    def _work_path(self, suffix: str) -> str:
+        """데이터베이스와 같은 디렉토리에 임시 파일 경로를 만듭니다. (os.replace가 원자적이도록)"""
+        fd, path = tempfile.mkstemp(prefix='.corp_code_', suffix=suffix,
+                                    dir=os.path.dirname(os.path.abspath(self.db_path)))
+        os.close(fd)
+        return path
+
+    def _fetch(self, dest_path: str) -> Optional[Dict]:
+        """
+        고유번호 파일을 dest_path에 받습니다.
+
+        Returns:
+            {'etag', 'last_modified'} 또는 서버가 변경 없음(304)을 알린 경우 None
+        """
+        if self.source:
+            with open(self.source, 'rb') as src, open(dest_path, 'wb') as dest:
+                while True:
+                    chunk = src.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+            return {}
+
+        if not self.api_key:
+            raise ValueError("오픈다트 API 키 또는 로컬 고유번호 파일이 필요합니다.")
+
+        headers = {}
+        if self.state.get('etag'):
+            headers['If-None-Match'] = self.state['etag']
+        if self.state.get('last_modified'):
+            headers['If-Modified-Since'] = self.state['last_modified']
+
+        with requests.get(self.CORP_CODE_URL, params={'crtfc_key': self.api_key},
+                          headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            with open(dest_path, 'wb') as dest:
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    dest.write(chunk)
+
+            if not zipfile.is_zipfile(dest_path):
+                # 오류 시에는 zip 대신 상태 코드가 담긴 XML이 내려옴
+                with open(dest_path, 'rb') as f:
+                    message = f.read(500).decode('utf-8', errors='replace')
+                raise ValueError(f"고유번호 파일이 zip 형식이 아닙니다: {message}")
+
+            return {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        """파일의 SHA-256 해시를 계산합니다."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _current_row_count(self) -> int:
+        """현재 데이터베이스의 회사 수를 반환합니다. (없으면 0)"""
+        if not os.path.exists(self.db_path):
+            return 0
+        try:
+            conn = sqlite3.connect(f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True)
+            try:
+                return conn.execute('SELECT COUNT(*) FROM companies').fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return 0
+
+    def _build(self, source_path: str, db_path: str) -> int:
+        """고유번호 파일로 새 데이터베이스를 만들고 회사 수를 반환합니다."""
+        conn = create_database(db_path)
+        try:
+            parse_xml_and_insert(conn, source_path)
+            create_search_index(conn)
+            return conn.execute('SELECT COUNT(*) FROM companies').fetchone()[0]
+        finally:
+            conn.close()
+
+    def _verify(self, db_path: str, rows: int) -> List[str]:
+        """새 데이터베이스를 검증하고 문제 목록을 반환합니다. (비어 있으면 통과)"""
+        problems = []
+
+        # 기존 목록보다 크게 줄었다면 잘린 파일일 가능성이 큼
+        current_rows = self._current_row_count()
+        if rows < self.min_rows:
+            problems.append(f"회사 수가 너무 적습니다 ({rows}건 < {self.min_rows}건)")
+        elif current_rows and rows < current_rows // 2:
+            problems.append(f"회사 수가 절반 이하로 줄었습니다 ({current_rows}건 → {rows}건)")
+
+        conn = sqlite3.connect(db_path)
+        try:
+            if conn.execute('PRAGMA integrity_check').fetchone()[0] != 'ok':
+                problems.append("무결성 검사 실패")
+            duplicates = conn.execute(
+                'SELECT COUNT(*) - COUNT(DISTINCT corp_code) FROM companies'
+            ).fetchone()[0]
+            if duplicates:
+                problems.append(f"중복된 고유번호 {duplicates}건")
+            sample = conn.execute('SELECT corp_name FROM companies ORDER BY id LIMIT 1').fetchone()
+            if sample and len(sample[0]) >= 3:
+                found = conn.execute(
+                    'SELECT COUNT(*) FROM companies_fts WHERE companies_fts MATCH ?',
+                    ('"' + sample[0].replace('"', '""') + '"',)
+                ).fetchone()[0]
+                if not found:
+                    problems.append("검색 인덱스에서 회사를 찾을 수 없습니다")
+        except sqlite3.Error as e:
+            problems.append(f"검증 쿼리 오류: {e}")
+        finally:
+            conn.close()
+
+        return problems
+
+    def _swap(self, new_db_path: str):
+        """검증된 데이터베이스를 현재 경로로 원자적으로 교체합니다."""
+        # 이전 파일의 WAL이 새 파일에 적용되지 않도록 먼저 비움 (--sync로 WAL 모드가 된 경우)
+        if os.path.exists(self.db_path + '-wal'):
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            finally:
+                conn.close()
+        os.replace(new_db_path, self.db_path)
+
+    def refresh(self, force: bool = False) -> Dict:
+        """
+        고유번호 목록을 받아 바뀌었으면 데이터베이스를 교체합니다.
+
+        Args:
+            force: 내용이 같아도 다시 만들지 여부
+
+        Returns:
+            {'status': 'updated' | 'unchanged' | 'rejected' | 'error', ...}
+        """
+        with self._lock:
+            started = time.perf_counter()
+            download_path = self._work_path('.download')
+            new_db_path = self._work_path('.db')
+            try:
+                meta = self._fetch(download_path)
+                if meta is None and not force and os.path.exists(self.db_path):
+                    result = {'status': 'unchanged', 'reason': 'not modified'}
+                else:
+                    digest = self._file_hash(download_path)
+                    if digest == self.state.get('sha256') and not force and os.path.exists(self.db_path):
+                        result = {'status': 'unchanged', 'reason': 'same content'}
+                    else:
+                        rows = self._build(download_path, new_db_path)
+                        problems = self._verify(new_db_path, rows)
+                        if problems:
+                            result = {'status': 'rejected', 'rows': rows, 'problems': problems}
+                        else:
+                            self._swap(new_db_path)
+                            self.generation += 1
+                            self.state.update(meta or {})
+                            self.state.update({'sha256': digest, 'rows': rows, 'updated_at': time.time()})
+                            result = {'status': 'updated', 'rows': rows}
+                self.state['checked_at'] = time.time()
+                self._save_state()
+            except (requests.RequestException, OSError, ValueError, sqlite3.Error,
+                    zipfile.BadZipFile, ET.ParseError) as e:
+                result = {'status': 'error', 'error': str(e)}
+            finally:
+                for path in (download_path, new_db_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+            result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            result['generation'] = self.generation
+            self.last_result = result
+
+        if result['status'] == 'updated':
+            print(f"회사 목록 갱신 완료: {result['rows']:,}건 ({result['elapsed_ms']:.0f}ms)")
+            for callback in self._listeners:
+                try:
+                    callback(self.db_path)
+                except Exception as e:
+                    print(f"회사 목록 갱신 후처리 오류: {e}")
+        elif result['status'] in ('rejected', 'error'):
+            print(f"회사 목록 갱신 실패: {result.get('problems') or result.get('error')}")
+
+        return result
+
+    def _run(self):
+        """백그라운드 갱신 루프"""
+        # 시작 시 이미 갱신했다면 다음 주기까지 기다림
+        delay = self.interval if self.last_result is not None else 0
+        while not self._stop.wait(delay):
+            self.refresh()
+            delay = self.interval
+
+    def start(self):
+        """백그라운드 갱신 스레드를 시작합니다."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='corp-code-refresh', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """백그라운드 갱신 스레드를 멈춥니다."""
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        """마지막 갱신 결과와 상태를 반환합니다."""
+        return {
+            'generation': self.generation,
+            'rows': self.state.get('rows'),
+            'updated_at': self.state.get('updated_at'),
+            'checked_at': self.state.get('checked_at'),
+            'last_result': self.last_result
+        }
@@ -0,0 +1,101 @@
+"""
+Gemini 대신 쓰는 로컬 가짜 모델 (개발·벤치마크용)
+
+generate_content(prompt, stream=...)를 Gemini SDK와 같은 형태로 제공하며,
+미리 준비한 분석 JSON을 지정한 시간 동안 조각으로 나누어 돌려줍니다.
+"""
+import json
+import random
+import threading
+import time
+from typing import Iterator, Optional
+
+from audit_prompt import estimate_tokens
+
+SAMPLE_ANALYSIS = {
+    "overall_risk_level": "중간",
+    "overall_assessment": "부채비율이 업종 평균보다 높고 영업이익률이 하락하고 있어 계속기업 관련 검토가 필요합니다.",
+    "financial_risks": {
+        "liquidity_risk": {"level": "중간", "description": "유동비율이 100% 내외로 단기 지급능력에 여유가 적습니다.",
+                           "indicators": ["유동비율", "현금성자산 감소"]},
+        "profitability_risk": {"level": "높음", "description": "영업이익률이 전년 대비 크게 하락했습니다.",
+                               "indicators": ["영업이익률", "순이익률"]},
+        "leverage_risk": {"level": "중간", "description": "차입금 의존도가 높습니다.", "indicators": ["부채비율"]},
+        "capital_structure_risk": {"level": "낮음", "description": "자본 구조는 안정적입니다.",
+                                   "indicators": ["자기자본비율"]}
+    },
+    "audit_risk_factors": {
+        "inherent_risk": {"level": "중간", "description": "수익 인식 기준이 복잡합니다.", "factors": ["장기계약", "변동대가"]},
+        "control_risk": {"level": "중간", "description": "내부통제 변경 이력이 있습니다.", "factors": ["ERP 교체"]},
+        "detection_risk": {"level": "낮음", "description": "표본 범위를 넓혀 대응합니다.", "factors": ["분석적 절차"]}
+    },
+    "material_misstatement_risks": [
+        {"area": "수익인식", "risk_level": "높음", "description": "기말 전후 매출 귀속 시기 오류 가능성",
+         "audit_procedures": ["기간귀속 테스트", "계약서 검토"]},
+        {"area": "자산평가", "risk_level": "중간", "description": "재고자산 진부화 평가", "audit_procedures": ["재고실사 입회"]},
+        {"area": "부채", "risk_level": "중간", "description": "우발부채 누락 가능성", "audit_procedures": ["법률 조회서"]}
+    ],
+    "recommendations": {
+        "priority_areas": ["수익인식", "재고자산"],
+        "additional_procedures": ["기간귀속 테스트 확대", "차입약정 준수 여부 확인"],
+        "focus_accounts": ["매출액", "재고자산", "차입금"],
+        "risk_mitigation": ["경영진 면담 강화"]
+    },
+    "key_insights": [
+        "영업이익률 하락 원인에 대한 경영진 설명 확보 필요",
+        "차입약정 위반 시 계속기업 불확실성 검토",
+        "재고자산 회전율 둔화"
+    ]
+}
+
+
+class _Chunk:
+    """Gemini 응답(또는 스트리밍 조각)처럼 text 속성을 가진 객체"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    미리 정한 응답을 천천히 흘려보내는 가짜 모델
+
+    첫 조각까지 first_chunk_delay초, 이후 전체 응답을 total_time초에 걸쳐 chunk_size 글자씩 보냅니다.
+    failure_rate를 주면 그 비율만큼 호출이 요청 한도 초과 오류로 실패합니다. (재시도 확인용)
+    seconds_per_1k_prompt_tokens를 주면 프롬프트가 길수록 첫 조각이 늦어집니다. (입력 처리 시간 흉내)
+    """
+
+    def __init__(self, response_text: Optional[str] = None, total_time: float = 10.0,
+                 first_chunk_delay: float = 0.5, chunk_size: int = 80, failure_rate: float = 0.0,
+                 seed: Optional[int] = None, seconds_per_1k_prompt_tokens: float = 0.0):
+        self.response_text = response_text or "```json\n" + json.dumps(
+            SAMPLE_ANALYSIS, ensure_ascii=False, indent=2) + "\n```"
+        self.total_time = total_time
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_size = chunk_size
+        self.failure_rate = failure_rate
+        self.seconds_per_1k_prompt_tokens = seconds_per_1k_prompt_tokens
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _chunks(self, prompt: str) -> Iterator[str]:
+        text = self.response_text
+        pieces = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        delay = max(0.0, self.total_time - self.first_chunk_delay) / max(1, len(pieces))
+        time.sleep(self.first_chunk_delay + estimate_tokens(prompt) / 1000 * self.seconds_per_1k_prompt_tokens)
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(delay)
+            yield piece
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.failure_rate
+        if failed:
+            time.sleep(self.first_chunk_delay)
+            raise RuntimeError("429 Resource has been exhausted (fake model)")
+        if stream:
+            return (_Chunk(piece) for piece in self._chunks(prompt))
+        return _Chunk(''.join(self._chunks(prompt)))
@@ -0,0 +1,321 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 오픈다트 재무 API 응답 항목의 텍스트 필드
+_TEXT_FIELDS = (
+    'rcept_no', 'stock_code', 'sj_nm', 'account_nm', 'account_detail', 'currency', 'ord',
+    'thstrm_nm', 'thstrm_dt', 'frmtrm_nm', 'frmtrm_dt', 'frmtrm_q_nm', 'bfefrmtrm_nm', 'bfefrmtrm_dt'
+)
+
+# 정수로 저장하는 금액 필드
+_AMOUNT_FIELDS = (
+    'thstrm_amount', 'thstrm_add_amount', 'frmtrm_amount', 'frmtrm_q_amount',
+    'frmtrm_add_amount', 'bfefrmtrm_amount'
+)
+
+_LINE_COLUMNS = (
+    ('source', 'corp_code', 'bsns_year', 'reprt_code', 'fs_div', 'sj_div', 'account_id', 'line_no',
+     'dart_account_id') + _TEXT_FIELDS + _AMOUNT_FIELDS
+)
+
+
+def _to_amount(value) -> Optional[int]:
+    """금액 문자열을 정수로 변환합니다. (빈 값/숫자가 아닌 값은 None)"""
+    if value is None or value == '':
+        return None
+    try:
+        return int(str(value).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def _account_key(item: Dict) -> str:
+    """
+    계정 식별자를 만듭니다.
+
+    표준계정코드(account_id)가 있으면 그대로 쓰고, 없거나 '-표준계정코드 미사용-'이면
+    계정명을 씁니다. 자본변동표처럼 같은 계정이 구성요소별로 반복되면 account_detail을 붙입니다.
+    """
+    account_id = item.get('account_id') or ''
+    if not account_id or account_id.startswith('-'):
+        account_id = item.get('account_nm') or ''
+    detail = item.get('account_detail')
+    if detail and detail != '-':
+        account_id = f"{account_id}|{detail}"
+    return account_id
+
+
+class FinancialWarehouse:
+    """
+    오픈다트에서 받은 재무제표를 계정 단위로 보관하는 로컬 저장소 (SQLite)
+
+    응답 캐시(DartResponseCache)와 달리 만료되지 않으며, 계정 한 줄이 한 행인 형태로
+    (corp_code, bsns_year, reprt_code, source, fs_div, line_no) 기준으로 저장합니다.
+    자본변동표의 기초/기말 자본처럼 계정 식별자(account_id)가 같은 줄이 여러 번 나오므로
+    account_id는 조회용 인덱스 컬럼일 뿐 고유하지 않습니다.
+    주요계정(fnlttSinglAcnt/fnlttMultiAcnt)과 전체 재무제표(fnlttSinglAcntAll)는
+    source 컬럼('key'/'full')으로 구분합니다.
+
+    저장된 보고서는 오픈다트 응답과 같은 형태로 복원할 수 있으므로 기존 파서를 그대로
+    사용할 수 있고, 회사별 시계열과 계정별 횡단면 조회용 인덱스를 둡니다.
+    """
+
+    SOURCE_KEY = 'key'
+    SOURCE_FULL = 'full'
+
+    def __init__(self, db_path: str = os.path.join('data', 'financials.db')):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        data_dir = os.path.dirname(db_path)
+        if data_dir and not os.path.exists(data_dir):
+            os.makedirs(data_dir, exist_ok=True)
+
+        conn = self._get_connection()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS filings (
+                source TEXT NOT NULL,
+                corp_code TEXT NOT NULL,
+                bsns_year TEXT NOT NULL,
+                reprt_code TEXT NOT NULL,
+                fs_div TEXT NOT NULL,
+                rcept_no TEXT,
+                line_count INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (source, corp_code, bsns_year, reprt_code, fs_div)
+            );
+
+            CREATE TABLE IF NOT EXISTS statement_lines (
+                source TEXT NOT NULL,
+                corp_code TEXT NOT NULL,
+                bsns_year TEXT NOT NULL,
+                reprt_code TEXT NOT NULL,
+                fs_div TEXT NOT NULL,
+                sj_div TEXT NOT NULL,
+                account_id TEXT NOT NULL,
+                line_no INTEGER NOT NULL,
+                dart_account_id TEXT,
+                rcept_no TEXT,
+                stock_code TEXT,
+                sj_nm TEXT,
+                account_nm TEXT,
+                account_detail TEXT,
+                currency TEXT,
+                ord TEXT,
+                thstrm_nm TEXT,
+                thstrm_dt TEXT,
+                frmtrm_nm TEXT,
+                frmtrm_dt TEXT,
+                frmtrm_q_nm TEXT,
+                bfefrmtrm_nm TEXT,
+                bfefrmtrm_dt TEXT,
+                thstrm_amount INTEGER,
+                thstrm_add_amount INTEGER,
+                frmtrm_amount INTEGER,
+                frmtrm_q_amount INTEGER,
+                frmtrm_add_amount INTEGER,
+                bfefrmtrm_amount INTEGER,
+                PRIMARY KEY (corp_code, bsns_year, reprt_code, source, fs_div, line_no)
+            ) WITHOUT ROWID;
+
+            -- 계정별 횡단면 (같은 연도/보고서의 여러 회사)
+            CREATE INDEX IF NOT EXISTS idx_lines_account
+                ON statement_lines(account_id, bsns_year, reprt_code, fs_div, corp_code);
+            -- 회사별 계정 시계열
+            CREATE INDEX IF NOT EXISTS idx_lines_series
+                ON statement_lines(corp_code, account_id, reprt_code, fs_div, bsns_year);
+        ''')
+        conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """스레드/프로세스별 SQLite 연결을 반환합니다. (fork 이후에는 새로 연결)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def store(self, source: str, corp_code: str, bsns_year: str, reprt_code: str,
+              fs_div: str, items: Iterable[Dict]):
+        """
+        보고서 하나의 응답 항목을 저장합니다. 같은 보고서가 이미 있으면 교체합니다.
+
+        Args:
+            source: 'key'(주요계정) 또는 'full'(전체 재무제표)
+            corp_code, bsns_year, reprt_code: 보고서 식별자
+            fs_div: 전체 재무제표의 개별/연결구분 (주요계정은 항목마다 fs_div가 있으므로 '')
+            items: 오픈다트 응답의 list 항목
+        """
+        rows = []
+        for line_no, item in enumerate(items):
+            rows.append((
+                source, corp_code, bsns_year, reprt_code,
+                item.get('fs_div') or fs_div, item.get('sj_div') or '', _account_key(item), line_no,
+                item.get('account_id')
+            ) + tuple(item.get(field) for field in _TEXT_FIELDS)
+              + tuple(_to_amount(item.get(field)) for field in _AMOUNT_FIELDS))
+
+        if not rows:
+            return
+
+        placeholders = ', '.join('?' * len(_LINE_COLUMNS))
+        conn = self._get_connection()
+        try:
+            with conn:
+                conn.execute('''
+                    DELETE FROM statement_lines
+                    WHERE corp_code = ? AND bsns_year = ? AND reprt_code = ? AND source = ?
+                      AND (? = '' OR fs_div = ?)
+                ''', (corp_code, bsns_year, reprt_code, source, fs_div, fs_div))
+                conn.executemany(
+                    f"INSERT INTO statement_lines ({', '.join(_LINE_COLUMNS)}) VALUES ({placeholders})",
+                    rows
+                )
+                conn.execute('''
+                    INSERT OR REPLACE INTO filings
+                        (source, corp_code, bsns_year, reprt_code, fs_div, rcept_no, line_count, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (source, corp_code, bsns_year, reprt_code, fs_div, rows[0][9], len(rows), time.time()))
+        except sqlite3.Error as e:
+            print(f"재무 저장소 저장 오류: {e}")
+
+    def load(self, source: str, corp_code: str, bsns_year: str, reprt_code: str,
+             fs_div: str = '') -> Optional[Dict]:
+        """
+        저장된 보고서를 오픈다트 응답과 같은 형태({'status': '000', 'list': [...]})로 복원합니다.
+
+        Returns:
+            복원된 응답 또는 None (저장된 적이 없는 경우)
+        """
+        conn = self._get_connection()
+        try:
+            filing = conn.execute('''
+                SELECT 1 FROM filings
+                WHERE source = ? AND corp_code = ? AND bsns_year = ? AND reprt_code = ? AND fs_div = ?
+            ''', (source, corp_code, bsns_year, reprt_code, fs_div)).fetchone()
+            if filing is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+
+            rows = conn.execute(f'''
+                SELECT {', '.join(_LINE_COLUMNS)} FROM statement_lines
+                WHERE corp_code = ? AND bsns_year = ? AND reprt_code = ? AND source = ?
+                  AND (? = '' OR fs_div = ?)
+                ORDER BY line_no
+            ''', (corp_code, bsns_year, reprt_code, source, fs_div, fs_div)).fetchall()
+        except sqlite3.Error as e:
+            print(f"재무 저장소 조회 오류: {e}")
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return {'status': '000', 'message': '정상', 'list': [self._row_to_item(row, source) for row in rows]}
+
+    @staticmethod
+    def _row_to_item(row: Tuple, source: str) -> Dict:
+        """저장된 행을 오픈다트 응답 항목으로 되돌립니다."""
+        values = dict(zip(_LINE_COLUMNS, row))
+        item = {
+            'corp_code': values['corp_code'],
+            'bsns_year': values['bsns_year'],
+            'reprt_code': values['reprt_code'],
+            'sj_div': values['sj_div'],
+        }
+        if source == FinancialWarehouse.SOURCE_KEY:
+            item['fs_div'] = values['fs_div']
+        if values['dart_account_id'] is not None:
+            item['account_id'] = values['dart_account_id']
+        for field in _TEXT_FIELDS:
+            if values[field] is not None:
+                item[field] = values[field]
+        for field in _AMOUNT_FIELDS:
+            amount = values[field]
+            item[field] = '' if amount is None else str(amount)
+        return item
+
+    def has_filing(self, source: str, corp_code: str, bsns_year: str, reprt_code: str, fs_div: str = '') -> bool:
+        """보고서가 저장되어 있는지 확인합니다."""
+        row = self._get_connection().execute('''
+            SELECT 1 FROM filings
+            WHERE source = ? AND corp_code = ? AND bsns_year = ? AND reprt_code = ? AND fs_div = ?
+        ''', (source, corp_code, bsns_year, reprt_code, fs_div)).fetchone()
+        return row is not None
+
+    def time_series(self, corp_code: str, account_id: str, reprt_code: str = '11011',
+                    fs_div: str = 'CFS', source: str = SOURCE_KEY) -> List[Dict]:
+        """
+        한 회사의 계정 금액을 사업연도 순으로 반환합니다.
+
+        account_id는 표준계정코드(전체 재무제표) 또는 계정명(주요계정)입니다.
+        """
+        rows = self._get_connection().execute('''
+            SELECT bsns_year, thstrm_amount, frmtrm_amount, bfefrmtrm_amount
+            FROM statement_lines
+            WHERE corp_code = ? AND account_id = ? AND reprt_code = ? AND fs_div = ? AND source = ?
+            ORDER BY bsns_year
+        ''', (corp_code, account_id, reprt_code, fs_div, source)).fetchall()
+        return [{
+            'bsns_year': bsns_year,
+            'current_amount': current,
+            'previous_amount': previous,
+            'before_previous_amount': before_previous
+        } for bsns_year, current, previous, before_previous in rows]
+
+    def cross_section(self, account_id: str, bsns_year: str, reprt_code: str = '11011',
+                      fs_div: str = 'CFS', source: str = SOURCE_KEY) -> List[Dict]:
+        """같은 연도/보고서에서 여러 회사의 계정 금액을 반환합니다."""
+        rows = self._get_connection().execute('''
+            SELECT corp_code, thstrm_amount
+            FROM statement_lines
+            WHERE account_id = ? AND bsns_year = ? AND reprt_code = ? AND fs_div = ? AND source = ?
+            ORDER BY corp_code
+        ''', (account_id, bsns_year, reprt_code, fs_div, source)).fetchall()
+        return [{'corp_code': corp_code, 'amount': amount} for corp_code, amount in rows]
+
+    def account_values(self, account_ids: List[str], reprt_code: str = '11011', fs_div: str = 'CFS',
+                       source: str = SOURCE_KEY, years: Optional[List[str]] = None) -> List[Tuple]:
+        """
+        여러 계정의 당기/전기 금액을 회사·연도 구분 없이 한 번에 반환합니다. (일괄 지표 계산용)
+
+        Returns:
+            (corp_code, bsns_year, account_id, thstrm_amount, frmtrm_amount) 목록
+        """
+        params = list(account_ids) + [reprt_code, fs_div, source]
+        year_filter = ''
+        if years:
+            year_filter = f"AND bsns_year IN ({', '.join('?' * len(years))})"
+            params += list(years)
+
+        return self._get_connection().execute(f'''
+            SELECT corp_code, bsns_year, account_id, thstrm_amount, frmtrm_amount
+            FROM statement_lines
+            WHERE account_id IN ({', '.join('?' * len(account_ids))})
+              AND reprt_code = ? AND fs_div = ? AND source = ? {year_filter}
+        ''', params).fetchall()
+
+    def stats(self) -> Dict:
+        """저장소 통계를 반환합니다."""
+        conn = self._get_connection()
+        filings, lines = conn.execute('''
+            SELECT (SELECT COUNT(*) FROM filings), (SELECT COUNT(*) FROM statement_lines)
+        ''').fetchone()
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'filings': filings,
+                'lines': lines,
+                'file_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+            }
@@ -1,22 +1,375 @@
 import requests
 import json
 import os
-from typing import Dict, List, Optional
+import random
+import sqlite3
+import threading
+import time
+import zlib
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from compact_statements import parse_key_accounts
+from financial_warehouse import FinancialWarehouse
+
 # 환경변수 로드
 load_dotenv()
 
+class DartResponseCache:
+    """
+    오픈다트 API 원본 응답을 로컬 디스크(SQLite)에 압축 저장하는 캐시 클래스
+
+    같은 파일을 모든 gunicorn 워커가 공유하며, 보고서 코드별 TTL과
+    전체 용량 기준 LRU 삭제를 지원합니다.
+    """
+
+    # 보고서 코드별 보관 기간(초) - 제출된 사업보고서는 거의 바뀌지 않음
+    DEFAULT_TTLS = {
+        '11011': 30 * 24 * 3600,  # 사업보고서
+        '11012': 7 * 24 * 3600,   # 반기보고서
+        '11013': 7 * 24 * 3600,   # 1분기보고서
+        '11014': 7 * 24 * 3600,   # 3분기보고서
+    }
+    DEFAULT_TTL = 24 * 3600
+
+    # 적중 시 최근 사용 시각을 다시 기록하는 최소 간격(초) - LRU 삭제에는 이 정도 정밀도로 충분하고,
+    # 적중할 때마다 쓰면 읽기 요청이 SQLite 쓰기 잠금을 두고 저장과 경쟁함
+    DEFAULT_TOUCH_INTERVAL = 3600
+
+    def __init__(self, db_path: str = os.path.join('cache', 'dart_responses.db'),
+                 max_bytes: int = 256 * 1024 * 1024, ttls: Optional[Dict[str, int]] = None,
+                 touch_interval: float = DEFAULT_TOUCH_INTERVAL):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        cache_dir = os.path.dirname(db_path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+
+        conn = self._get_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                reprt_code TEXT,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)')
+        conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """스레드/프로세스별 SQLite 연결을 반환합니다. (fork 이후에는 새로 연결)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict) -> str:
+        """인증키를 제외한 전체 요청 파라미터로 캐시 키를 생성합니다."""
+        items = sorted((k, str(v)) for k, v in params.items() if k != 'crtfc_key')
+        raw = endpoint + '?' + '&'.join(f'{k}={v}' for k, v in items)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """캐시된 응답을 반환합니다. 없거나 만료된 경우 None을 반환합니다."""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+
+        try:
+            conn = self._get_connection()
+            row = conn.execute(
+                'SELECT payload, expires_at, last_access FROM responses WHERE cache_key = ?', (key,)
+            ).fetchone()
+
+            if row is None or row[1] < now:
+                if row is not None:
+                    conn.execute('DELETE FROM responses WHERE cache_key = ?', (key,))
+                    conn.commit()
+                with self._lock:
+                    self.misses += 1
+                return None
+
+            if now - row[2] >= self.touch_interval:
+                conn.execute('UPDATE responses SET last_access = ? WHERE cache_key = ?', (now, key))
+                conn.commit()
+            data = json.loads(zlib.decompress(row[0]).decode('utf-8'))
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            print(f"캐시 조회 오류: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def set(self, endpoint: str, params: Dict, data: Dict):
+        """응답을 압축하여 저장하고, 용량 초과 시 오래된 항목부터 삭제합니다."""
+        key = self.make_key(endpoint, params)
+        reprt_code = params.get('reprt_code')
+        ttl = self.ttls.get(reprt_code, self.DEFAULT_TTL)
+        payload = zlib.compress(json.dumps(data, ensure_ascii=False).encode('utf-8'), 6)
+        now = time.time()
+
+        try:
+            conn = self._get_connection()
+            conn.execute('''
+                INSERT OR REPLACE INTO responses
+                    (cache_key, endpoint, reprt_code, payload, size, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, endpoint, reprt_code, payload, len(payload), now + ttl, now))
+            conn.commit()
+            self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"캐시 저장 오류: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """만료된 항목과 용량 초과분(최근 사용 시각이 오래된 순)을 삭제합니다."""
+        conn.execute('DELETE FROM responses WHERE expires_at < ?', (time.time(),))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            conn.commit()
+            return
+
+        removed = 0
+        for key, size in conn.execute(
+            'SELECT cache_key, size FROM responses ORDER BY last_access'
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM responses WHERE cache_key = ?', (key,))
+            total -= size
+            removed += 1
+        conn.commit()
+
+        with self._lock:
+            self.evictions += removed
+
+    def clear(self):
+        """캐시를 모두 비웁니다."""
+        conn = self._get_connection()
+        conn.execute('DELETE FROM responses')
+        conn.commit()
+
+    def stats(self) -> Dict:
+        """적중/실패 횟수와 저장 현황을 반환합니다."""
+        conn = self._get_connection()
+        entries, total_bytes = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()
+        with self._lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0,
+            'evictions': evictions,
+            'entries': entries,
+            'total_bytes': total_bytes,
+            'max_bytes': self.max_bytes
+        }
+
 class OpenDartAPI:
     """오픈다트 API 클래스"""
     
-    def __init__(self, api_key: str):
+    # 다중회사 주요계정 API 1회 호출당 최대 회사 수
+    MULTI_ACCOUNT_MAX_CORPS = 100
+    
+    # 재시도 대상 HTTP 상태 코드와 오픈다트 상태 코드 (020: 요청 제한 초과)
+    RETRY_HTTP_STATUSES = {429, 500, 502, 503, 504}
+    RETRY_DART_STATUSES = {'020'}
+    
+    def __init__(self, api_key: str, cache: Optional[DartResponseCache] = None,
+                 warehouse: Optional[FinancialWarehouse] = None, pool_size: int = 10, connect_timeout: float = 3.05, read_timeout: float = 10,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0):
         self.api_key = api_key
         self.base_url = "https://opendart.fss.or.kr/api"
+        self.cache = cache
+        self.warehouse = warehouse
+        
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+        
+        self._stats_lock = threading.Lock()
+        self._latency_stats = {}
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """keep-alive 연결을 재사용하는 세션 (첫 요청 때 생성, 호스트당 연결 수 = 워커 스레드 수)"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """지수 백오프에 full jitter를 적용한 대기 시간(초)을 반환합니다."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    def _record_latency(self, endpoint: str, elapsed: float, error: bool = False, retry: bool = False):
+        """엔드포인트별 응답 시간을 기록합니다."""
+        self._local.http_calls = getattr(self._local, 'http_calls', 0) + 1
+        with self._stats_lock:
+            stats = self._latency_stats.get(endpoint)
+            if stats is None:
+                stats = {'count': 0, 'errors': 0, 'retries': 0, 'total': 0.0, 'max': 0.0,
+                         'samples': deque(maxlen=500)}
+                self._latency_stats[endpoint] = stats
+            stats['count'] += 1
+            stats['total'] += elapsed
+            stats['max'] = max(stats['max'], elapsed)
+            stats['samples'].append(elapsed)
+            if error:
+                stats['errors'] += 1
+            if retry:
+                stats['retries'] += 1
+    
+    def _thread_http_calls(self) -> int:
+        """현재 스레드에서 지금까지 보낸 HTTP 요청 수 (재시도 포함, 캐시/저장소 응답 제외)"""
+        return getattr(self._local, 'http_calls', 0)
+    
+    def get_latency_stats(self) -> Dict:
+        """엔드포인트별 업스트림 호출 통계(ms)를 반환합니다."""
+        result = {}
+        with self._stats_lock:
+            for endpoint, stats in self._latency_stats.items():
+                samples = sorted(stats['samples'])
+                result[endpoint] = {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'retries': stats['retries'],
+                    'avg_ms': round(stats['total'] / stats['count'] * 1000, 2),
+                    'max_ms': round(stats['max'] * 1000, 2),
+                    'p50_ms': round(samples[len(samples) // 2] * 1000, 2),
+                    'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2)
+                }
+        return result
+    
+    def _request(self, endpoint: str, params: Dict, label: str = "") -> Optional[Dict]:
+        """
+        오픈다트 API를 호출합니다. 캐시가 설정된 경우 캐시를 먼저 조회합니다.
+        
+        Args:
+            endpoint: API 엔드포인트 (예: fnlttSinglAcnt.json)
+            params: 요청 파라미터 (crtfc_key 포함)
+            label: 오류 메시지 접두어
+        
+        Returns:
+            응답 데이터 딕셔너리 또는 None (오류 시)
+        """
+        return self._request_with_status(endpoint, params, label)[0]
+    
+    def _request_with_status(self, endpoint: str, params: Dict, label: str = "") -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        _request와 같지만 오픈다트 상태 코드를 함께 반환합니다.
+        
+        Returns:
+            (응답 데이터 또는 None, 상태 코드) - 상태 코드는 정상이면 '000', 데이터 없음이면 '013',
+            네트워크/HTTP 오류로 응답을 받지 못했으면 None
+        """
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached, '000'
+        
+        url = f"{self.base_url}/{endpoint}"
+        
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            started = time.perf_counter()
+            
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                
+                if response.status_code in self.RETRY_HTTP_STATUSES and not last_attempt:
+                    self._record_latency(endpoint, time.perf_counter() - started, error=True, retry=True)
+                    time.sleep(self._backoff_delay(attempt))
+                    continue
+                
+                response.raise_for_status()
+                data = response.json()
+                throttled = data.get('status') in self.RETRY_DART_STATUSES and not last_attempt
+                self._record_latency(endpoint, time.perf_counter() - started, retry=throttled)
+                
+                if data.get('status') == '000':  # 정상
+                    if self.cache is not None:
+                        self.cache.set(endpoint, params, data)
+                    return data, '000'
+                elif throttled:
+                    time.sleep(self._backoff_delay(attempt))
+                    continue
+                else:
+                    print(f"{label}API 오류: {data.get('status')} - {data.get('message')}")
+                    return None, data.get('status')
+                
+            except (requests.Timeout, requests.ConnectionError) as e:
+                self._record_latency(endpoint, time.perf_counter() - started, error=True, retry=not last_attempt)
+                if last_attempt:
+                    print(f"{label}네트워크 오류: {e}")
+                    return None, None
+                time.sleep(self._backoff_delay(attempt))
+            except requests.RequestException as e:
+                self._record_latency(endpoint, time.perf_counter() - started, error=True)
+                print(f"{label}네트워크 오류: {e}")
+                return None, None
+            except json.JSONDecodeError as e:
+                self._record_latency(endpoint, time.perf_counter() - started, error=True)
+                print(f"{label}JSON 파싱 오류: {e}")
+                return None, None
+        
+        return None, None
+    
+    def _load_stored(self, source: str, corp_code: str, bsns_year: str, reprt_code: str,
+                     fs_div: str = '') -> Optional[Dict]:
+        """재무 저장소에 보고서가 있으면 오픈다트 응답 형태로 반환합니다."""
+        if self.warehouse is None:
+            return None
+        return self.warehouse.load(source, corp_code, bsns_year, reprt_code, fs_div)
+    
+    def _store(self, source: str, corp_code: str, bsns_year: str, reprt_code: str,
+               fs_div: str, data: Optional[Dict]):
+        """정상 응답을 재무 저장소에 기록합니다."""
+        if self.warehouse is not None and data and data.get('list'):
+            self.warehouse.store(source, corp_code, bsns_year, reprt_code, fs_div, data['list'])
     
     def get_financial_data(self, corp_code: str, bsns_year: str, reprt_code: str = "11011") -> Optional[Dict]:
         """
-        단일회사 주요계정 정보를 가져옵니다.
+        단일회사 주요계정 정보를 가져옵니다. 재무 저장소가 있으면 저장소를 먼저 조회합니다.
         
         Args:
             corp_code: 고유번호 (8자리)
@@ -27,7 +380,6 @@ class OpenDartAPI:
         Returns:
             재무데이터 딕셔너리 또는 None (오류 시)
         """
-        url = f"{self.base_url}/fnlttSinglAcnt.json"
         params = {
             'crtfc_key': self.api_key,
             'corp_code': corp_code,
@@ -35,24 +387,200 @@ class OpenDartAPI:
             'reprt_code': reprt_code
         }
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get('status') == '000':  # 정상
-                return data
+        stored = self._load_stored(FinancialWarehouse.SOURCE_KEY, corp_code, bsns_year, reprt_code)
+        if stored is not None:
+            return stored
+        
+        data = self._request("fnlttSinglAcnt.json", params)
+        self._store(FinancialWarehouse.SOURCE_KEY, corp_code, bsns_year, reprt_code, '', data)
+        return data
+    
+    def get_financial_data_batch(self, corp_codes: List[str], bsns_year: str, reprt_code: str = "11011",
+                                 max_workers: int = 4, compact: bool = False) -> Dict[str, Dict]:
+        """
+        다중회사 주요계정 API(fnlttMultiAcnt)로 여러 회사의 주요계정 정보를 한 번에 가져옵니다.
+        
+        회사 목록을 호출당 최대 회사 수 단위로 나누어 동시에 조회한 뒤,
+        응답을 회사별로 분리하여 parse_financial_data와 같은 구조로 반환합니다.
+        
+        Args:
+            corp_codes: 고유번호 목록
+            bsns_year: 사업연도 (4자리)
+            reprt_code: 보고서 코드 (기본값: 11011 - 사업보고서)
+            max_workers: 동시에 호출할 묶음 수
+            compact: True이면 재무제표를 CompactStatement로 보관 (많은 회사를 메모리에 둘 때)
+        
+        Returns:
+            {고유번호: 파싱된 재무데이터} 딕셔너리 (데이터가 없는 회사는 제외)
+        """
+        unique_codes = list(dict.fromkeys(corp_codes))
+        
+        # 재무 저장소에 있는 회사는 호출하지 않음
+        items_by_corp = {}
+        for corp_code in unique_codes:
+            stored = self._load_stored(FinancialWarehouse.SOURCE_KEY, corp_code, bsns_year, reprt_code)
+            if stored is not None:
+                items_by_corp[corp_code] = stored['list']
+        
+        missing_codes = [corp_code for corp_code in unique_codes if corp_code not in items_by_corp]
+        chunks = [missing_codes[i:i + self.MULTI_ACCOUNT_MAX_CORPS]
+                  for i in range(0, len(missing_codes), self.MULTI_ACCOUNT_MAX_CORPS)]
+        
+        def fetch_chunk(chunk: List[str]) -> Dict[str, List[Dict]]:
+            return self.fetch_multi_account(chunk, bsns_year, reprt_code)[0]
+        
+        if len(chunks) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                responses = list(executor.map(fetch_chunk, chunks))
+        else:
+            responses = [fetch_chunk(chunk) for chunk in chunks]
+        
+        for fetched in responses:
+            items_by_corp.update(fetched)
+        
+        parse = parse_key_accounts if compact else self.parse_financial_data
+        return {
+            corp_code: parse({'list': items_by_corp[corp_code]})
+            for corp_code in unique_codes
+            if corp_code in items_by_corp
+        }
+    
+    def fetch_multi_account(self, corp_codes: List[str], bsns_year: str,
+                            reprt_code: str = "11011") -> Tuple[Dict[str, List[Dict]], Optional[str]]:
+        """
+        다중회사 주요계정 API를 한 번 호출하고, 응답 항목을 회사별로 나누어 재무 저장소에 기록합니다.
+        
+        Args:
+            corp_codes: 고유번호 목록 (최대 MULTI_ACCOUNT_MAX_CORPS개)
+            bsns_year: 사업연도 (4자리)
+            reprt_code: 보고서 코드
+        
+        Returns:
+            ({고유번호: 응답 항목 목록}, 오픈다트 상태 코드 - _request_with_status 참고)
+        """
+        params = {
+            'crtfc_key': self.api_key,
+            'corp_code': ','.join(corp_codes),
+            'bsns_year': bsns_year,
+            'reprt_code': reprt_code
+        }
+        raw_data, status = self._request_with_status("fnlttMultiAcnt.json", params, "다중회사 ")
+        
+        fetched = {}
+        for item in (raw_data or {}).get('list', []):
+            fetched.setdefault(item.get('corp_code'), []).append(item)
+        for corp_code, items in fetched.items():
+            self._store(FinancialWarehouse.SOURCE_KEY, corp_code, bsns_year, reprt_code, '', {'list': items})
+        return fetched, status
+    
+    @staticmethod
+    def plan_history_calls(from_year: int, to_year: int, covered: Optional[Set[int]] = None,
+                           periods_per_report: int = 3) -> List[int]:
+        """
+        연도 구간을 덮는 데 필요한 최소한의 보고서 사업연도 목록을 만듭니다.
+        
+        사업보고서 하나에는 당기/전기/전전기 3개 연도가 들어 있으므로 가장 최근 연도부터
+        3년 간격으로 고르면 됩니다. (예: 2015~2024 → 2024, 2021, 2018, 2015)
+        
+        Args:
+            from_year, to_year: 조회할 연도 구간 (양 끝 포함)
+            covered: 이미 확보한 연도 (호출하지 않음)
+            periods_per_report: 보고서 하나에 들어 있는 연도 수
+        """
+        covered = covered or set()
+        plan = []
+        year = to_year
+        while year >= from_year:
+            if year in covered:
+                year -= 1
+                continue
+            plan.append(year)
+            year -= periods_per_report
+        return plan
+    
+    def get_financial_history(self, corp_code: str, from_year: int, to_year: int,
+                              reprt_code: str = "11011") -> Dict:
+        """
+        여러 해의 주요계정을 최소한의 호출로 모아 연도별 시계열로 반환합니다.
+        
+        재무 저장소에 있는 보고서를 먼저 사용하고, 비어 있는 연도만 plan_history_calls로
+        정한 보고서를 조회합니다. 보고서를 받을 수 없으면 그 아래 연도부터 다시 계획합니다.
+        여러 보고서에 같은 연도가 있으면 가장 최근 보고서의 (재작성된) 금액을 사용합니다.
+        
+        사업보고서(11011)만 전기/전전기가 같은 기준이므로, 다른 보고서 코드는 보고서 하나가
+        해당 연도 하나만 채웁니다.
+        
+        Returns:
+            {
+                'corp_code', 'reprt_code', 'years': [연도...],
+                'consolidated' / 'separate': {'balance_sheet': {계정명: {연도: 금액}}, 'income_statement': {...}},
+                'sources': {연도: 금액을 가져온 보고서 사업연도},
+                'reports': [사용한 보고서 사업연도...], 'missing_years': [...],
+                'upstream_calls': 실제 오픈다트 HTTP 요청 수 (재시도 포함, 캐시/저장소 응답 제외)
+            }
+        """
+        periods = 3 if reprt_code == "11011" else 1
+        years = list(range(from_year, to_year + 1))
+        reports = {}
+        
+        # 저장소에 이미 있는 보고서는 호출 비용이 없으므로 모두 사용
+        if self.warehouse is not None:
+            for report_year in range(from_year, to_year + periods):
+                if self.warehouse.has_filing(FinancialWarehouse.SOURCE_KEY, corp_code, str(report_year), reprt_code):
+                    reports[report_year] = self.get_financial_data(corp_code, str(report_year), reprt_code)
+        
+        def covered_years() -> Set[int]:
+            return {report_year - offset for report_year in reports for offset in range(periods)}
+        
+        attempted = set(reports)
+        missing = set()
+        # 응답 캐시나 저장소에서 받은 보고서는 빼고 실제 HTTP 요청만 셈 (다른 요청 스레드와 섞이지 않도록 스레드별)
+        http_calls_before = self._thread_http_calls()
+        while True:
+            plan = [year for year in self.plan_history_calls(from_year, to_year, covered_years() | missing, periods)
+                    if year not in attempted]
+            if not plan:
+                break
+            report_year = plan[0]
+            attempted.add(report_year)
+            raw_data = self.get_financial_data(corp_code, str(report_year), reprt_code)
+            if raw_data and raw_data.get('list'):
+                reports[report_year] = raw_data
             else:
-                print(f"API 오류: {data.get('status')} - {data.get('message')}")
-                return None
-                
-        except requests.RequestException as e:
-            print(f"네트워크 오류: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"JSON 파싱 오류: {e}")
-            return None
+                # 해당 연도 보고서가 없음 → 그 연도는 비우고 아래 연도부터 다시 계획
+                missing.add(report_year)
+        
+        history = {
+            'corp_code': corp_code,
+            'reprt_code': reprt_code,
+            'years': years,
+            'consolidated': {'balance_sheet': {}, 'income_statement': {}},
+            'separate': {'balance_sheet': {}, 'income_statement': {}},
+            'sources': {},
+            'reports': sorted(reports),
+            'upstream_calls': self._thread_http_calls() - http_calls_before
+        }
+        data_types = {'CFS': 'consolidated', 'OFS': 'separate'}
+        statements = {'BS': 'balance_sheet', 'IS': 'income_statement'}
+        amount_fields = ('thstrm_amount', 'frmtrm_amount', 'bfefrmtrm_amount')[:periods]
+        
+        # 오래된 보고서부터 채우고 최근 보고서로 덮어써 재작성 금액을 우선
+        for report_year in sorted(reports):
+            for item in reports[report_year].get('list', []):
+                data_type = data_types.get(item.get('fs_div'))
+                statement = statements.get(item.get('sj_div'))
+                if not data_type or not statement:
+                    continue
+                series = history[data_type][statement].setdefault(item.get('account_nm'), {})
+                for offset, field in enumerate(amount_fields):
+                    year = report_year - offset
+                    amount = item.get(field)
+                    if from_year <= year <= to_year and amount not in (None, '', '-'):
+                        series[year] = self._parse_amount(amount)
+                        history['sources'][year] = report_year
+        
+        history['missing_years'] = [year for year in years if year not in history['sources']]
+        return history
     
     def parse_financial_data(self, raw_data: Dict) -> Dict:
         """
@@ -140,7 +668,7 @@ class OpenDartAPI:
     
     def get_full_financial_statements(self, corp_code: str, bsns_year: str, reprt_code: str = "11011", fs_div: str = "CFS") -> Optional[Dict]:
         """
-        단일회사 전체 재무제표 정보를 가져옵니다.
+        단일회사 전체 재무제표 정보를 가져옵니다. 재무 저장소가 있으면 저장소를 먼저 조회합니다.
         
         Args:
             corp_code: 고유번호 (8자리)
@@ -151,7 +679,16 @@ class OpenDartAPI:
         Returns:
             전체 재무제표 데이터 딕셔너리 또는 None (오류 시)
         """
-        url = f"{self.base_url}/fnlttSinglAcntAll.json"
+        return self.fetch_full_financial_statements(corp_code, bsns_year, reprt_code, fs_div)[0]
+    
+    def fetch_full_financial_statements(self, corp_code: str, bsns_year: str, reprt_code: str = "11011",
+                                        fs_div: str = "CFS") -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        get_full_financial_statements와 같지만 오픈다트 상태 코드를 함께 반환합니다.
+        
+        Returns:
+            (전체 재무제표 데이터 또는 None, 상태 코드) - 재무 저장소에서 읽었으면 '000'
+        """
         params = {
             'crtfc_key': self.api_key,
             'corp_code': corp_code,
@@ -160,24 +697,13 @@ class OpenDartAPI:
             'fs_div': fs_div
         }
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get('status') == '000':  # 정상
-                return data
-            else:
-                print(f"전체 재무제표 API 오류: {data.get('status')} - {data.get('message')}")
-                return None
-                
-        except requests.RequestException as e:
-            print(f"전체 재무제표 네트워크 오류: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"전체 재무제표 JSON 파싱 오류: {e}")
-            return None
+        stored = self._load_stored(FinancialWarehouse.SOURCE_FULL, corp_code, bsns_year, reprt_code, fs_div)
+        if stored is not None:
+            return stored, '000'
+        
+        data, status = self._request_with_status("fnlttSinglAcntAll.json", params, "전체 재무제표 ")
+        self._store(FinancialWarehouse.SOURCE_FULL, corp_code, bsns_year, reprt_code, fs_div, data)
+        return data, status
 
     def parse_full_financial_statements(self, raw_data: Dict) -> Dict:
         """
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+
+import aiohttp
+
+from opendart_api import OpenDartAPI, DartResponseCache
+from financial_warehouse import FinancialWarehouse
+
+
+class AsyncRateLimiter:
+    """초당 요청 수를 제한하는 비동기 레이트 리미터 (전역 공유용)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """다음 요청 가능 시각까지 대기합니다."""
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncOpenDartAPI:
+    """
+    오픈다트 API 비동기 클래스
+
+    OpenDartAPI(self.api)를 감싸며, 조회 메서드는 코루틴입니다. 재시도 설정, 응답 시간 통계,
+    캐시와 재무 저장소는 감싼 OpenDartAPI의 것을 그대로 쓰고, 파싱/지표 계산 메서드는 위임합니다.
+    SQLite 캐시·저장소 접근은 이벤트 루프를 막지 않도록 기본 스레드 풀에서 실행합니다.
+
+    사용 예:
+        async with AsyncOpenDartAPI(api_key, concurrency=20, rate_limit=15) as api:
+            async for corp_code, raw in api.fetch_financial_data_many(corp_codes, '2023'):
+                ...
+    """
+
+    def __init__(self, api_key: str, cache: Optional[DartResponseCache] = None,
+                 concurrency: int = 10, rate_limit: float = 10, **kwargs):
+        """
+        Args:
+            api_key: 오픈다트 API 키
+            cache: 응답 캐시
+            concurrency: 동시에 진행할 최대 요청 수
+            rate_limit: 초당 최대 요청 수 (0이면 제한 없음)
+            **kwargs: OpenDartAPI 설정 (warehouse, connect_timeout, read_timeout, max_retries 등)
+        """
+        kwargs.setdefault('pool_size', concurrency)
+        self.api = OpenDartAPI(api_key, cache=cache, **kwargs)
+        self.concurrency = concurrency
+        self.rate_limiter = AsyncRateLimiter(rate_limit)
+        self._semaphore = None
+        self._aio_session = None
+
+    @property
+    def api_key(self) -> str:
+        return self.api.api_key
+
+    @property
+    def base_url(self) -> str:
+        return self.api.base_url
+
+    @base_url.setter
+    def base_url(self, value: str):
+        self.api.base_url = value
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_aio_session(self) -> aiohttp.ClientSession:
+        """이벤트 루프 안에서 aiohttp 세션과 세마포어를 생성합니다."""
+        if self._aio_session is None or self._aio_session.closed:
+            connect_timeout, read_timeout = self.api.timeout
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+            timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+            self._aio_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._aio_session
+
+    async def close(self):
+        """aiohttp 세션을 닫습니다."""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+
+    @staticmethod
+    async def _run_blocking(func, *args):
+        """블로킹 호출(SQLite 등)을 기본 스레드 풀에서 실행합니다."""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _request(self, endpoint: str, params: Dict, label: str = "") -> Optional[Dict]:
+        """
+        오픈다트 API를 비동기로 호출합니다. 재시도/캐시 규칙은 OpenDartAPI와 같습니다.
+        """
+        api = self.api
+        if api.cache is not None:
+            cached = await self._run_blocking(api.cache.get, endpoint, params)
+            if cached is not None:
+                return cached
+
+        session = self._get_aio_session()
+        url = f"{api.base_url}/{endpoint}"
+
+        for attempt in range(api.max_retries + 1):
+            last_attempt = attempt == api.max_retries
+
+            async with self._semaphore:
+                await self.rate_limiter.acquire()
+                started = time.perf_counter()
+
+                try:
+                    async with session.get(url, params=params) as response:
+                        if response.status in api.RETRY_HTTP_STATUSES and not last_attempt:
+                            api._record_latency(endpoint, time.perf_counter() - started, error=True, retry=True)
+                            retry = True
+                        else:
+                            response.raise_for_status()
+                            data = json.loads(await response.text())
+                            retry = data.get('status') in api.RETRY_DART_STATUSES and not last_attempt
+                            api._record_latency(endpoint, time.perf_counter() - started, retry=retry)
+
+                except (aiohttp.ServerTimeoutError, asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                    api._record_latency(endpoint, time.perf_counter() - started, error=True, retry=not last_attempt)
+                    if last_attempt:
+                        print(f"{label}네트워크 오류: {e}")
+                        return None
+                    retry = True
+                except aiohttp.ClientError as e:
+                    api._record_latency(endpoint, time.perf_counter() - started, error=True)
+                    print(f"{label}네트워크 오류: {e}")
+                    return None
+                except json.JSONDecodeError as e:
+                    api._record_latency(endpoint, time.perf_counter() - started, error=True)
+                    print(f"{label}JSON 파싱 오류: {e}")
+                    return None
+
+            # 백오프 대기 중에는 세마포어를 점유하지 않음
+            if retry:
+                await asyncio.sleep(api._backoff_delay(attempt))
+                continue
+
+            if data.get('status') == '000':  # 정상
+                if api.cache is not None:
+                    await self._run_blocking(api.cache.set, endpoint, params, data)
+                return data
+
+            print(f"{label}API 오류: {data.get('status')} - {data.get('message')}")
+            return None
+
+        return None
+
+    async def get_financial_data(self, corp_code: str, bsns_year: str, reprt_code: str = "11011") -> Optional[Dict]:
+        """단일회사 주요계정 정보를 비동기로 가져옵니다. (OpenDartAPI.get_financial_data 참고)"""
+        params = {
+            'crtfc_key': self.api.api_key,
+            'corp_code': corp_code,
+            'bsns_year': bsns_year,
+            'reprt_code': reprt_code
+        }
+
+        stored = await self._run_blocking(self.api._load_stored, FinancialWarehouse.SOURCE_KEY, corp_code, bsns_year, reprt_code)
+        if stored is not None:
+            return stored
+
+        data = await self._request("fnlttSinglAcnt.json", params)
+        await self._run_blocking(self.api._store, FinancialWarehouse.SOURCE_KEY, corp_code, bsns_year, reprt_code, '', data)
+        return data
+
+    async def get_full_financial_statements(self, corp_code: str, bsns_year: str, reprt_code: str = "11011", fs_div: str = "CFS") -> Optional[Dict]:
+        """단일회사 전체 재무제표 정보를 비동기로 가져옵니다. (OpenDartAPI.get_full_financial_statements 참고)"""
+        params = {
+            'crtfc_key': self.api.api_key,
+            'corp_code': corp_code,
+            'bsns_year': bsns_year,
+            'reprt_code': reprt_code,
+            'fs_div': fs_div
+        }
+
+        stored = await self._run_blocking(self.api._load_stored, FinancialWarehouse.SOURCE_FULL, corp_code, bsns_year, reprt_code, fs_div)
+        if stored is not None:
+            return stored
+
+        data = await self._request("fnlttSinglAcntAll.json", params, "전체 재무제표 ")
+        await self._run_blocking(self.api._store, FinancialWarehouse.SOURCE_FULL, corp_code, bsns_year, reprt_code, fs_div, data)
+        return data
+
+    async def fetch_financial_data_many(self, corp_codes: Iterable[str], bsns_year: str, reprt_code: str = "11011",
+                                        full: bool = False, fs_div: str = "CFS") -> AsyncIterator[Tuple[str, Optional[Dict]]]:
+        """
+        여러 회사의 재무데이터를 동시에 조회하고, 완료되는 순서대로 반환합니다.
+
+        Args:
+            corp_codes: 고유번호 목록
+            bsns_year: 사업연도 (4자리)
+            reprt_code: 보고서 코드
+            full: True이면 전체 재무제표(fnlttSinglAcntAll), False이면 주요계정(fnlttSinglAcnt)
+            fs_div: 전체 재무제표 조회 시 개별/연결구분
+
+        Yields:
+            (고유번호, 원본 응답 또는 None)
+        """
+        async def fetch(corp_code: str):
+            if full:
+                return corp_code, await self.get_full_financial_statements(corp_code, bsns_year, reprt_code, fs_div)
+            return corp_code, await self.get_financial_data(corp_code, bsns_year, reprt_code)
+
+        tasks = [asyncio.ensure_future(fetch(corp_code)) for corp_code in corp_codes]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def parse_financial_data(self, raw_data: Dict) -> Dict:
+        """OpenDartAPI.parse_financial_data 위임"""
+        return self.api.parse_financial_data(raw_data)
+
+    def parse_full_financial_statements(self, raw_data: Dict) -> Dict:
+        """OpenDartAPI.parse_full_financial_statements 위임"""
+        return self.api.parse_full_financial_statements(raw_data)
+
+    def get_key_metrics(self, financial_data: Dict, use_consolidated: bool = True) -> Dict:
+        """OpenDartAPI.get_key_metrics 위임"""
+        return self.api.get_key_metrics(financial_data, use_consolidated)
+
+    def get_latency_stats(self) -> Dict:
+        """OpenDartAPI.get_latency_stats 위임"""
+        return self.api.get_latency_stats()
@@ -0,0 +1,563 @@
+"""
+포트폴리오 감사 리스크 일괄 분석 도구
+
+여러 회사의 AI 감사 리스크 분석을 한 번에 수행합니다. 주요계정은 다중회사 API로
+100개 회사씩 묶어 받고, 전체 재무제표는 회사별로 동시에 받으며, 모델 호출은 분당
+요청 수(RPM)와 분당 토큰 수(TPM) 한도 안에서 동시에 실행하고 실패하면 재시도합니다.
+
+결과는 출력 디렉토리에 회사별 JSON(companies/<고유번호>.json)과 전체 결과 파일
+(portfolio.json)로 저장합니다. 같은 출력 디렉토리로 다시 실행하면 이미 성공한 회사는
+건너뜁니다. (--force로 다시 분석)
+
+사용법:
+    python portfolio_audit.py --stock-codes 005930,000660 --year 2024
+    python portfolio_audit.py --corp-codes @clients.txt --year 2024 --rpm 15 --tpm 1000000
+    python portfolio_audit.py --stock-codes @clients.txt --fake-model  (GEMINI_API_KEY 불필요)
+
+RPM/TPM 한도 기록은 --rate-db 파일(기본값: PORTFOLIO_JOB_DB_PATH)에 두므로 같은 파일을 쓰는
+웹 서버의 포트폴리오 작업과 한도를 함께 사용합니다.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from ai_analysis import (AnalysisCache, AuditRiskAnalyzer, DEFAULT_MODEL_NAME, create_gemini_model,
+                         estimate_tokens, token_usage)
+from audit_prompt import AuditPromptBuilder, DEFAULT_MAX_INPUT_TOKENS
+from compact_statements import parse_full_statements
+from financial_warehouse import FinancialWarehouse
+from opendart_api import DartResponseCache, OpenDartAPI
+
+# 분석 응답 길이 기본 예상치 (실제 사용량을 받기 전까지 TPM 예약에 사용)
+DEFAULT_EXPECTED_OUTPUT_TOKENS = 2048
+
+
+class TokenRateLimiter:
+    """
+    최근 60초 동안의 요청 수와 토큰 수를 제한하는 스레드 안전 리미터
+
+    호출 전에 예상 토큰으로 자리를 예약(acquire)하고, 호출이 끝나면 실제 사용량으로
+    바로잡습니다(settle). 한 요청이 TPM보다 크면 창이 비었을 때 단독으로 허용합니다.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        """
+        Args:
+            rpm: 분당 최대 요청 수 (0이면 제한 없음)
+            tpm: 분당 최대 토큰 수 (0이면 제한 없음)
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.waited = 0.0
+        self._entries = deque()  # [예약 시각, 토큰 수]
+        self._tokens = 0
+        self._condition = threading.Condition()
+
+    def _prune(self, now: float):
+        while self._entries and now - self._entries[0][0] >= self.WINDOW:
+            self._tokens -= self._entries.popleft()[1]
+
+    def acquire(self, tokens: int) -> list:
+        """한도에 여유가 생길 때까지 기다린 뒤 예약 항목을 반환합니다."""
+        started = time.monotonic()
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                rpm_ok = not self.rpm or len(self._entries) < self.rpm
+                tpm_ok = not self.tpm or not self._entries or self._tokens + tokens <= self.tpm
+                if rpm_ok and tpm_ok:
+                    entry = [now, tokens]
+                    self._entries.append(entry)
+                    self._tokens += tokens
+                    self.waited += now - started
+                    return entry
+                # 가장 오래된 예약이 창을 벗어날 때까지 대기 (settle로 토큰이 줄면 먼저 깨어남)
+                self._condition.wait(max(0.01, self.WINDOW - (now - self._entries[0][0])))
+
+    def settle(self, entry: list, tokens: int):
+        """예약한 토큰 수를 실제 사용량으로 바꿉니다."""
+        with self._condition:
+            if entry in self._entries:
+                self._tokens += tokens - entry[1]
+            entry[1] = tokens
+            self._condition.notify_all()
+
+
+class SharedTokenRateLimiter(TokenRateLimiter):
+    """
+    요청·토큰 기록을 SQLite 파일에 두어 여러 프로세스가 같은 한도를 나눠 쓰는 TokenRateLimiter
+
+    같은 모델 API 키를 쓰는 웹 워커 프로세스와 CLI가 같은 db_path를 지정하면 RPM/TPM
+    한도를 합쳐서 지킵니다. 다른 프로세스의 settle은 알 수 없으므로 대기 중에는 주기적으로
+    다시 확인합니다.
+    """
+
+    def __init__(self, db_path: str, rpm: int = 0, tpm: int = 0, poll_interval: float = 0.5):
+        """
+        Args:
+            db_path: 한도 기록을 공유할 SQLite 파일 (포트폴리오 작업 파일과 같이 써도 됨)
+            rpm: 분당 최대 요청 수 (0이면 제한 없음)
+            tpm: 분당 최대 토큰 수 (0이면 제한 없음)
+            poll_interval: 한도를 기다리는 동안 다시 확인하는 최대 주기(초)
+        """
+        super().__init__(rpm, tpm)
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._get_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_window (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                requested_at REAL NOT NULL,
+                tokens INTEGER NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_rate_window_time ON rate_window(requested_at)')
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """스레드/프로세스별 SQLite 연결을 반환합니다. (fork 이후에는 새로 연결)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def acquire(self, tokens: int) -> list:
+        """한도에 여유가 생길 때까지 기다린 뒤 예약 항목을 반환합니다."""
+        started = time.monotonic()
+        conn = self._get_connection()
+        while True:
+            # 프로세스 사이에서 비교할 수 있도록 벽시계 시각 사용
+            now = time.time()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('DELETE FROM rate_window WHERE requested_at <= ?', (now - self.WINDOW,))
+                count, used, oldest = conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(tokens), 0), MIN(requested_at) FROM rate_window'
+                ).fetchone()
+                rpm_ok = not self.rpm or count < self.rpm
+                tpm_ok = not self.tpm or not count or used + tokens <= self.tpm
+                row_id = None
+                if rpm_ok and tpm_ok:
+                    row_id = conn.execute('INSERT INTO rate_window (requested_at, tokens) VALUES (?, ?)',
+                                          (now, tokens)).lastrowid
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+            if row_id is not None:
+                with self._condition:
+                    self.waited += time.monotonic() - started
+                return [now, tokens, row_id]
+            time.sleep(min(self.poll_interval, max(0.01, self.WINDOW - (now - oldest))))
+
+    def settle(self, entry: list, tokens: int):
+        """예약한 토큰 수를 실제 사용량으로 바꿉니다."""
+        conn = self._get_connection()
+        conn.execute('UPDATE rate_window SET tokens = ? WHERE id = ?', (tokens, entry[2]))
+        entry[1] = tokens
+
+
+class BudgetedModel:
+    """
+    모델 호출을 TokenRateLimiter 한도 안에서 실행하고 사용량을 집계하는 래퍼
+    (AuditRiskAnalyzer(model=...)에 전달, 스트리밍이 아닌 호출만 지원)
+    """
+
+    def __init__(self, model, limiter: TokenRateLimiter,
+                 expected_output_tokens: int = DEFAULT_EXPECTED_OUTPUT_TOKENS):
+        self.model = model
+        self.limiter = limiter
+        self.expected_output_tokens = expected_output_tokens
+        self.requests = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, **kwargs):
+        entry = self.limiter.acquire(estimate_tokens(prompt) + self.expected_output_tokens)
+        try:
+            response = self.model.generate_content(prompt, **kwargs)
+        except Exception:
+            # 실패한 요청도 입력 토큰은 한도에 포함
+            self.limiter.settle(entry, estimate_tokens(prompt))
+            with self._lock:
+                self.requests += 1
+                self.failures += 1
+            raise
+
+        usage = token_usage(prompt, response.text, getattr(response, 'usage_metadata', None))
+        self.limiter.settle(entry, usage['prompt_tokens'] + usage['output_tokens'])
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += usage['prompt_tokens']
+            self.output_tokens += usage['output_tokens']
+        return response
+
+
+def load_companies(db_path: str, corp_codes: List[str]) -> Dict[str, Dict]:
+    """회사 데이터베이스에서 회사 정보를 조회합니다. {고유번호: {corp_code, corp_name, stock_code}}"""
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        companies = {}
+        for i in range(0, len(corp_codes), 500):
+            chunk = corp_codes[i:i + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            for row in conn.execute(
+                f'SELECT corp_code, corp_name, stock_code FROM companies WHERE corp_code IN ({placeholders})', chunk
+            ):
+                companies[row['corp_code']] = dict(row)
+        return companies
+    finally:
+        conn.close()
+
+
+def resolve_corp_codes(db_path: str, corp_codes: Optional[str] = None,
+                       stock_codes: Optional[str] = None) -> List[str]:
+    """
+    쉼표로 구분한 고유번호/주식코드 또는 '@파일경로'를 고유번호 목록으로 바꿉니다.
+    (순서 유지, 중복 제거)
+    """
+    def split(value: Optional[str]) -> List[str]:
+        if not value:
+            return []
+        if value.startswith('@'):
+            with open(value[1:], 'r', encoding='utf-8') as f:
+                return [line.strip() for line in f if line.strip()]
+        return [code.strip() for code in value.split(',') if code.strip()]
+
+    codes = split(corp_codes)
+    stocks = split(stock_codes)
+    if stocks:
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+        try:
+            by_stock = {}
+            for i in range(0, len(stocks), 500):
+                chunk = stocks[i:i + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                by_stock.update(conn.execute(
+                    f'SELECT trim(stock_code), corp_code FROM companies WHERE trim(stock_code) IN ({placeholders})',
+                    chunk
+                ).fetchall())
+        finally:
+            conn.close()
+        for code in stocks:
+            if code in by_stock:
+                codes.append(by_stock[code])
+            else:
+                print(f"주식코드 {code}에 해당하는 회사를 찾을 수 없습니다.")
+    return list(dict.fromkeys(codes))
+
+
+class PortfolioAudit:
+    """여러 회사의 감사 리스크 분석을 동시에 실행하고 결과 파일을 만드는 작업"""
+
+    def __init__(self, api: OpenDartAPI, analyzer: AuditRiskAnalyzer, model: BudgetedModel, company_db_path: str = 'companies.db',
+                 output_dir: str = os.path.join('data', 'portfolio'), llm_workers: int = 4,
+                 fetch_workers: int = 8, max_attempts: int = 3, retry_delay: float = 2.0):
+        """
+        Args:
+            api: 오픈다트 API 클라이언트
+            analyzer: model을 사용하는 AuditRiskAnalyzer
+            model: analyzer가 사용하는 BudgetedModel (한도·사용량 집계)
+            company_db_path: 회사 데이터베이스 경로
+            output_dir: 결과 저장 디렉토리
+            llm_workers: 동시에 실행할 모델 호출 수
+            fetch_workers: 전체 재무제표 동시 조회 수
+            max_attempts: 회사별 분석 최대 시도 횟수
+            retry_delay: 첫 재시도 대기 시간(초, 시도마다 2배)
+        """
+        self.api = api
+        self.analyzer = analyzer
+        self.model = model
+        self.company_db_path = company_db_path
+        self.output_dir = output_dir
+        self.llm_workers = llm_workers
+        self.fetch_workers = fetch_workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def _company_path(self, corp_code: str) -> str:
+        return os.path.join(self.output_dir, 'companies', f'{corp_code}.json')
+
+    def _load_previous(self, corp_code: str) -> Optional[Dict]:
+        """이전 실행에서 성공한 회사 결과를 읽습니다."""
+        try:
+            with open(self._company_path(corp_code), 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return result if result.get('success') else None
+
+    @staticmethod
+    def _write_json(path: str, data: Dict):
+        """JSON 파일을 원자적으로 저장합니다."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _analyze_company(self, company: Dict, financial_data: Optional[Dict], full_future,
+                         year: str, report: str, refresh: bool) -> Dict:
+        """회사 하나를 분석합니다. (실패 시 대기 후 재시도)"""
+        started = time.perf_counter()
+        result = {
+            'corp_code': company['corp_code'],
+            'corp_name': company.get('corp_name'),
+            'stock_code': company.get('stock_code'),
+            'year': year,
+            'report': report,
+            'success': False,
+            'attempts': 0
+        }
+
+        if not financial_data:
+            result['error'] = '재무 데이터를 가져올 수 없습니다.'
+        else:
+            metrics = self.api.get_key_metrics(financial_data)
+            try:
+                full_raw_data = full_future.result()
+            except Exception as e:
+                print(f"전체 재무제표 조회 오류 ({company['corp_code']}): {e}")
+                full_raw_data = None
+            full_financial_data = parse_full_statements(full_raw_data) if full_raw_data else {}
+
+            for attempt in range(1, self.max_attempts + 1):
+                result['attempts'] = attempt
+                analysis = self.analyzer.analyze_financial_risks(company, metrics, full_financial_data,
+                                                                 refresh=refresh)
+                if analysis['success']:
+                    result.update({
+                        'success': True,
+                        'cached': analysis.get('cached', False),
+                        'usage': analysis.get('usage'),
+                        'prompt': analysis.get('prompt'),
+                        'latency_ms': analysis.get('latency_ms'),
+                        'metrics': metrics,
+                        'analysis': analysis['analysis']
+                    })
+                    result.pop('error', None)
+                    break
+                result['error'] = analysis.get('error', '알 수 없는 오류')
+                if attempt < self.max_attempts:
+                    time.sleep(self.retry_delay * (2 ** (attempt - 1)) * (1 + random.random() * 0.25))
+
+        result['elapsed_s'] = round(time.perf_counter() - started, 2)
+        self._write_json(self._company_path(company['corp_code']), result)
+        status = '완료' if result['success'] else f"실패: {result.get('error')}"
+        print(f"[{company['corp_code']}] {company.get('corp_name')} - {status} ({result['elapsed_s']:.1f}s)")
+        return result
+
+    def run(self, corp_codes: List[str], year: str, report: str = '11011',
+            force: bool = False, refresh: bool = False) -> Dict:
+        """
+        회사 목록을 분석하고 전체 결과(portfolio.json 내용)를 반환합니다.
+
+        Args:
+            corp_codes: 고유번호 목록
+            year: 사업연도
+            report: 보고서 코드
+            force: 이전 실행에서 성공한 회사도 다시 분석
+            refresh: 분석 캐시를 읽지 않고 모델을 다시 호출
+        """
+        started = time.perf_counter()
+        os.makedirs(os.path.join(self.output_dir, 'companies'), exist_ok=True)
+        corp_codes = list(dict.fromkeys(corp_codes))
+        companies = load_companies(self.company_db_path, corp_codes)
+
+        results = {}
+        for corp_code in corp_codes:
+            if corp_code not in companies:
+                results[corp_code] = {'corp_code': corp_code, 'success': False,
+                                      'error': '회사 정보를 찾을 수 없습니다.', 'attempts': 0}
+            elif not force:
+                previous = self._load_previous(corp_code)
+                if previous is not None:
+                    previous['skipped'] = True
+                    results[corp_code] = previous
+        pending = [corp_code for corp_code in corp_codes if corp_code not in results]
+        reused = sum(1 for result in results.values() if result.get('skipped'))
+        print(f"회사 {len(corp_codes):,}개 중 {len(pending):,}개를 분석합니다. (이전 결과 {reused:,}개 재사용)")
+
+        usage_before = (self.model.requests, self.model.failures, self.model.prompt_tokens,
+                        self.model.output_tokens, self.model.limiter.waited)
+        analysis_started = time.perf_counter()
+        if pending:
+            # 주요계정은 다중회사 API로 한꺼번에, 전체 재무제표는 회사별로 동시에 조회
+            financial_by_corp = self.api.get_financial_data_batch(pending, year, report, compact=True)
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetch_pool, \
+                    ThreadPoolExecutor(max_workers=self.llm_workers) as llm_pool:
+                futures = {}
+                for corp_code in pending:
+                    full_future = fetch_pool.submit(self.api.get_full_financial_statements,
+                                                    corp_code, year, report, 'CFS')
+                    futures[corp_code] = llm_pool.submit(
+                        self._analyze_company, companies[corp_code], financial_by_corp.get(corp_code),
+                        full_future, year, report, refresh
+                    )
+                for corp_code, future in futures.items():
+                    results[corp_code] = future.result()
+        analysis_seconds = time.perf_counter() - analysis_started
+
+        ordered = [results[corp_code] for corp_code in corp_codes]
+        analyzed = [results[corp_code] for corp_code in pending]
+        succeeded = sum(1 for result in ordered if result['success'])
+        risk_levels = {}
+        for result in ordered:
+            if result['success']:
+                level = result['analysis'].get('overall_risk_level', '분석 필요')
+                risk_levels[level] = risk_levels.get(level, 0) + 1
+
+        requests = self.model.requests - usage_before[0]
+        failures = self.model.failures - usage_before[1]
+        prompt_tokens = self.model.prompt_tokens - usage_before[2]
+        output_tokens = self.model.output_tokens - usage_before[3]
+        summary = {
+            'companies': len(ordered),
+            'succeeded': succeeded,
+            'failed': len(ordered) - succeeded,
+            'analyzed': len(analyzed),
+            'skipped': sum(1 for result in ordered if result.get('skipped')),
+            'cached': sum(1 for result in analyzed if result.get('cached')),
+            'retried': sum(1 for result in analyzed if result.get('attempts', 0) > 1),
+            'model_requests': requests,
+            'model_failures': failures,
+            'prompt_tokens': prompt_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': prompt_tokens + output_tokens,
+            'elapsed_s': round(time.perf_counter() - started, 2),
+            'companies_per_minute': round(len(analyzed) / analysis_seconds * 60, 2) if analysis_seconds > 0 else 0,
+            'tokens_per_minute': round((prompt_tokens + output_tokens) / analysis_seconds * 60) if analysis_seconds > 0 else 0,
+            'rate_limit_wait_s': round(self.model.limiter.waited - usage_before[4], 2),
+            'rpm_limit': self.model.limiter.rpm,
+            'tpm_limit': self.model.limiter.tpm,
+            'risk_levels': risk_levels
+        }
+
+        portfolio = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'year': year,
+            'report': report,
+            'summary': summary,
+            'results': ordered
+        }
+        self._write_json(os.path.join(self.output_dir, 'portfolio.json'), portfolio)
+        return portfolio
+
+
+def main():
+    """메인 함수"""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='포트폴리오 감사 리스크 일괄 분석')
+    parser.add_argument('--corp-codes', help="쉼표로 구분한 고유번호 또는 '@파일경로'")
+    parser.add_argument('--stock-codes', help="쉼표로 구분한 주식코드 또는 '@파일경로'")
+    parser.add_argument('--year', default=str(datetime.now().year - 1), help='사업연도')
+    parser.add_argument('--report', default='11011', help='보고서 코드')
+    parser.add_argument('--output', help='결과 디렉토리 (기본값: data/portfolio/<연도>_<보고서>)')
+    parser.add_argument('--rpm', type=int, default=int(os.getenv('PORTFOLIO_RPM', '15')),
+                        help='모델 분당 최대 요청 수 (0이면 제한 없음)')
+    parser.add_argument('--tpm', type=int, default=int(os.getenv('PORTFOLIO_TPM', '1000000')),
+                        help='모델 분당 최대 토큰 수 (0이면 제한 없음)')
+    parser.add_argument('--rate-db',
+                        default=os.getenv('PORTFOLIO_JOB_DB_PATH', os.path.join('cache', 'portfolio_jobs.db')),
+                        help="RPM/TPM 기록을 공유할 파일 (웹 서버의 PORTFOLIO_JOB_DB_PATH와 같으면 한도를 함께 사용, ''이면 이 프로세스만)")
+    parser.add_argument('--max-input-tokens', type=int,
+                        default=int(os.getenv('AI_PROMPT_MAX_TOKENS', str(DEFAULT_MAX_INPUT_TOKENS))),
+                        help='프롬프트 최대 토큰 수 (0이면 모든 계정 포함)')
+    parser.add_argument('--llm-workers', type=int, default=4, help='동시 모델 호출 수')
+    parser.add_argument('--fetch-workers', type=int, default=8, help='전체 재무제표 동시 조회 수')
+    parser.add_argument('--max-attempts', type=int, default=3, help='회사별 최대 분석 시도 횟수')
+    parser.add_argument('--force', action='store_true', help='이전에 성공한 회사도 다시 분석')
+    parser.add_argument('--refresh', action='store_true', help='분석 캐시를 읽지 않고 다시 분석')
+    parser.add_argument('--no-cache', action='store_true', help='분석 캐시를 사용하지 않음')
+    parser.add_argument('--fake-model', action='store_true', help='Gemini 대신 로컬 가짜 모델 사용 (테스트용)')
+    parser.add_argument('--fake-seconds', type=float, default=3.0, help='가짜 모델의 응답 시간(초)')
+    parser.add_argument('--fake-failure-rate', type=float, default=0.0, help='가짜 모델의 실패 비율')
+    parser.add_argument('--db', default='companies.db', help='회사 데이터베이스 경로')
+    args = parser.parse_args()
+
+    api_key = os.getenv('OPENDART_API_KEY')
+    if not api_key:
+        print("OPENDART_API_KEY 환경변수가 설정되지 않았습니다.")
+        return 1
+
+    corp_codes = resolve_corp_codes(args.db, args.corp_codes, args.stock_codes)
+    if not corp_codes:
+        print("분석할 회사가 없습니다. --corp-codes 또는 --stock-codes를 지정해주세요.")
+        return 1
+
+    if args.fake_model:
+        from fake_model import FakeGenerativeModel
+        base_model = FakeGenerativeModel(total_time=args.fake_seconds, first_chunk_delay=0,
+                                         failure_rate=args.fake_failure_rate)
+        model_name = 'fake-model'
+    else:
+        try:
+            base_model = create_gemini_model(DEFAULT_MODEL_NAME)
+        except ValueError as e:
+            print(e)
+            return 1
+        model_name = DEFAULT_MODEL_NAME
+
+    if args.rate_db:
+        limiter = SharedTokenRateLimiter(args.rate_db, args.rpm, args.tpm)
+    else:
+        limiter = TokenRateLimiter(args.rpm, args.tpm)
+    model = BudgetedModel(base_model, limiter)
+    cache = None if args.no_cache else AnalysisCache(
+        os.getenv('AI_ANALYSIS_CACHE_PATH', os.path.join('cache', 'ai_analyses.db'))
+    )
+    analyzer = AuditRiskAnalyzer(model_name=model_name, cache=cache, model=model,
+                                 prompt_builder=AuditPromptBuilder(args.max_input_tokens))
+    api = OpenDartAPI(
+        api_key,
+        cache=DartResponseCache(os.getenv('DART_CACHE_PATH', os.path.join('cache', 'dart_responses.db'))),
+        warehouse=FinancialWarehouse(os.getenv('FINANCIAL_WAREHOUSE_PATH', os.path.join('data', 'financials.db'))),
+        pool_size=args.fetch_workers
+    )
+
+    output_dir = args.output or os.path.join('data', 'portfolio', f'{args.year}_{args.report}')
+    audit = PortfolioAudit(api, analyzer, model, company_db_path=args.db, output_dir=output_dir,
+                           llm_workers=args.llm_workers, fetch_workers=args.fetch_workers,
+                           max_attempts=args.max_attempts)
+    portfolio = audit.run(corp_codes, args.year, args.report, force=args.force, refresh=args.refresh)
+
+    summary = portfolio['summary']
+    print(f"\n성공 {summary['succeeded']:,} / 실패 {summary['failed']:,} "
+          f"(분석 {summary['analyzed']:,}, 재사용 {summary['skipped']:,}, 캐시 {summary['cached']:,}, "
+          f"재시도 {summary['retried']:,})")
+    print(f"처리량 {summary['companies_per_minute']:.1f}개/분, 토큰 {summary['total_tokens']:,} "
+          f"(입력 {summary['prompt_tokens']:,} / 출력 {summary['output_tokens']:,}), "
+          f"한도 대기 {summary['rate_limit_wait_s']:.1f}s, 전체 {summary['elapsed_s']:.1f}s")
+    print(f"결과: {os.path.join(output_dir, 'portfolio.json')}")
+    return 0 if summary['failed'] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from compact_statements import CompactStatement
+from financial_warehouse import FinancialWarehouse
+
+# 지표 계산에 쓰는 계정 (열 이름: (재무제표 구분, 주요계정 계정명))
+ACCOUNTS = {
+    'current_assets': ('balance_sheet', '유동자산'),
+    'total_assets': ('balance_sheet', '자산총계'),
+    'current_liabilities': ('balance_sheet', '유동부채'),
+    'total_liabilities': ('balance_sheet', '부채총계'),
+    'total_equity': ('balance_sheet', '자본총계'),
+    'revenue': ('income_statement', '매출액'),
+    'operating_profit': ('income_statement', '영업이익'),
+    'net_income': ('income_statement', '당기순이익'),
+}
+
+# 비율 지표: 이름 → (분자, 분모, 배율). 분모가 0 이하이면 0 (get_key_metrics와 같은 규칙)
+RATIOS = {
+    'current_ratio': ('current_assets', 'current_liabilities', 100),
+    'debt_ratio': ('total_liabilities', 'total_assets', 100),
+    'equity_ratio': ('total_equity', 'total_assets', 100),
+    'operating_margin': ('operating_profit', 'revenue', 100),
+    'net_margin': ('net_income', 'revenue', 100),
+    'roa': ('net_income', 'total_assets', 100),
+    'roe': ('net_income', 'total_equity', 100),
+    'debt_to_equity': ('total_liabilities', 'total_equity', 100),
+    'asset_turnover': ('revenue', 'total_assets', 1),
+}
+
+# 전년 대비 증감률(%): 이름 → 계정. 전년 값이 0 이하이면 0
+GROWTH_RATES = {
+    'revenue_growth': 'revenue',
+    'operating_profit_growth': 'operating_profit',
+    'net_income_growth': 'net_income',
+    'total_assets_growth': 'total_assets',
+}
+
+PERIOD_SUFFIXES = ('', '_previous')
+
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray, scale: float) -> np.ndarray:
+    """분모가 양수인 경우만 나누고 나머지는 0으로 채운 뒤 소수 둘째 자리로 반올림합니다."""
+    result = np.zeros(len(numerator), dtype=np.float64)
+    valid = denominator > 0
+    np.divide(numerator, denominator, out=result, where=valid)
+    result *= scale
+    rounded = np.round(result, 2)
+
+    # np.round는 값이 매우 크면 round()와 마지막 자리가 달라질 수 있으므로 해당 값만 다시 반올림
+    huge = np.abs(result) >= 1e9
+    if huge.any():
+        rounded[huge] = [round(float(value), 2) for value in result[huge]]
+    return rounded
+
+
+def compute_ratios(accounts: pd.DataFrame) -> pd.DataFrame:
+    """
+    계정 금액 표에서 모든 비율 지표를 한 번에 계산합니다.
+
+    Args:
+        accounts: 행은 (회사, 기간), 열은 ACCOUNTS의 이름과 '{이름}_previous'(전기 금액)인 표.
+                  없는 열과 빈 값은 0으로 처리합니다.
+
+    Returns:
+        accounts와 같은 인덱스를 가진 지표 표 (get_key_metrics의 키 + 추가 지표)
+    """
+    def column(name: str) -> np.ndarray:
+        if name not in accounts:
+            return np.zeros(len(accounts), dtype=np.float64)
+        return accounts[name].fillna(0).to_numpy(dtype=np.float64)
+
+    result = {}
+    for suffix in PERIOD_SUFFIXES:
+        for name, (numerator, denominator, scale) in RATIOS.items():
+            result[name + suffix] = _safe_ratio(column(numerator + suffix), column(denominator + suffix), scale)
+
+    for name, account in GROWTH_RATES.items():
+        current = column(account)
+        previous = column(account + '_previous')
+        result[name] = _safe_ratio(current - previous, previous, 100)
+
+    return pd.DataFrame(result, index=accounts.index)
+
+
+def accounts_from_parsed(financial_data_by_key: Dict, use_consolidated: bool = True) -> pd.DataFrame:
+    """
+    parse_financial_data(또는 parse_key_accounts) 결과 여러 개를 계정 금액 표로 변환합니다.
+
+    Args:
+        financial_data_by_key: {(고유번호, 사업연도) 또는 임의의 키: 파싱된 재무데이터}
+        use_consolidated: 연결재무제표 사용 여부
+
+    Returns:
+        키를 인덱스로 하는 계정 금액 표
+    """
+    data_type = 'consolidated' if use_consolidated else 'separate'
+    keys = list(financial_data_by_key)
+    names = list(ACCOUNTS)
+    current = np.zeros((len(keys), len(names)), dtype=np.float64)
+    previous = np.zeros((len(keys), len(names)), dtype=np.float64)
+
+    for i, key in enumerate(keys):
+        statements = financial_data_by_key[key].get(data_type) or {}
+        for j, (statement, account_nm) in enumerate(ACCOUNTS.values()):
+            table = statements.get(statement) or {}
+            if isinstance(table, CompactStatement):
+                # 계정 딕셔너리를 만들지 않고 금액 열에서 바로 읽음
+                current[i, j] = table.amount(account_nm, 'thstrm_amount')
+                previous[i, j] = table.amount(account_nm, 'frmtrm_amount')
+                continue
+            account = table.get(account_nm)
+            if account:
+                current[i, j] = account.get('current_period', {}).get('amount', 0) or 0
+                previous[i, j] = account.get('previous_period', {}).get('amount', 0) or 0
+
+    columns = {}
+    for j, name in enumerate(names):
+        columns[name] = current[:, j]
+        columns[name + '_previous'] = previous[:, j]
+
+    index = pd.MultiIndex.from_tuples(keys) if keys and isinstance(keys[0], tuple) else pd.Index(keys)
+    return pd.DataFrame(columns, index=index)
+
+
+def accounts_from_warehouse(warehouse: FinancialWarehouse, reprt_code: str = '11011',
+                            use_consolidated: bool = True, years: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    재무 저장소의 주요계정으로 (고유번호, 사업연도) 인덱스의 계정 금액 표를 만듭니다.
+
+    쿼리 한 번으로 저장된 전체 회사·연도를 읽어 피벗합니다.
+    """
+    fs_div = 'CFS' if use_consolidated else 'OFS'
+    names_by_account = {account_nm: name for name, (_, account_nm) in ACCOUNTS.items()}
+    rows = warehouse.account_values(list(names_by_account), reprt_code, fs_div,
+                                    FinancialWarehouse.SOURCE_KEY, years)
+
+    columns = list(ACCOUNTS) + [name + '_previous' for name in ACCOUNTS]
+    if not rows:
+        empty_index = pd.MultiIndex.from_tuples([], names=['corp_code', 'bsns_year'])
+        return pd.DataFrame(columns=columns, index=empty_index, dtype=np.float64)
+
+    lines = pd.DataFrame(rows, columns=['corp_code', 'bsns_year', 'account_id', 'current', 'previous'])
+    lines['account'] = lines['account_id'].map(names_by_account)
+    wide = lines.pivot_table(index=['corp_code', 'bsns_year'], columns='account',
+                             values=['current', 'previous'], aggfunc='last')
+
+    frame = pd.DataFrame(index=wide.index)
+    for name in ACCOUNTS:
+        frame[name] = wide['current'][name] if name in wide['current'] else np.nan
+        frame[name + '_previous'] = wide['previous'][name] if name in wide['previous'] else np.nan
+    return frame.astype(np.float64).fillna(0)
+
+
+def metrics_records(ratios: pd.DataFrame) -> Dict:
+    """지표 표를 {인덱스 키: get_key_metrics 형식의 딕셔너리}로 변환합니다."""
+    names = list(ratios.columns)
+    return {
+        key: dict(zip(names, (float(value) for value in values)))
+        for key, values in zip(ratios.index, ratios.to_numpy())
+    }
+
+
+def key_metrics(financial_data: Dict, use_consolidated: bool = True) -> Dict:
+    """단일 회사용 편의 함수. get_key_metrics와 같은 키(+ 추가 지표)를 반환합니다."""
+    ratios = compute_ratios(accounts_from_parsed({0: financial_data}, use_consolidated))
+    return metrics_records(ratios)[0]
+
+
+def accounts_from_history(history: Dict, use_consolidated: bool = True) -> pd.DataFrame:
+    """
+    get_financial_history 결과를 사업연도 인덱스의 계정 금액 표로 변환합니다.
+
+    전기 금액은 바로 앞 연도의 (재작성 반영) 금액을 사용합니다.
+    """
+    data_type = 'consolidated' if use_consolidated else 'separate'
+    statements = history.get(data_type, {})
+    years = history.get('years', [])
+
+    columns = {}
+    for name, (statement, account_nm) in ACCOUNTS.items():
+        series = statements.get(statement, {}).get(account_nm, {})
+        columns[name] = np.array([series.get(year, 0) for year in years], dtype=np.float64)
+        columns[name + '_previous'] = np.array([series.get(year - 1, 0) for year in years], dtype=np.float64)
+    return pd.DataFrame(columns, index=pd.Index(years, name='bsns_year'))
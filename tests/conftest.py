@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+from aiohttp import web
+
+# 저장소 루트의 모듈(ai_analysis, opendart_api 등)을 가져올 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubDartServer:
+    """
+    오픈다트 재무 API만 흉내 내는 가짜 서버 (benchmarks/async_benchmark.py와 같은 규칙)
+
+    고유번호 끝자리가 3이면 첫 요청에 503을 돌려주고(재시도 확인), 7이면 013(조회된 데이터 없음)을 돌려줍니다.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = {}
+        self._failed_once = set()
+
+    def reset(self):
+        self.max_in_flight = 0
+        self.requests.clear()
+        self._failed_once.clear()
+
+    @staticmethod
+    def items(corp_code: str, bsns_year: str) -> list:
+        number = int(corp_code)
+        return [
+            {'corp_code': corp_code, 'bsns_year': bsns_year, 'fs_div': 'CFS', 'sj_div': 'BS',
+             'account_nm': '자산총계', 'thstrm_amount': f"{number * 1000:,}", 'frmtrm_amount': f"{number * 900:,}"},
+            {'corp_code': corp_code, 'bsns_year': bsns_year, 'fs_div': 'CFS', 'sj_div': 'BS',
+             'account_nm': '부채총계', 'thstrm_amount': f"{number * 400:,}", 'frmtrm_amount': f"{number * 300:,}"},
+            {'corp_code': corp_code, 'bsns_year': bsns_year, 'fs_div': 'CFS', 'sj_div': 'BS',
+             'account_nm': '자본총계', 'thstrm_amount': f"{number * 600:,}", 'frmtrm_amount': f"{number * 600:,}"},
+            {'corp_code': corp_code, 'bsns_year': bsns_year, 'fs_div': 'CFS', 'sj_div': 'IS',
+             'account_nm': '매출액', 'thstrm_amount': f"{number * 500:,}", 'frmtrm_amount': f"{number * 450:,}"},
+            {'corp_code': corp_code, 'bsns_year': bsns_year, 'fs_div': 'CFS', 'sj_div': 'IS',
+             'account_nm': '당기순이익', 'thstrm_amount': f"{number * 20:,}", 'frmtrm_amount': f"{number * 25:,}"}
+        ]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        endpoint = request.match_info['endpoint']
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            corp_codes = request.query['corp_code'].split(',')
+            bsns_year = request.query['bsns_year']
+            if endpoint == 'fnlttMultiAcnt.json':
+                items = [item for corp_code in corp_codes if int(corp_code) % 10 != 7
+                         for item in self.items(corp_code, bsns_year)]
+                if not items:
+                    return web.json_response({'status': '013', 'message': '조회된 데이타가 없습니다.'})
+                return web.json_response({'status': '000', 'message': '정상', 'list': items})
+
+            corp_code = corp_codes[0]
+            if int(corp_code) % 10 == 3 and (endpoint, corp_code) not in self._failed_once:
+                self._failed_once.add((endpoint, corp_code))
+                return web.Response(status=503)
+            if int(corp_code) % 10 == 7:
+                return web.json_response({'status': '013', 'message': '조회된 데이타가 없습니다.'})
+            return web.json_response({'status': '000', 'message': '정상', 'list': self.items(corp_code, bsns_year)})
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def dart_server():
+    """가짜 DART 서버를 별도 스레드의 이벤트 루프에서 실행하고 (서버, base_url)을 반환합니다."""
+    stub = StubDartServer()
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.router.add_get('/api/{endpoint}', stub.handle)
+    runner = web.AppRunner(app, access_log=None)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield stub, f"http://127.0.0.1:{port}/api"
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
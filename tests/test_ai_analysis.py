@@ -0,0 +1,133 @@
+"""AI 분석 스트리밍(JsonSectionParser, stream_financial_risks) 테스트 - 가짜 모델 사용"""
+import json
+
+import pytest
+
+from ai_analysis import AnalysisCache, AuditRiskAnalyzer, JsonSectionParser
+from fake_model import SAMPLE_ANALYSIS, FakeGenerativeModel
+
+COMPANY = {'corp_name': '샘플전자', 'corp_code': '00000001', 'stock_code': '000001'}
+METRICS = {'current_ratio': 101.5, 'debt_ratio': 180.2, 'equity_ratio': 35.7, 'operating_margin': 2.1,
+           'net_margin': 0.8, 'roa': 0.6, 'roe': 1.7}
+
+
+def feed_in_chunks(text: str, size: int) -> list:
+    parser = JsonSectionParser()
+    sections = []
+    for i in range(0, len(text), size):
+        sections.extend(parser.feed(text[i:i + size]))
+    assert parser.done
+    return sections
+
+
+def make_analyzer(tmp_path=None, **model_options) -> AuditRiskAnalyzer:
+    model_options.setdefault('total_time', 0)
+    model_options.setdefault('first_chunk_delay', 0)
+    cache = AnalysisCache(str(tmp_path / 'ai_analyses.db')) if tmp_path is not None else None
+    return AuditRiskAnalyzer(model_name='fake-model', cache=cache, model=FakeGenerativeModel(**model_options))
+
+
+@pytest.mark.parametrize('size', [1, 3, 7])
+def test_parser_emits_sections_in_order(size):
+    text = "```json\n" + json.dumps(SAMPLE_ANALYSIS, ensure_ascii=False, indent=2) + "\n```"
+
+    sections = feed_in_chunks(text, size)
+
+    assert [key for key, _ in sections] == list(SAMPLE_ANALYSIS)
+    assert dict(sections) == SAMPLE_ANALYSIS
+
+
+@pytest.mark.parametrize('size', [1, 3, 7])
+def test_parser_handles_strings_with_brackets_and_escapes(size):
+    data = {
+        'text': '괄호 { [ ] } 와 "따옴표", 역슬래시 \\ 포함',
+        'number': -12.5,
+        'flag': True,
+        'empty': None,
+        'nested': {'a': ['}', {'b': '{'}], 'c': 'x,y'},
+        'last': []
+    }
+    text = json.dumps(data, ensure_ascii=False)
+
+    sections = feed_in_chunks(text, size)
+
+    assert [key for key, _ in sections] == list(data)
+    assert dict(sections) == data
+
+
+def test_parser_ignores_text_after_closing_brace():
+    parser = JsonSectionParser()
+
+    sections = parser.feed('설명 {"a": 1} 이후 {"b": 2}')
+
+    assert sections == [('a', 1)]
+    assert parser.done
+
+
+def test_stream_events_sections_then_complete():
+    analyzer = make_analyzer(chunk_size=5)
+
+    events = list(analyzer.stream_financial_risks(COMPANY, METRICS))
+
+    assert [event['type'] for event in events] == ['section'] * len(SAMPLE_ANALYSIS) + ['complete']
+    assert [event['key'] for event in events[:-1]] == list(SAMPLE_ANALYSIS)
+    complete = events[-1]
+    assert complete['success'] is True
+    assert complete['cached'] is False
+    assert complete['analysis'] == SAMPLE_ANALYSIS
+    assert {event['key']: event['value'] for event in events[:-1]} == complete['analysis']
+
+
+def test_stream_matches_blocking_analysis():
+    analyzer = make_analyzer()
+
+    blocking = analyzer.analyze_financial_risks(COMPANY, METRICS)
+    events = list(analyzer.stream_financial_risks(COMPANY, METRICS))
+
+    assert blocking['success'] is True
+    assert events[-1]['analysis'] == blocking['analysis']
+
+
+def test_stream_cache_hit_skips_model(tmp_path):
+    analyzer = make_analyzer(tmp_path)
+
+    first = list(analyzer.stream_financial_risks(COMPANY, METRICS))
+    second = list(analyzer.stream_financial_risks(COMPANY, METRICS))
+
+    assert analyzer.model.calls == 1
+    assert first[-1]['cached'] is False
+    assert [event['type'] for event in second] == ['section'] * len(SAMPLE_ANALYSIS) + ['complete']
+    assert second[-1]['cached'] is True
+    assert second[-1]['analysis'] == first[-1]['analysis']
+    assert analyzer.cache.stats()['hits'] == 1
+
+
+def test_stream_refresh_calls_model_again(tmp_path):
+    analyzer = make_analyzer(tmp_path)
+
+    list(analyzer.stream_financial_risks(COMPANY, METRICS))
+    events = list(analyzer.stream_financial_risks(COMPANY, METRICS, refresh=True))
+
+    assert analyzer.model.calls == 2
+    assert events[-1]['cached'] is False
+
+
+def test_stream_model_error_yields_error_event():
+    analyzer = make_analyzer(failure_rate=1.0)
+
+    events = list(analyzer.stream_financial_risks(COMPANY, METRICS))
+
+    assert len(events) == 1
+    assert events[0]['type'] == 'error'
+    assert '429' in events[0]['error']
+
+
+def test_stream_non_json_response_falls_back_without_caching(tmp_path):
+    analyzer = make_analyzer(tmp_path, response_text='JSON이 아닌 응답입니다.')
+
+    events = list(analyzer.stream_financial_risks(COMPANY, METRICS))
+
+    assert events[-1]['type'] == 'complete'
+    assert events[-1]['analysis']['overall_risk_level'] == '분석 필요'
+    assert 'overall_risk_level' in [event['key'] for event in events[:-1]]
+    assert analyzer.cache.stats()['entries'] == 0
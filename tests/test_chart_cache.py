@@ -0,0 +1,75 @@
+"""ChartCache 테스트"""
+import os
+import time
+
+from visualization import ChartCache
+
+
+def count_scans(cache: ChartCache) -> list:
+    calls = []
+    scan = cache._scan
+
+    def counting_scan():
+        calls.append(1)
+        return scan()
+
+    cache._scan = counting_scan
+    return calls
+
+
+def test_set_does_not_scan_directory_every_time(tmp_path):
+    cache = ChartCache(str(tmp_path), max_bytes=100_000)
+    scans = count_scans(cache)
+
+    for i in range(50):
+        cache.set(f'key{i}', 'png', b'x' * 100)
+
+    # 처음 한 번 확인한 뒤에는 추정치로 판단
+    assert len(scans) == 1
+    assert cache.get('key0', 'png') == b'x' * 100
+
+
+def test_evicts_least_recently_used_when_over_limit(tmp_path):
+    cache = ChartCache(str(tmp_path), max_bytes=1000)
+    for i in range(5):
+        cache.set(f'key{i}', 'png', b'x' * 200)
+    # key0을 가장 최근에 사용한 것으로 만듦
+    old = time.time() - 100
+    for i in range(1, 5):
+        os.utime(cache._path(f'key{i}', 'png'), (old + i, old + i))
+
+    cache.set('key5', 'png', b'x' * 200)
+
+    assert cache.get('key1', 'png') is None
+    assert cache.get('key0', 'png') is not None
+    assert cache.get('key5', 'png') is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['total_bytes'] <= 1000
+
+
+def test_rescans_to_pick_up_other_workers(tmp_path):
+    cache = ChartCache(str(tmp_path), max_bytes=10_000)
+    other = ChartCache(str(tmp_path), max_bytes=10_000)
+    cache.set('mine', 'png', b'x' * 100)
+
+    # 다른 워커가 한도를 넘게 저장
+    for i in range(12):
+        with open(other._path(f'other{i}', 'png'), 'wb') as f:
+            f.write(b'y' * 1000)
+
+    # 한도의 RESCAN_FRACTION만큼 저장하면 디렉토리를 다시 확인해 정리
+    for i in range(10):
+        cache.set(f'key{i}', 'png', b'x' * 100)
+
+    assert cache.stats()['total_bytes'] <= 10_000
+
+
+def test_overwrite_counts_size_difference(tmp_path):
+    cache = ChartCache(str(tmp_path), max_bytes=100_000)
+    cache.set('key', 'png', b'x' * 100)
+
+    cache.set('key', 'png', b'x' * 300)
+
+    assert cache._total_bytes == 300
+    assert cache.stats()['total_bytes'] == 300
@@ -0,0 +1,92 @@
+"""compact_statements 파서 테스트 - 기존 딕셔너리 파서(OpenDartAPI)와 결과 비교"""
+import random
+
+import pytest
+
+from compact_statements import CompactStatement, parse_full_statements, parse_key_accounts, to_plain
+from opendart_api import OpenDartAPI
+
+API = OpenDartAPI('test')
+
+
+def key_item(fs_div: str, sj_div: str, account_nm: str, amount: str) -> dict:
+    return {'corp_code': '00000001', 'stock_code': '000001', 'bsns_year': '2024', 'reprt_code': '11011',
+            'fs_div': fs_div, 'sj_div': sj_div, 'account_nm': account_nm,
+            'thstrm_nm': '제 56 기', 'thstrm_dt': '2024.12.31 현재', 'thstrm_amount': amount,
+            'frmtrm_nm': '제 55 기', 'frmtrm_dt': '2023.12.31 현재', 'frmtrm_amount': '1,000',
+            'bfefrmtrm_nm': '제 54 기', 'bfefrmtrm_dt': '2022.12.31 현재', 'bfefrmtrm_amount': ''}
+
+
+def full_item(sj_div: str, account_nm: str, account_id: str, amount: str) -> dict:
+    return {'corp_code': '00000001', 'bsns_year': '2024', 'reprt_code': '11011', 'sj_div': sj_div,
+            'account_nm': account_nm, 'account_id': account_id, 'account_detail': '-',
+            'thstrm_nm': '제 56 기', 'thstrm_amount': amount, 'thstrm_add_amount': '',
+            'frmtrm_nm': '제 55 기', 'frmtrm_amount': '-5,000', 'frmtrm_q_nm': '', 'frmtrm_q_amount': '',
+            'frmtrm_add_amount': '', 'bfefrmtrm_nm': '제 54 기', 'bfefrmtrm_amount': '7', 'ord': '1'}
+
+
+def test_key_accounts_match_legacy_with_interleaved_rows():
+    # 재무제표가 연속해 있지 않고 섞여 있는 응답
+    items = [
+        key_item('CFS', 'BS', '자산총계', '1,000,000'),
+        key_item('OFS', 'BS', '자산총계', '900,000'),
+        key_item('CFS', 'IS', '매출액', '500'),
+        key_item('CFS', 'BS', '부채총계', ''),
+        key_item('OFS', 'IS', '매출액', 'abc'),
+        key_item('CFS', 'BS', '자산총계', '1,100,000'),
+    ]
+    raw_data = {'status': '000', 'list': items}
+
+    parsed = parse_key_accounts(raw_data)
+
+    assert to_plain(parsed) == API.parse_financial_data(raw_data)
+    balance_sheet = parsed['consolidated']['balance_sheet']
+    assert list(balance_sheet) == ['자산총계', '부채총계']
+    assert balance_sheet.amount('자산총계') == 1100000
+    assert list(balance_sheet.column('thstrm_amount')) == [1000000, 0, 1100000]
+
+
+def test_full_statements_match_legacy():
+    rng = random.Random(0)
+    items = []
+    for sj_div in ('BS', 'IS', 'CF', 'BS', 'SCE'):
+        for row in range(20):
+            amount = '' if rng.random() < 0.2 else f"{rng.randint(-10 ** 12, 10 ** 12):,}"
+            items.append(full_item(sj_div, f'{sj_div} 계정 {row % 15}', f'ifrs-full_{sj_div}{row}', amount))
+    raw_data = {'status': '000', 'list': items}
+
+    parsed = parse_full_statements(raw_data)
+
+    assert to_plain(parsed) == API.parse_full_financial_statements(raw_data)
+    assert parsed['CIS'] == {}
+    assert parsed['BS'].row_count == 40
+    # 계정명이 중복되면 계정명 조회는 마지막 행, 계정ID 조회는 해당 행
+    assert parsed['BS']['BS 계정 3']['account_id'] == 'ifrs-full_BS18'
+    assert parsed['BS'].by_account_id('ifrs-full_BS3')['account_id'] == 'ifrs-full_BS3'
+    assert parsed['BS'].amount('ifrs-full_BS3', 'frmtrm_amount') == -5000
+
+
+def test_amount_overflow_falls_back_to_list():
+    raw_data = {'list': [full_item('BS', '큰 금액', '-', f"{10 ** 20:,}"), full_item('BS', '작은 금액', '-', '1')]}
+
+    statement = parse_full_statements(raw_data)['BS']
+
+    assert statement.amount('큰 금액') == 10 ** 20
+    assert statement.amount('작은 금액') == 1
+    assert statement.amount('없는 계정', default=-1) == -1
+
+
+def test_account_data_is_a_copy():
+    statement = parse_key_accounts({'list': [key_item('CFS', 'BS', '자산총계', '10')]})['consolidated']['balance_sheet']
+
+    account = statement['자산총계']
+    account['current_period']['amount'] = 0
+
+    assert statement['자산총계']['current_period']['amount'] == 10
+    assert statement['자산총계']['previous_period'] == {'name': '제 55 기', 'date': '2023.12.31 현재', 'amount': 1000}
+
+
+@pytest.mark.parametrize('raw_data', [None, {}, {'list': []}])
+def test_empty_responses(raw_data):
+    assert parse_full_statements(raw_data) == API.parse_full_financial_statements(raw_data)
+    assert to_plain(parse_key_accounts(raw_data)) == API.parse_financial_data(raw_data)
@@ -0,0 +1,53 @@
+"""AutocompleteIndex 테스트"""
+from company_search import AutocompleteIndex
+
+
+def unlisted(count: int, prefix: str) -> list:
+    return [(f'9{i:07d}', f'{prefix}{i:05d}', '', '') for i in range(count)]
+
+
+def test_listed_company_beyond_candidate_limit_is_found():
+    # 비상장사 키가 상장사 키보다 앞에 정렬되어 MAX_CANDIDATES를 채우는 경우
+    companies = unlisted(AutocompleteIndex.MAX_CANDIDATES + 500, '삼성가') + [
+        ('00126380', '삼성화재', 'Samsung Fire', '000810'),
+        ('00164742', '삼성화', '', ''),
+    ]
+    index = AutocompleteIndex(companies)
+
+    results = index.search('삼성', k=3)
+
+    assert results[0]['corp_name'] == '삼성화재'
+    assert results[0]['stock_code'] == '000810'
+
+
+def test_listed_company_found_by_mixed_choseong_beyond_limit():
+    # 초성 키(ㅅㅅㅎ...)가 같은 비상장사가 후보 수 제한을 채우는 경우
+    companies = unlisted(AutocompleteIndex.MAX_CANDIDATES + 500, '삼성하') + [
+        ('00126380', '삼성화재', 'Samsung Fire', '000810'),
+    ]
+    index = AutocompleteIndex(companies)
+
+    assert [row['corp_name'] for row in index.search('삼ㅅㅎ', k=1)] == ['삼성화재']
+    assert [row['corp_name'] for row in index.search('ㅅㅅㅎㅈ', k=1)] == ['삼성화재']
+
+
+def test_rank_exact_then_listed_then_short_name():
+    index = AutocompleteIndex([
+        ('1', '삼성전자서비스', '', ''),
+        ('2', '삼성전자', 'Samsung Electronics', '005930'),
+        ('3', '삼성', '', ''),
+        ('4', '삼성전기', '', '009150'),
+        ('5', '삼성중공업우', '', ''),
+    ])
+
+    assert [row['corp_code'] for row in index.search('삼성')] == ['3', '4', '2', '5', '1']
+    assert [row['corp_code'] for row in index.search('005930')] == ['2']
+    assert [row['corp_code'] for row in index.search('samsung e')] == ['2']
+
+
+def test_each_company_returned_once():
+    index = AutocompleteIndex([('1', '에스케이', 'SK', '034730')])
+
+    # 국문명·영문명·초성 키가 모두 일치해도 한 번만 반환
+    assert len(index.search('ㅇ')) == 1
+    assert index.search('') == []
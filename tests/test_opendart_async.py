@@ -0,0 +1,75 @@
+"""AsyncOpenDartAPI 테스트 - 가짜 DART 서버(conftest.dart_server) 사용"""
+import asyncio
+
+from opendart_api import DartResponseCache, OpenDartAPI
+from opendart_async import AsyncOpenDartAPI
+
+CORP_CODES = [f"{number:08d}" for number in range(1, 41)]
+
+
+def fetch_all(base_url: str, corp_codes, concurrency: int = 5, full: bool = False, **kwargs):
+    async def run():
+        results = {}
+        async with AsyncOpenDartAPI('stub', concurrency=concurrency, rate_limit=0, backoff_base=0.01,
+                                    **kwargs) as api:
+            api.base_url = base_url
+            async for corp_code, raw in api.fetch_financial_data_many(corp_codes, '2023', full=full):
+                results[corp_code] = raw
+            return results, api.get_latency_stats()
+    return asyncio.run(run())
+
+
+def test_async_results_match_sync(dart_server):
+    stub, base_url = dart_server
+    sync_api = OpenDartAPI('stub', backoff_base=0.01)
+    sync_api.base_url = base_url
+    expected = {corp_code: sync_api.get_financial_data(corp_code, '2023') for corp_code in CORP_CODES}
+    stub.reset()
+
+    results, _ = fetch_all(base_url, CORP_CODES)
+
+    assert results == expected
+    assert sorted(corp_code for corp_code, raw in results.items() if raw is None) == \
+        [corp_code for corp_code in CORP_CODES if corp_code.endswith('7')]
+
+
+def test_async_retries_503_and_reports_latency(dart_server):
+    stub, base_url = dart_server
+
+    results, stats = fetch_all(base_url, CORP_CODES)
+
+    retried = [corp_code for corp_code in CORP_CODES if corp_code.endswith('3')]
+    assert all(results[corp_code]['status'] == '000' for corp_code in retried)
+    assert stub.requests['fnlttSinglAcnt.json'] == len(CORP_CODES) + len(retried)
+    assert stats['fnlttSinglAcnt.json']['retries'] == len(retried)
+
+
+def test_async_respects_concurrency(dart_server):
+    stub, base_url = dart_server
+    stub.latency = 0.02
+
+    fetch_all(base_url, CORP_CODES, concurrency=4)
+
+    assert 1 < stub.max_in_flight <= 4
+
+
+def test_async_full_statements(dart_server):
+    stub, base_url = dart_server
+
+    results, _ = fetch_all(base_url, CORP_CODES[:5], full=True)
+
+    assert stub.requests == {'fnlttSinglAcntAll.json': 6}
+    assert results['00000001']['list'][0]['account_nm'] == '자산총계'
+
+
+def test_async_uses_response_cache(dart_server, tmp_path):
+    stub, base_url = dart_server
+    cache = DartResponseCache(str(tmp_path / 'dart_responses.db'))
+
+    first, _ = fetch_all(base_url, CORP_CODES[:10], cache=cache)
+    requests_after_first = stub.requests['fnlttSinglAcnt.json']
+    second, _ = fetch_all(base_url, CORP_CODES[:10], cache=cache)
+
+    assert second == first
+    # 013(데이터 없음) 응답은 캐시하지 않으므로 그 회사만 다시 요청
+    assert stub.requests['fnlttSinglAcnt.json'] == requests_after_first + 1
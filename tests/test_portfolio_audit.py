@@ -0,0 +1,133 @@
+"""PortfolioAudit 일괄 분석 테스트 - 가짜 모델과 가짜 DART 서버(conftest.dart_server) 사용"""
+import json
+import os
+import sqlite3
+
+import pytest
+
+from ai_analysis import AnalysisCache, AuditRiskAnalyzer
+from fake_model import SAMPLE_ANALYSIS, FakeGenerativeModel
+from opendart_api import OpenDartAPI
+from portfolio_audit import BudgetedModel, PortfolioAudit, TokenRateLimiter, resolve_corp_codes
+
+CORP_CODES = [f"{number:08d}" for number in range(1, 13)]
+
+
+class FlakyModel(FakeGenerativeModel):
+    """프롬프트마다 첫 호출은 요청 한도 초과로 실패하는 가짜 모델"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.failed_prompts = set()
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        with self._lock:
+            first = prompt not in self.failed_prompts
+            self.failed_prompts.add(prompt)
+        if first:
+            raise RuntimeError("429 Resource has been exhausted (fake model)")
+        return super().generate_content(prompt, stream=stream, **kwargs)
+
+
+@pytest.fixture
+def company_db(tmp_path):
+    db_path = str(tmp_path / 'companies.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE companies (corp_code TEXT, corp_name TEXT, stock_code TEXT)')
+    conn.executemany('INSERT INTO companies VALUES (?, ?, ?)',
+                     [(corp_code, f'회사{corp_code[-2:]}', corp_code[2:]) for corp_code in CORP_CODES])
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def make_audit(base_url: str, company_db: str, tmp_path, base_model, cache: bool = False) -> PortfolioAudit:
+    api = OpenDartAPI('stub', backoff_base=0.01)
+    api.base_url = base_url
+    model = BudgetedModel(base_model, TokenRateLimiter(rpm=0, tpm=0))
+    analyzer = AuditRiskAnalyzer(model_name='fake-model', model=model,
+                                 cache=AnalysisCache(str(tmp_path / 'ai_analyses.db')) if cache else None)
+    return PortfolioAudit(api, analyzer, model, company_db_path=company_db, output_dir=str(tmp_path / 'out'),
+                          llm_workers=4, fetch_workers=4, max_attempts=3, retry_delay=0.01)
+
+
+def test_run_with_fake_model(dart_server, company_db, tmp_path):
+    stub, base_url = dart_server
+    fake = FakeGenerativeModel(total_time=0, first_chunk_delay=0)
+    audit = make_audit(base_url, company_db, tmp_path, fake)
+
+    portfolio = audit.run(CORP_CODES + ['99999999'], '2023')
+
+    results = {result['corp_code']: result for result in portfolio['results']}
+    assert list(results) == CORP_CODES + ['99999999']
+    assert results['00000007']['error'] == '재무 데이터를 가져올 수 없습니다.'
+    assert results['99999999']['error'] == '회사 정보를 찾을 수 없습니다.'
+    succeeded = [corp_code for corp_code in CORP_CODES if corp_code != '00000007']
+    for corp_code in succeeded:
+        assert results[corp_code]['success'] is True
+        assert results[corp_code]['analysis'] == SAMPLE_ANALYSIS
+        assert results[corp_code]['metrics']['debt_ratio'] == 40.0
+
+    summary = portfolio['summary']
+    assert summary['succeeded'] == len(succeeded)
+    assert summary['failed'] == 2
+    assert summary['model_requests'] == fake.calls == len(succeeded)
+    assert summary['prompt_tokens'] > 0 and summary['output_tokens'] > 0
+    assert summary['risk_levels'] == {SAMPLE_ANALYSIS['overall_risk_level']: len(succeeded)}
+    # 주요계정은 다중회사 API 한 번으로 조회
+    assert stub.requests['fnlttMultiAcnt.json'] == 1
+
+    with open(os.path.join(tmp_path, 'out', 'portfolio.json'), encoding='utf-8') as f:
+        assert json.load(f)['summary'] == summary
+    assert sorted(os.listdir(os.path.join(tmp_path, 'out', 'companies'))) == \
+        sorted(f'{corp_code}.json' for corp_code in CORP_CODES)
+
+
+def test_rerun_skips_previous_successes(dart_server, company_db, tmp_path):
+    _, base_url = dart_server
+    fake = FakeGenerativeModel(total_time=0, first_chunk_delay=0)
+    audit = make_audit(base_url, company_db, tmp_path, fake)
+    audit.run(CORP_CODES, '2023')
+    calls = fake.calls
+
+    portfolio = audit.run(CORP_CODES, '2023')
+
+    assert fake.calls == calls
+    assert portfolio['summary']['skipped'] == len(CORP_CODES) - 1
+    assert portfolio['summary']['analyzed'] == 1
+
+
+def test_force_rerun_uses_analysis_cache(dart_server, company_db, tmp_path):
+    _, base_url = dart_server
+    fake = FakeGenerativeModel(total_time=0, first_chunk_delay=0)
+    audit = make_audit(base_url, company_db, tmp_path, fake, cache=True)
+    audit.run(CORP_CODES, '2023')
+    calls = fake.calls
+
+    portfolio = audit.run(CORP_CODES, '2023', force=True)
+
+    assert fake.calls == calls
+    assert portfolio['summary']['cached'] == len(CORP_CODES) - 1
+    assert portfolio['summary']['model_requests'] == 0
+
+
+def test_failed_model_calls_are_retried(dart_server, company_db, tmp_path):
+    _, base_url = dart_server
+    flaky = FlakyModel(total_time=0, first_chunk_delay=0)
+    audit = make_audit(base_url, company_db, tmp_path, flaky)
+
+    portfolio = audit.run(CORP_CODES[:4], '2023')
+
+    summary = portfolio['summary']
+    assert summary['succeeded'] == 4
+    assert summary['retried'] == 4
+    assert summary['model_failures'] == 4
+    assert all(result['attempts'] == 2 for result in portfolio['results'])
+
+
+def test_resolve_corp_codes(company_db, tmp_path):
+    codes_file = tmp_path / 'clients.txt'
+    codes_file.write_text('000002\n000001\n\n999999\n', encoding='utf-8')
+
+    assert resolve_corp_codes(company_db, '00000005,00000001', f'@{codes_file}') == \
+        ['00000005', '00000001', '00000002']
@@ -1,31 +1,40 @@
-import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
+from matplotlib.figure import Figure
+from matplotlib.text import Text
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 import io
 import base64
 import os
+import json
+import hashlib
+import threading
 import urllib.request
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
-# 전역 폰트 설정
+# 한글 폰트 (setup_korean_font에서 설정)
 KOREAN_FONT = None
 
+# 차트 모양이 바뀌면 올려서 기존 차트 캐시를 무효화
+CHART_VERSION = '2'
+
 def setup_korean_font():
-    """한글 폰트를 설정합니다."""
+    """
+    한글 폰트를 찾아 KOREAN_FONT에 저장합니다.
+    
+    matplotlib 전역 설정(rcParams)은 바꾸지 않으며, 폰트는 Figure마다 apply_korean_font로 적용합니다.
+    """
     global KOREAN_FONT
     
     try:
-        # matplotlib 기본 설정
-        plt.rcParams['axes.unicode_minus'] = False
-        
         # 1. 폰트 다운로드 시도
         font_path = download_korean_font()
         if font_path and os.path.exists(font_path):
             try:
-                # 다운로드된 폰트 등록
+                # 다운로드된 폰트 등록 (이름으로 찾을 수 있도록)
                 fm.fontManager.addfont(font_path)
                 KOREAN_FONT = fm.FontProperties(fname=font_path)
-                plt.rcParams['font.family'] = [KOREAN_FONT.get_name()]
                 print(f"다운로드 폰트 설정 완료: {KOREAN_FONT.get_name()}")
                 return KOREAN_FONT
             except Exception as e:
@@ -35,18 +44,14 @@ def setup_korean_font():
         korean_font = find_system_korean_font()
         if korean_font:
             KOREAN_FONT = korean_font
-            plt.rcParams['font.family'] = [korean_font.get_name()]
             print(f"시스템 폰트 설정 완료: {korean_font.get_name()}")
             return korean_font
         
-        # 3. 최후 수단: DejaVu Sans
+        # 3. 최후 수단: matplotlib 기본 폰트(DejaVu Sans)
         print("한글 폰트를 찾을 수 없습니다. DejaVu Sans를 사용합니다.")
-        plt.rcParams['font.family'] = ['DejaVu Sans', 'Liberation Sans', 'Arial', 'sans-serif']
         
     except Exception as e:
         print(f"폰트 설정 중 오류: {e}")
-        plt.rcParams['font.family'] = ['DejaVu Sans', 'sans-serif']
-        plt.rcParams['axes.unicode_minus'] = False
     
     return None
 
@@ -110,28 +115,190 @@ def find_system_korean_font():
         print(f"시스템 폰트 검색 실패: {e}")
         return None
 
-def apply_korean_font_to_text(text_objects):
-    """텍스트 객체들에 한글 폰트를 적용합니다."""
+def apply_korean_font(fig: Figure):
+    """
+    Figure의 모든 텍스트에 한글 폰트를 적용합니다. (크기·굵기는 유지)
+    
+    한글 폰트에 없는 글자(마이너스 기호 등)는 DejaVu Sans로 대체됩니다.
+    """
     if KOREAN_FONT is None:
         return
     
-    if not isinstance(text_objects, list):
-        text_objects = [text_objects]
-    
-    for text_obj in text_objects:
-        if text_obj is not None:
+    family = [KOREAN_FONT.get_name(), 'DejaVu Sans']
+    for text_obj in fig.findobj(Text):
+        text_obj.set_fontfamily(family)
+
+class ChartCache:
+    """
+    렌더링된 차트 이미지를 콘텐츠 해시로 저장하는 디스크 캐시 클래스
+
+    같은 디렉토리를 모든 워커 프로세스가 공유하며,
+    전체 용량이 한도를 넘으면 가장 오래 사용되지 않은 파일부터 삭제합니다.
+
+    저장할 때마다 디렉토리를 훑지 않도록 프로세스별로 전체 용량 추정치를 누적하고,
+    추정치가 한도를 넘었거나 마지막 확인 이후 이 프로세스가 한도의 RESCAN_FRACTION만큼
+    저장했을 때(다른 워커가 저장한 용량 반영)만 디렉토리를 확인해 정리합니다.
+    """
+
+    RESCAN_FRACTION = 0.1
+
+    def __init__(self, cache_dir: str = os.path.join('cache', 'charts'), max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # 전체 용량 추정치 (처음 저장할 때 디렉토리를 확인해 채움)
+        self._total_bytes = None
+        self._written_since_scan = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.{fmt}')
+
+    def get(self, key: str, fmt: str) -> Optional[bytes]:
+        """캐시된 이미지를 반환합니다. 없으면 None을 반환합니다."""
+        path = self._path(key, fmt)
+        try:
+            with open(path, 'rb') as f:
+                image = f.read()
+            # 수정 시각을 최근 사용 시각으로 사용 (LRU)
+            os.utime(path, None)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return image
+
+    def set(self, key: str, fmt: str, image: bytes):
+        """이미지를 원자적으로 저장하고, 용량 초과 시 오래된 파일부터 삭제합니다."""
+        path = self._path(key, fmt)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
             try:
-                if hasattr(text_obj, 'set_fontproperties'):
-                    text_obj.set_fontproperties(KOREAN_FONT)
-                elif hasattr(text_obj, 'set_fontfamily'):
-                    text_obj.set_fontfamily(KOREAN_FONT.get_name())
-            except:
-                pass
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            with open(tmp_path, 'wb') as f:
+                f.write(image)
+            os.replace(tmp_path, path)
+            self._account(len(image) - replaced)
+        except OSError as e:
+            print(f"차트 캐시 저장 오류: {e}")
+
+    def _account(self, delta: int):
+        """저장한 용량을 추정치에 더하고, 한도를 넘었거나 다시 확인할 때가 되면 정리합니다."""
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += delta
+                self._written_since_scan += max(delta, 0)
+                if (self._total_bytes <= self.max_bytes
+                        and self._written_since_scan < self.max_bytes * self.RESCAN_FRACTION):
+                    return
+        self._evict()
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        """캐시 파일 목록을 (최근 사용 시각, 크기, 경로)로 반환합니다."""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        """전체 용량이 한도를 넘으면 오래 사용되지 않은 파일부터 삭제합니다."""
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            self._reset_total(total)
+            return
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self.evictions += removed
+        self._reset_total(total)
+
+    def _reset_total(self, total: int):
+        """디렉토리를 확인한 결과로 용량 추정치를 맞춥니다."""
+        with self._lock:
+            self._total_bytes = total
+            self._written_since_scan = 0
+
+    def stats(self) -> Dict:
+        """적중/실패 횟수와 저장 현황을 반환합니다."""
+        entries = self._scan()
+        total_bytes = sum(size for _, size, _ in entries)
+        self._reset_total(total_bytes)
+        with self._lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0,
+            'evictions': evictions,
+            'entries': len(entries),
+            'total_bytes': total_bytes,
+            'max_bytes': self.max_bytes
+        }
 
 class FinancialVisualizer:
     """재무데이터 시각화 클래스"""
     
-    def __init__(self):
+    # 개별 렌더링을 지원하는 차트 종류와 이미지 형식
+    CHART_KINDS = ('balance_sheet', 'income_statement', 'financial_ratios', 'trend_analysis')
+    IMAGE_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+    MIN_DPI = 50
+    MAX_DPI = 300
+    
+    # 차트별 Figure 크기(인치)와 데이터 없음 안내 문구
+    FIGURE_SIZES = {
+        'balance_sheet': (12, 8),
+        'income_statement': (14, 8),
+        'financial_ratios': (10, 10),
+        'trend_analysis': (12, 8),
+        'no_data': (10, 6)
+    }
+    NO_DATA_MESSAGES = {
+        'balance_sheet': "재무상태표 데이터가 없습니다.",
+        'income_statement': "손익계산서 데이터가 없습니다.",
+        'financial_ratios': "재무비율 데이터가 없습니다.",
+        'trend_analysis': "재무비율 트렌드 분석을 위한 데이터가 부족합니다."
+    }
+    
+    def __init__(self, cache: Optional['ChartCache'] = None, render_workers: int = 0,
+                 use_processes: bool = False):
+        """
+        Args:
+            cache: 렌더링된 차트 캐시 (None이면 캐시 사용 안 함)
+            render_workers: 차트를 병렬 렌더링할 워커 수 (0이면 호출 스레드에서 렌더링)
+            use_processes: True이면 스레드 대신 프로세스 풀에서 렌더링 (GIL 회피)
+        """
+        self.cache = cache
+        self.render_workers = render_workers
+        self.use_processes = use_processes
+        self._executor = None
+        self._prerender_executor = None
+        self._executor_lock = threading.Lock()
         self.colors = {
             'primary': '#667eea',
             'secondary': '#764ba2',
@@ -144,38 +311,57 @@ class FinancialVisualizer:
         }
     
     def create_balance_sheet_chart(self, financial_data: Dict, use_consolidated: bool = True) -> str:
+        """재무상태표 차트를 base64 인코딩된 PNG 문자열로 생성합니다."""
+        series = self._balance_sheet_series(financial_data, use_consolidated)
+        return self._save_chart_as_base64(self._build_figure('balance_sheet', series))
+    
+    def _balance_sheet_series(self, financial_data: Dict, use_consolidated: bool = True) -> Optional[Dict]:
         """
-        재무상태표 차트를 생성합니다.
+        재무상태표 차트에 사용되는 데이터를 추출합니다.
         
         Args:
             financial_data: 파싱된 재무데이터
             use_consolidated: 연결재무제표 사용 여부
             
         Returns:
-            base64 인코딩된 이미지 문자열
+            자산/부채와 자본 구성 금액 (조원 단위) 또는 None (데이터 없음)
         """
         data_type = 'consolidated' if use_consolidated else 'separate'
         bs = financial_data.get(data_type, {}).get('balance_sheet', {})
         
         if not bs:
-            return self._create_no_data_chart("재무상태표 데이터가 없습니다.")
+            return None
         
         # 주요 항목 추출 (조원 단위)
-        assets_data = {
-            '유동자산': bs.get('유동자산', {}).get('current_period', {}).get('amount', 0) / 1000000000000,
-            '비유동자산': bs.get('비유동자산', {}).get('current_period', {}).get('amount', 0) / 1000000000000
+        return {
+            'assets': {
+                '유동자산': bs.get('유동자산', {}).get('current_period', {}).get('amount', 0) / 1000000000000,
+                '비유동자산': bs.get('비유동자산', {}).get('current_period', {}).get('amount', 0) / 1000000000000
+            },
+            'liabilities': {
+                '유동부채': bs.get('유동부채', {}).get('current_period', {}).get('amount', 0) / 1000000000000,
+                '비유동부채': bs.get('비유동부채', {}).get('current_period', {}).get('amount', 0) / 1000000000000,
+                '자본총계': bs.get('자본총계', {}).get('current_period', {}).get('amount', 0) / 1000000000000
+            }
         }
+    
+    def _build_balance_sheet_figure(self, series: Dict):
+        """
+        재무상태표 차트를 생성합니다.
         
-        liabilities_data = {
-            '유동부채': bs.get('유동부채', {}).get('current_period', {}).get('amount', 0) / 1000000000000,
-            '비유동부채': bs.get('비유동부채', {}).get('current_period', {}).get('amount', 0) / 1000000000000,
-            '자본총계': bs.get('자본총계', {}).get('current_period', {}).get('amount', 0) / 1000000000000
-        }
+        Args:
+            series: _balance_sheet_series에서 추출한 데이터
+            
+        Returns:
+            matplotlib Figure 객체
+        """
+        assets_data = series['assets']
+        liabilities_data = series['liabilities']
         
         # 차트 생성 - 박스형 적층 막대 차트
-        fig, ax = plt.subplots(1, 1, figsize=(12, 8))
-        title = fig.suptitle('재무상태표 구성', fontsize=16, fontweight='bold')
-        apply_korean_font_to_text(title)
+        fig = self._new_figure('balance_sheet')
+        ax = fig.subplots(1, 1)
+        fig.suptitle('재무상태표 구성', fontsize=16, fontweight='bold')
         
         # 데이터 준비
         categories = ['자산', '부채와 자본']
@@ -222,8 +408,7 @@ class FinancialVisualizer:
         # 축 설정
         ax.set_xticks(x_pos)
         ax.set_xticklabels(categories, fontsize=14, fontweight='bold')
-        ylabel = ax.set_ylabel('금액 (조원)', fontsize=12, fontweight='bold')
-        apply_korean_font_to_text([ylabel] + ax.get_xticklabels())
+        ax.set_ylabel('금액 (조원)', fontsize=12, fontweight='bold')
         ax.grid(axis='y', alpha=0.3)
         
         # 각 구간별 값 표시 (계정명 + 금액 + 퍼센트)
@@ -277,25 +462,30 @@ class FinancialVisualizer:
         max_value = max(total_assets, total_liab_equity)
         ax.set_ylim(0, max_value * 1.15)
         
-        plt.tight_layout()
-        return self._save_chart_as_base64(fig)
+        fig.tight_layout()
+        return fig
     
     def create_income_statement_chart(self, financial_data: Dict, use_consolidated: bool = True) -> str:
+        """손익계산서 차트를 base64 인코딩된 PNG 문자열로 생성합니다."""
+        series = self._income_statement_series(financial_data, use_consolidated)
+        return self._save_chart_as_base64(self._build_figure('income_statement', series))
+    
+    def _income_statement_series(self, financial_data: Dict, use_consolidated: bool = True) -> Optional[Dict]:
         """
-        손익계산서 차트를 생성합니다.
+        손익계산서 차트에 사용되는 3개년 데이터를 추출합니다.
         
         Args:
             financial_data: 파싱된 재무데이터
             use_consolidated: 연결재무제표 사용 여부
             
         Returns:
-            base64 인코딩된 이미지 문자열
+            연도별 매출액/영업이익/당기순이익(조원)과 이익률(%) 또는 None (데이터 없음)
         """
         data_type = 'consolidated' if use_consolidated else 'separate'
         is_data = financial_data.get(data_type, {}).get('income_statement', {})
         
         if not is_data:
-            return self._create_no_data_chart("손익계산서 데이터가 없습니다.")
+            return None
         
         # 3개년 데이터 추출
         categories = ['매출액', '영업이익', '당기순이익']
@@ -308,11 +498,6 @@ class FinancialVisualizer:
             previous_values.append(is_data.get(category, {}).get('previous_period', {}).get('amount', 0) / 1000000000000)
             before_previous_values.append(is_data.get(category, {}).get('before_previous_period', {}).get('amount', 0) / 1000000000000)
         
-        # 연도 정보 추출 및 실제 연도로 변환
-        current_year_name = is_data.get('매출액', {}).get('current_period', {}).get('name', '당기')
-        previous_year_name = is_data.get('매출액', {}).get('previous_period', {}).get('name', '전기')
-        before_previous_year_name = is_data.get('매출액', {}).get('before_previous_period', {}).get('name', '전전기')
-        
         # 기본 정보에서 사업연도 추출
         base_year = int(financial_data.get('basic_info', {}).get('bsns_year', '2022'))
         current_year = f'{base_year}년'
@@ -346,8 +531,33 @@ class FinancialVisualizer:
             operating_margin_values.append(operating_margin)
             net_margin_values.append(net_margin)
         
+        return {
+            'categories': categories,
+            'years': years,
+            'year_data': year_data,
+            'operating_margins': operating_margin_values,
+            'net_margins': net_margin_values
+        }
+    
+    def _build_income_statement_figure(self, series: Dict):
+        """
+        손익계산서 차트를 생성합니다.
+        
+        Args:
+            series: _income_statement_series에서 추출한 데이터
+            
+        Returns:
+            matplotlib Figure 객체
+        """
+        categories = series['categories']
+        years = series['years']
+        year_data = series['year_data']
+        operating_margin_values = series['operating_margins']
+        net_margin_values = series['net_margins']
+        
         # 복합 차트 생성 - 막대차트 + 꺾은선차트
-        fig, ax1 = plt.subplots(figsize=(14, 8))
+        fig = self._new_figure('income_statement')
+        ax1 = fig.subplots()
         
         x = np.arange(len(years))
         width = 0.25
@@ -412,21 +622,26 @@ class FinancialVisualizer:
                            ha='left', va='top',
                            fontsize=9, color=self.colors['success'])
         
-        plt.tight_layout()
-        return self._save_chart_as_base64(fig)
+        fig.tight_layout()
+        return fig
     
     def create_financial_ratios_chart(self, metrics: Dict) -> str:
+        """재무비율 차트를 base64 인코딩된 PNG 문자열로 생성합니다."""
+        series = self._financial_ratios_series(metrics)
+        return self._save_chart_as_base64(self._build_figure('financial_ratios', series))
+    
+    def _financial_ratios_series(self, metrics: Dict) -> Optional[Dict]:
         """
-        재무비율 차트를 생성합니다.
+        재무비율 차트에 사용되는 데이터를 추출합니다.
         
         Args:
             metrics: 계산된 재무지표
             
         Returns:
-            base64 인코딩된 이미지 문자열
+            비율명과 값(%) 목록 또는 None (데이터 없음)
         """
         if not metrics:
-            return self._create_no_data_chart("재무비율 데이터가 없습니다.")
+            return None
         
         # 비율 데이터 정리
         ratio_data = {
@@ -439,11 +654,27 @@ class FinancialVisualizer:
             'ROE': metrics.get('roe', 0)
         }
         
+        return {
+            'categories': list(ratio_data.keys()),
+            'values': list(ratio_data.values())
+        }
+    
+    def _build_financial_ratios_figure(self, series: Dict):
+        """
+        재무비율 차트를 생성합니다.
+        
+        Args:
+            series: _financial_ratios_series에서 추출한 데이터
+            
+        Returns:
+            matplotlib Figure 객체
+        """
         # 레이더 차트 생성
-        fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(projection='polar'))
+        fig = self._new_figure('financial_ratios')
+        ax = fig.subplots(subplot_kw=dict(projection='polar'))
         
-        categories = list(ratio_data.keys())
-        values = list(ratio_data.values())
+        categories = list(series['categories'])
+        values = list(series['values'])
         
         # 각도 계산
         angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
@@ -471,26 +702,31 @@ class FinancialVisualizer:
         ax.set_title('주요 재무비율', fontsize=16, fontweight='bold', pad=20)
         ax.grid(True)
         
-        plt.tight_layout()
-        return self._save_chart_as_base64(fig)
+        fig.tight_layout()
+        return fig
     
     def create_trend_analysis_chart(self, financial_data: Dict, use_consolidated: bool = True) -> str:
+        """재무비율 트렌드 분석 차트를 base64 인코딩된 PNG 문자열로 생성합니다."""
+        series = self._trend_analysis_series(financial_data, use_consolidated)
+        return self._save_chart_as_base64(self._build_figure('trend_analysis', series))
+    
+    def _trend_analysis_series(self, financial_data: Dict, use_consolidated: bool = True) -> Optional[Dict]:
         """
-        주요 재무비율 트렌드 분석 차트를 생성합니다.
+        재무비율 트렌드 분석 차트에 사용되는 3개년 비율을 계산합니다.
         
         Args:
             financial_data: 파싱된 재무데이터
             use_consolidated: 연결재무제표 사용 여부
             
         Returns:
-            base64 인코딩된 이미지 문자열
+            연도별 ROE/ROA/부채비율(%) 또는 None (데이터 부족)
         """
         data_type = 'consolidated' if use_consolidated else 'separate'
         bs = financial_data.get(data_type, {}).get('balance_sheet', {})
         is_data = financial_data.get(data_type, {}).get('income_statement', {})
         
         if not bs or not is_data:
-            return self._create_no_data_chart("재무비율 트렌드 분석을 위한 데이터가 부족합니다.")
+            return None
         
         # 기본 정보에서 사업연도 추출하여 실제 연도로 변환
         base_year = int(financial_data.get('basic_info', {}).get('bsns_year', '2022'))
@@ -531,8 +767,31 @@ class FinancialVisualizer:
                 debt_ratio = 0
             debt_ratio_values.append(debt_ratio)
         
+        return {
+            'years': years,
+            'roe': roe_values,
+            'roa': roa_values,
+            'debt_ratio': debt_ratio_values
+        }
+    
+    def _build_trend_analysis_figure(self, series: Dict):
+        """
+        주요 재무비율 트렌드 분석 차트를 생성합니다.
+        
+        Args:
+            series: _trend_analysis_series에서 추출한 데이터
+            
+        Returns:
+            matplotlib Figure 객체
+        """
+        years = series['years']
+        roe_values = series['roe']
+        roa_values = series['roa']
+        debt_ratio_values = series['debt_ratio']
+        
         # 복합 차트 생성 (ROE, ROA는 왼쪽 축, 부채비율은 오른쪽 축)
-        fig, ax1 = plt.subplots(figsize=(12, 8))
+        fig = self._new_figure('trend_analysis')
+        ax1 = fig.subplots()
         
         x = np.arange(len(years))
         
@@ -587,28 +846,376 @@ class FinancialVisualizer:
                            ha='right', va='bottom',
                            fontsize=9, color=self.colors['danger'])
         
-        plt.tight_layout()
-        return self._save_chart_as_base64(fig)
+        fig.tight_layout()
+        return fig
+    
+    def chart_series(self, kind: str, financial_data: Dict, metrics: Dict = None,
+                     use_consolidated: bool = True) -> Optional[Dict]:
+        """
+        차트 종류별로 그리는 데 필요한 데이터만 추출합니다.
+        
+        Args:
+            kind: 차트 종류 (CHART_KINDS 참고)
+            financial_data: 파싱된 재무데이터
+            metrics: 계산된 재무지표 (financial_ratios 차트에 사용)
+            use_consolidated: 연결재무제표 사용 여부
+            
+        Returns:
+            차트 입력 데이터 또는 None (데이터 없음)
+        """
+        if kind not in self.CHART_KINDS:
+            raise ValueError(f"지원하지 않는 차트 종류입니다: {kind}")
+        
+        if kind == 'financial_ratios':
+            return self._financial_ratios_series(metrics)
+        return getattr(self, f'_{kind}_series')(financial_data, use_consolidated)
+    
+    def create_chart_spec(self, kind: str, financial_data: Dict, metrics: Dict = None,
+                          use_consolidated: bool = True) -> Dict:
+        """
+        클라이언트 렌더링용 선언적 차트 명세(JSON)를 생성합니다.
+        
+        명세 구조 (spec_version 1):
+            {
+                "spec_version": 1,
+                "kind": 차트 종류,
+                "title": 차트 제목,
+                "type": "stacked_bar" | "bar_line" | "radar" | "line",
+                "labels": x축(레이더는 각 축) 라벨 목록,
+                "axes": {"y": {"title", "unit"}, "y2": {...}, "r": {"min", "max"}} 중 사용하는 축,
+                "series": [{"name", "type": "bar" | "line" | "area", "axis", "color", "values", "stack"}],
+                "annotations": [{"label", "value", "text"}]
+            }
+            데이터가 없으면 {"spec_version", "kind", "empty": true, "message"}를 반환합니다.
+            values는 labels와 같은 순서이며 금액은 조원, 비율은 % 단위입니다.
+        
+        Args:
+            kind: 차트 종류 (CHART_KINDS 참고)
+            financial_data: 파싱된 재무데이터
+            metrics: 계산된 재무지표 (financial_ratios 차트에 사용)
+            use_consolidated: 연결재무제표 사용 여부
+            
+        Returns:
+            차트 명세 딕셔너리
+        """
+        series = self.chart_series(kind, financial_data, metrics, use_consolidated)
+        if series is None:
+            return {'spec_version': 1, 'kind': kind, 'empty': True, 'message': self.NO_DATA_MESSAGES[kind]}
+        
+        spec = getattr(self, f'_{kind}_spec')(series)
+        spec.update({'spec_version': 1, 'kind': kind})
+        return spec
+    
+    def _balance_sheet_spec(self, series: Dict) -> Dict:
+        """재무상태표 적층 막대 차트 명세를 생성합니다."""
+        assets = series['assets']
+        liabilities = series['liabilities']
+        total_assets = assets['유동자산'] + assets['비유동자산']
+        total_liab_equity = liabilities['유동부채'] + liabilities['비유동부채'] + liabilities['자본총계']
+        
+        # 아래에서 위로 쌓는 순서
+        stacks = [
+            ('비유동자산', [assets['비유동자산'], 0], 'secondary'),
+            ('유동자산', [assets['유동자산'], 0], 'primary'),
+            ('자본총계', [0, liabilities['자본총계']], 'success'),
+            ('비유동부채', [0, liabilities['비유동부채']], 'warning'),
+            ('유동부채', [0, liabilities['유동부채']], 'danger'),
+        ]
+        
+        return {
+            'title': '재무상태표 구성',
+            'type': 'stacked_bar',
+            'labels': ['자산', '부채와 자본'],
+            'axes': {'y': {'title': '금액 (조원)', 'unit': '조원'}},
+            'series': [
+                {'name': name, 'type': 'bar', 'axis': 'y', 'stack': 'total',
+                 'color': self.colors[color], 'values': [round(v, 4) for v in values]}
+                for name, values, color in stacks
+            ],
+            'annotations': [
+                {'label': '자산', 'value': round(total_assets, 4), 'text': f'총 {total_assets:.1f}조원'},
+                {'label': '부채와 자본', 'value': round(total_liab_equity, 4), 'text': f'총 {total_liab_equity:.1f}조원'}
+            ]
+        }
+    
+    def _income_statement_spec(self, series: Dict) -> Dict:
+        """손익계산서 막대+꺾은선 복합 차트 명세를 생성합니다."""
+        years = series['years']
+        year_data = series['year_data']
+        bar_colors = ['primary', 'warning', 'success']
+        
+        bars = [
+            {'name': category, 'type': 'bar', 'axis': 'y', 'color': self.colors[bar_colors[i]],
+             'values': [round(year_data[year][i], 4) for year in years]}
+            for i, category in enumerate(series['categories'])
+        ]
+        lines = [
+            {'name': '영업이익률', 'type': 'line', 'axis': 'y2', 'color': self.colors['warning'],
+             'values': [round(v, 2) for v in series['operating_margins']]},
+            {'name': '당기순이익률', 'type': 'line', 'axis': 'y2', 'color': self.colors['success'],
+             'values': [round(v, 2) for v in series['net_margins']]}
+        ]
+        
+        return {
+            'title': '손익계산서 주요 항목 및 이익률 (3개년 비교)',
+            'type': 'bar_line',
+            'labels': years,
+            'axes': {
+                'y': {'title': '금액 (조원)', 'unit': '조원'},
+                'y2': {'title': '이익률 (%)', 'unit': '%'}
+            },
+            'series': bars + lines,
+            'annotations': []
+        }
+    
+    def _financial_ratios_spec(self, series: Dict) -> Dict:
+        """주요 재무비율 레이더 차트 명세를 생성합니다."""
+        values = [round(v, 2) for v in series['values']]
+        return {
+            'title': '주요 재무비율',
+            'type': 'radar',
+            'labels': list(series['categories']),
+            'axes': {'r': {'min': 0, 'max': max(max(values), 100), 'unit': '%'}},
+            'series': [
+                {'name': '재무비율', 'type': 'area', 'axis': 'r', 'color': self.colors['primary'], 'values': values}
+            ],
+            'annotations': []
+        }
+    
+    def _trend_analysis_spec(self, series: Dict) -> Dict:
+        """재무비율 추이 꺾은선 차트 명세를 생성합니다."""
+        return {
+            'title': '주요 재무비율 추이 분석',
+            'type': 'line',
+            'labels': series['years'],
+            'axes': {
+                'y': {'title': '수익성 비율 (%)', 'unit': '%'},
+                'y2': {'title': '부채비율 (%)', 'unit': '%'}
+            },
+            'series': [
+                {'name': 'ROE', 'type': 'line', 'axis': 'y', 'color': self.colors['success'],
+                 'values': [round(v, 2) for v in series['roe']]},
+                {'name': 'ROA', 'type': 'line', 'axis': 'y', 'color': self.colors['primary'],
+                 'values': [round(v, 2) for v in series['roa']]},
+                {'name': '부채비율', 'type': 'line', 'axis': 'y2', 'color': self.colors['danger'],
+                 'values': [round(v, 2) for v in series['debt_ratio']]}
+            ],
+            'annotations': []
+        }
+    
+    def resolve_dpi(self, kind: str, series: Optional[Dict], dpi: float = 150, width: int = None) -> float:
+        """요청한 해상도 또는 가로 크기(px)로부터 실제 렌더링 DPI를 계산합니다."""
+        # 가로 크기가 지정되면 레이아웃은 유지하고 해상도만 조정
+        if width:
+            figure_width = self.FIGURE_SIZES[kind if series is not None else 'no_data'][0]
+            dpi = width / figure_width
+        return round(max(self.MIN_DPI, min(self.MAX_DPI, dpi)), 2)
+    
+    def chart_key(self, kind: str, series: Optional[Dict], fmt: str, dpi: float) -> str:
+        """차트 입력 데이터와 렌더링 옵션으로 콘텐츠 주소(해시)를 계산합니다."""
+        payload = json.dumps([CHART_VERSION, kind, series, fmt, dpi], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def render_chart(self, kind: str, financial_data: Dict, metrics: Dict = None, fmt: str = 'png',
+                     dpi: int = 150, width: int = None, use_consolidated: bool = True) -> bytes:
+        """
+        차트 하나를 이미지 바이트로 렌더링합니다.
+        
+        Args:
+            kind: 차트 종류 (CHART_KINDS 참고)
+            financial_data: 파싱된 재무데이터
+            metrics: 계산된 재무지표 (financial_ratios 차트에 사용)
+            fmt: 이미지 형식 (png 또는 svg)
+            dpi: 해상도 (width가 지정되면 무시)
+            width: 출력 이미지 가로 크기(px)
+            use_consolidated: 연결재무제표 사용 여부
+            
+        Returns:
+            인코딩된 이미지 바이트
+        """
+        series = self.chart_series(kind, financial_data, metrics, use_consolidated)
+        return self.render_series(kind, series, fmt, self.resolve_dpi(kind, series, dpi, width))
+    
+    def render_series(self, kind: str, series: Optional[Dict], fmt: str = 'png', dpi: float = 150) -> bytes:
+        """
+        추출된 차트 데이터를 이미지 바이트로 렌더링합니다. 캐시가 설정된 경우 캐시를 먼저 조회합니다.
+        
+        Args:
+            kind: 차트 종류 (CHART_KINDS 참고)
+            series: chart_series에서 추출한 데이터 (None이면 데이터 없음 차트)
+            fmt: 이미지 형식 (png 또는 svg)
+            dpi: 해상도
+            
+        Returns:
+            인코딩된 이미지 바이트
+        """
+        if kind not in self.CHART_KINDS:
+            raise ValueError(f"지원하지 않는 차트 종류입니다: {kind}")
+        if fmt not in self.IMAGE_FORMATS:
+            raise ValueError(f"지원하지 않는 이미지 형식입니다: {fmt}")
+        
+        return self.render_many([(kind, series, fmt, dpi)])[0]
+    
+    def render_many(self, jobs: List[Tuple[str, Optional[Dict], str, float]]) -> List[bytes]:
+        """
+        여러 차트를 렌더링합니다. 워커 풀이 설정된 경우 캐시에 없는 차트를 병렬로 렌더링합니다.
+        
+        Args:
+            jobs: (차트 종류, 차트 데이터, 이미지 형식, 해상도) 목록
+            
+        Returns:
+            jobs와 같은 순서의 이미지 바이트 목록
+        """
+        for kind, series, fmt, dpi in jobs:
+            if kind not in self.CHART_KINDS:
+                raise ValueError(f"지원하지 않는 차트 종류입니다: {kind}")
+            if fmt not in self.IMAGE_FORMATS:
+                raise ValueError(f"지원하지 않는 이미지 형식입니다: {fmt}")
+        
+        images = [None] * len(jobs)
+        keys = [None] * len(jobs)
+        pending = []
+        
+        for i, (kind, series, fmt, dpi) in enumerate(jobs):
+            if self.cache is not None:
+                keys[i] = self.chart_key(kind, series, fmt, dpi)
+                images[i] = self.cache.get(keys[i], fmt)
+            if images[i] is None:
+                pending.append(i)
+        
+        # 한 장만 그릴 때는 풀 전달·직렬화 비용이 이득보다 크므로 호출 스레드에서 렌더링
+        executor = self._get_executor() if len(pending) > 1 else None
+        if executor is not None:
+            render = _render_chart_job if self.use_processes else self._render_job
+            futures = {i: executor.submit(render, *jobs[i]) for i in pending}
+            for i, future in futures.items():
+                images[i] = future.result()
+        else:
+            for i in pending:
+                images[i] = self._render_job(*jobs[i])
+        
+        if self.cache is not None:
+            for i in pending:
+                self.cache.set(keys[i], jobs[i][2], images[i])
+        return images
+    
+    def prerender(self, kinds: List[str], financial_data: Dict, metrics: Dict = None, fmt: str = 'png',
+                  dpi: float = 150, use_consolidated: bool = True) -> int:
+        """
+        한 요청에서 쓸 차트 여러 개를 render_many로 함께 렌더링하여 캐시에 넣어 둡니다.
+        
+        렌더링은 백그라운드 스레드에서 진행되므로 호출자는 완료를 기다리지 않습니다.
+        완료된 뒤의 render_chart/render_series 호출은 캐시에서 바로 반환됩니다.
+        
+        Returns:
+            렌더링을 요청한 차트 수 (캐시가 없으면 0)
+        """
+        if self.cache is None:
+            return 0
+        jobs = []
+        for kind in kinds:
+            series = self.chart_series(kind, financial_data, metrics, use_consolidated)
+            jobs.append((kind, series, fmt, self.resolve_dpi(kind, series, dpi)))
+        with self._executor_lock:
+            if self._prerender_executor is None:
+                self._prerender_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chart-prerender')
+            self._prerender_executor.submit(self._prerender_jobs, jobs)
+        return len(jobs)
+    
+    def _prerender_jobs(self, jobs: List[Tuple]):
+        """백그라운드에서 render_many를 실행합니다. (실패해도 요청 처리에는 영향 없음)"""
+        try:
+            self.render_many(jobs)
+        except Exception as e:
+            print(f"차트 미리 렌더링 오류: {e}")
+    
+    def _get_executor(self):
+        """렌더링 워커 풀을 처음 사용할 때 생성합니다. (gunicorn fork 이후 생성되도록 지연)"""
+        if self.render_workers <= 0:
+            return None
+        with self._executor_lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.render_workers,
+                        initializer=_init_render_worker,
+                        initargs=(self.colors,)
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.render_workers)
+        return self._executor
+    
+    def shutdown(self):
+        """렌더링 워커 풀을 종료합니다."""
+        # 미리 렌더링 스레드가 _get_executor에서 잠금을 잡으므로 잠금 밖에서 먼저 종료
+        with self._executor_lock:
+            prerender_executor, self._prerender_executor = self._prerender_executor, None
+        if prerender_executor is not None:
+            prerender_executor.shutdown(wait=True)
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+    
+    def _render_job(self, kind: str, series: Optional[Dict], fmt: str, dpi: float) -> bytes:
+        """차트 하나를 생성하여 이미지 바이트로 변환합니다."""
+        return self._render_figure(self._build_figure(kind, series), fmt, dpi)
+    
+    def _build_figure(self, kind: str, series: Optional[Dict]):
+        """차트 종류에 맞는 Figure를 생성합니다. 데이터가 없으면 안내 차트를 생성합니다."""
+        if series is None:
+            return self._create_no_data_figure(self.NO_DATA_MESSAGES[kind])
+        return getattr(self, f'_build_{kind}_figure')(series)
+    
+    def _new_figure(self, kind: str) -> Figure:
+        """pyplot 전역 상태를 거치지 않는 Agg 캔버스 Figure를 생성합니다. (스레드 안전)"""
+        fig = Figure(figsize=self.FIGURE_SIZES[kind])
+        FigureCanvasAgg(fig)
+        return fig
+    
+    def _render_figure(self, fig, fmt: str = 'png', dpi: float = 300) -> bytes:
+        """Figure를 지정한 형식의 이미지 바이트로 변환합니다."""
+        apply_korean_font(fig)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
     
     def _save_chart_as_base64(self, fig) -> str:
         """차트를 base64 문자열로 변환합니다."""
-        buffer = io.BytesIO()
-        fig.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        plt.close(fig)
-        return image_base64
+        return base64.b64encode(self._render_figure(fig, 'png', 300)).decode('utf-8')
     
-    def _create_no_data_chart(self, message: str) -> str:
+    def _create_no_data_figure(self, message: str):
         """데이터가 없을 때 표시할 차트를 생성합니다."""
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig = self._new_figure('no_data')
+        ax = fig.subplots()
         ax.text(0.5, 0.5, message, transform=ax.transAxes, 
                 ha='center', va='center', fontsize=16, 
                 bbox=dict(boxstyle="round,pad=0.3", facecolor=self.colors['light']))
         ax.set_xlim(0, 1)
         ax.set_ylim(0, 1)
         ax.axis('off')
-        return self._save_chart_as_base64(fig)
+        return fig
+    
+    def _create_no_data_chart(self, message: str) -> str:
+        """데이터가 없을 때 표시할 차트를 base64 문자열로 생성합니다."""
+        return self._save_chart_as_base64(self._create_no_data_figure(message))
+
+# 렌더링 워커(프로세스/스레드)에서 사용하는 시각화 객체
+_worker_visualizer = None
+
+def _init_render_worker(colors: Dict = None):
+    """렌더링 워커 프로세스를 초기화합니다. (폰트 설정은 모듈 임포트 시 프로세스당 한 번 수행)"""
+    global _worker_visualizer
+    _worker_visualizer = FinancialVisualizer()
+    if colors:
+        _worker_visualizer.colors = dict(colors)
+
+def _render_chart_job(kind: str, series: Optional[Dict], fmt: str, dpi: float) -> bytes:
+    """워커에서 차트 하나를 렌더링합니다. (프로세스 풀 전달을 위해 모듈 수준 함수로 정의)"""
+    global _worker_visualizer
+    if _worker_visualizer is None:
+        _worker_visualizer = FinancialVisualizer()
+    return _worker_visualizer._render_job(kind, series, fmt, dpi)
 
 # 한글 폰트 설정 실행
 setup_korean_font() 
\ No newline at end of file
@@ -1,10 +1,21 @@
 import xml.etree.ElementTree as ET
+import argparse
 import sqlite3
 import os
+import time
+import zipfile
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Tuple
 
-def create_database():
+# 한 번에 executemany로 넣을 행 수
+INSERT_BATCH_SIZE = 5000
+
+COMPANY_FIELDS = ('corp_code', 'corp_name', 'corp_eng_name', 'stock_code', 'modify_date')
+
+def create_database(db_path: str = 'companies.db'):
     """SQLite 데이터베이스와 테이블을 생성합니다."""
-    conn = sqlite3.connect('companies.db')
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # 기존 테이블이 있다면 삭제
@@ -24,53 +35,280 @@ def create_database():
     
     # 검색 성능을 위한 인덱스 생성
     cursor.execute('CREATE INDEX idx_corp_name ON companies(corp_name)')
-    cursor.execute('CREATE INDEX idx_corp_code ON companies(corp_code)')
+    cursor.execute('CREATE UNIQUE INDEX idx_corp_code ON companies(corp_code)')
     
     conn.commit()
     return conn
 
-def parse_xml_and_insert(conn):
-    """XML 파일을 파싱하여 데이터베이스에 삽입합니다."""
-    if not os.path.exists('corp.xml'):
-        print("corp.xml 파일을 찾을 수 없습니다.")
+def ensure_unique_corp_code(conn, commit: bool = True):
+    """
+    기존 데이터베이스의 corp_code 인덱스를 UNIQUE 인덱스로 변경합니다. (중복 행은 최신 것만 유지)
+    
+    commit=False이면 호출자가 연 트랜잭션 안에서 실행하고 커밋하지 않습니다.
+    """
+    cursor = conn.cursor()
+    
+    indexes = {row[1]: row[2] for row in cursor.execute('PRAGMA index_list(companies)')}
+    if indexes.get('idx_corp_code') == 1:
         return
     
+    cursor.execute('''
+        DELETE FROM companies
+        WHERE id NOT IN (SELECT MAX(id) FROM companies GROUP BY corp_code)
+    ''')
+    cursor.execute('DROP INDEX IF EXISTS idx_corp_code')
+    cursor.execute('CREATE UNIQUE INDEX idx_corp_code ON companies(corp_code)')
+    if commit:
+        conn.commit()
+
+def create_search_index(conn, commit: bool = True):
+    """
+    회사명(국문/영문) 검색용 FTS5 트라이그램 인덱스를 생성합니다.
+    
+    commit=False이면 호출자가 연 트랜잭션 안에서 실행하고 커밋하지 않습니다.
+    """
     cursor = conn.cursor()
     
-    # XML 파일 파싱
-    tree = ET.parse('corp.xml')
-    root = tree.getroot()
+    cursor.execute('DROP TABLE IF EXISTS companies_fts')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE companies_fts USING fts5(
+            corp_name,
+            corp_eng_name,
+            content='companies',
+            content_rowid='id',
+            tokenize='trigram'
+        )
+    ''')
+    
+    # companies 테이블 변경 시 인덱스 동기화
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS companies_fts_insert AFTER INSERT ON companies BEGIN
+            INSERT INTO companies_fts(rowid, corp_name, corp_eng_name)
+            VALUES (new.id, new.corp_name, new.corp_eng_name);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS companies_fts_delete AFTER DELETE ON companies BEGIN
+            INSERT INTO companies_fts(companies_fts, rowid, corp_name, corp_eng_name)
+            VALUES ('delete', old.id, old.corp_name, old.corp_eng_name);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS companies_fts_update AFTER UPDATE ON companies BEGIN
+            INSERT INTO companies_fts(companies_fts, rowid, corp_name, corp_eng_name)
+            VALUES ('delete', old.id, old.corp_name, old.corp_eng_name);
+            INSERT INTO companies_fts(rowid, corp_name, corp_eng_name)
+            VALUES (new.id, new.corp_name, new.corp_eng_name);
+        END
+    ''')
+    
+    # 기존 데이터로 인덱스 구성
+    cursor.execute("INSERT INTO companies_fts(companies_fts) VALUES ('rebuild')")
+    
+    if commit:
+        conn.commit()
+    print("회사명 검색 인덱스(FTS5)가 생성되었습니다.")
+
+@contextmanager
+def open_corp_code_source(source_path: str):
+    """
+    corpCode XML을 바이너리 스트림으로 엽니다.
     
-    companies_data = []
+    DART에서 내려받은 zip 파일이면 압축을 풀지 않고 안의 XML 파일을 바로 읽습니다.
+    """
+    if zipfile.is_zipfile(source_path):
+        with zipfile.ZipFile(source_path) as archive:
+            xml_names = [name for name in archive.namelist() if name.lower().endswith('.xml')]
+            if not xml_names:
+                raise ValueError(f"{source_path} 안에 XML 파일이 없습니다.")
+            with archive.open(xml_names[0]) as stream:
+                yield stream
+    else:
+        with open(source_path, 'rb') as stream:
+            yield stream
+
+def iter_companies(source_path: str = 'corp.xml') -> Iterator[Tuple[str, str, str, str, str]]:
+    """
+    corpCode XML(또는 zip)에서 (corp_code, corp_name, corp_eng_name, stock_code, modify_date)를 하나씩 읽습니다.
     
-    # 각 list 요소를 순회하며 회사 정보 추출
-    for list_item in root.findall('list'):
-        corp_code = list_item.find('corp_code').text if list_item.find('corp_code') is not None else ''
-        corp_name = list_item.find('corp_name').text if list_item.find('corp_name') is not None else ''
-        corp_eng_name = list_item.find('corp_eng_name').text if list_item.find('corp_eng_name') is not None else ''
-        stock_code = list_item.find('stock_code').text if list_item.find('stock_code') is not None else ''
-        modify_date = list_item.find('modify_date').text if list_item.find('modify_date') is not None else ''
+    전체 트리를 만들지 않고 <list> 요소 단위로 파싱한 뒤 바로 비우므로
+    파일 크기와 관계없이 메모리 사용량이 일정합니다.
+    """
+    with open_corp_code_source(source_path) as stream:
+        context = ET.iterparse(stream, events=('start', 'end'))
+        _, root = next(context)
         
-        companies_data.append((corp_code, corp_name, corp_eng_name, stock_code, modify_date))
+        for event, elem in context:
+            if event != 'end' or elem.tag != 'list':
+                continue
+            
+            values = dict.fromkeys(COMPANY_FIELDS, '')
+            for child in elem:
+                if child.tag in values:
+                    values[child.tag] = child.text or ''
+            yield tuple(values[field] for field in COMPANY_FIELDS)
+            
+            # 처리한 요소를 루트에서 떼어내 메모리 누적 방지
+            elem.clear()
+            root.clear()
+
+def insert_companies(conn, companies: Iterable[Tuple[str, str, str, str, str]],
+                     batch_size: int = INSERT_BATCH_SIZE) -> int:
+    """회사 목록을 고정 크기 배치로 나누어 삽입하고 삽입한 행 수를 반환합니다."""
+    cursor = conn.cursor()
+    companies = iter(companies)
+    total = 0
+    
+    while True:
+        batch = list(islice(companies, batch_size))
+        if not batch:
+            break
+        cursor.executemany('''
+            INSERT INTO companies (corp_code, corp_name, corp_eng_name, stock_code, modify_date)
+            VALUES (?, ?, ?, ?, ?)
+        ''', batch)
+        total += len(batch)
+    
+    return total
+
+def parse_xml_and_insert(conn, xml_path: str = 'corp.xml'):
+    """XML 파일(또는 DART corpCode zip)을 스트리밍 파싱하여 데이터베이스에 삽입합니다."""
+    if not os.path.exists(xml_path):
+        print(f"{xml_path} 파일을 찾을 수 없습니다.")
+        return
     
-    # 배치로 데이터 삽입
-    cursor.executemany('''
-        INSERT INTO companies (corp_code, corp_name, corp_eng_name, stock_code, modify_date)
-        VALUES (?, ?, ?, ?, ?)
-    ''', companies_data)
+    count = insert_companies(conn, iter_companies(xml_path))
     
     conn.commit()
-    print(f"{len(companies_data)}개의 회사 정보가 데이터베이스에 저장되었습니다.")
+    print(f"{count}개의 회사 정보가 데이터베이스에 저장되었습니다.")
+
+def sync_companies(conn, companies: Iterable[Tuple[str, str, str, str, str]]) -> Dict[str, int]:
+    """
+    회사 목록을 corp_code 기준으로 증분 반영합니다.
+    
+    modify_date가 바뀐 회사만 갱신하고, 새 회사는 추가, 목록에서 빠진 회사는 삭제합니다.
+    모든 변경은 하나의 트랜잭션으로 처리되므로 읽는 쪽은 반영 전 또는 후 상태만 보게 됩니다.
+    이전 버전 데이터베이스의 UNIQUE 인덱스/검색 인덱스 마이그레이션도 같은 트랜잭션에 포함되어
+    반영이 실패하면 함께 롤백됩니다.
+    
+    Args:
+        conn: companies 테이블이 있는 SQLite 연결
+        companies: (corp_code, corp_name, corp_eng_name, stock_code, modify_date) 목록
+    
+    Returns:
+        {'inserted': 추가 수, 'updated': 갱신 수, 'removed': 삭제 수, 'unchanged': 변경 없음 수}
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        
+        # 새 목록을 임시 테이블에 적재한 뒤 집합 연산으로 비교
+        cursor.execute('''
+            CREATE TEMP TABLE incoming (
+                corp_code TEXT PRIMARY KEY,
+                corp_name TEXT NOT NULL,
+                corp_eng_name TEXT,
+                stock_code TEXT,
+                modify_date TEXT
+            )
+        ''')
+        companies = iter(companies)
+        while True:
+            batch = list(islice(companies, INSERT_BATCH_SIZE))
+            if not batch:
+                break
+            cursor.executemany('INSERT OR REPLACE INTO temp.incoming VALUES (?, ?, ?, ?, ?)', batch)
+        
+        total = cursor.execute('SELECT COUNT(*) FROM temp.incoming').fetchone()[0]
+        if total == 0:
+            raise ValueError("반영할 회사 목록이 비어 있습니다.")
+        
+        ensure_unique_corp_code(conn, commit=False)
+        if not cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'companies_fts'").fetchone():
+            create_search_index(conn, commit=False)
+        
+        inserted = cursor.execute('''
+            SELECT COUNT(*) FROM temp.incoming i
+            WHERE NOT EXISTS (SELECT 1 FROM companies c WHERE c.corp_code = i.corp_code)
+        ''').fetchone()[0]
+        updated = cursor.execute('''
+            SELECT COUNT(*) FROM temp.incoming i
+            JOIN companies c ON c.corp_code = i.corp_code
+            WHERE i.modify_date IS NOT c.modify_date
+        ''').fetchone()[0]
+        
+        cursor.execute('''
+            DELETE FROM companies
+            WHERE corp_code NOT IN (SELECT corp_code FROM temp.incoming)
+        ''')
+        removed = cursor.rowcount
+        
+        cursor.execute('''
+            INSERT INTO companies (corp_code, corp_name, corp_eng_name, stock_code, modify_date)
+            SELECT corp_code, corp_name, corp_eng_name, stock_code, modify_date FROM temp.incoming WHERE true
+            ON CONFLICT(corp_code) DO UPDATE SET
+                corp_name = excluded.corp_name,
+                corp_eng_name = excluded.corp_eng_name,
+                stock_code = excluded.stock_code,
+                modify_date = excluded.modify_date
+            WHERE excluded.modify_date IS NOT companies.modify_date
+        ''')
+        
+        cursor.execute('DROP TABLE temp.incoming')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        cursor.execute('DROP TABLE IF EXISTS temp.incoming')
+        raise
+    
+    return {
+        'inserted': inserted,
+        'updated': updated,
+        'removed': removed,
+        'unchanged': total - inserted - updated
+    }
+
+def sync_database(db_path: str = 'companies.db', xml_path: str = 'corp.xml') -> Dict[str, int]:
+    """XML 파일(또는 zip)의 회사 목록을 기존 데이터베이스에 증분 반영합니다. (데이터베이스가 없으면 새로 생성)"""
+    if not os.path.exists(db_path):
+        conn = create_database(db_path)
+        create_search_index(conn)
+    else:
+        conn = sqlite3.connect(db_path)
+    
+    try:
+        # 반영 중에도 읽기 요청이 막히지 않도록 WAL 모드 사용
+        conn.execute('PRAGMA journal_mode=WAL')
+        return sync_companies(conn, iter_companies(xml_path))
+    finally:
+        conn.close()
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description='DART 고유번호 XML을 companies.db로 변환합니다.')
+    parser.add_argument('source', nargs='?', default='corp.xml', help='corp.xml 또는 DART corpCode zip 경로')
+    parser.add_argument('--db', default='companies.db', help='데이터베이스 경로')
+    parser.add_argument('--sync', action='store_true', help='다시 만들지 않고 변경분만 반영')
+    args = parser.parse_args()
+    
+    if args.sync:
+        print("XML 파일의 변경분을 데이터베이스에 반영하는 중...")
+        started = time.perf_counter()
+        counts = sync_database(args.db, args.source)
+        print(f"추가 {counts['inserted']}건, 갱신 {counts['updated']}건, 삭제 {counts['removed']}건, "
+              f"변경 없음 {counts['unchanged']}건 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+        return
+    
     print("XML 파일을 데이터베이스로 변환하는 중...")
     
     # 데이터베이스 생성 및 연결
-    conn = create_database()
+    conn = create_database(args.db)
     
     # XML 파싱 및 데이터 삽입
-    parse_xml_and_insert(conn)
+    parse_xml_and_insert(conn, args.source)
+    
+    # 검색 인덱스 생성
+    create_search_index(conn)
     
     # 연결 종료
     conn.close()
@@ -78,4 +316,4 @@ def main():
     print("데이터베이스 변환이 완료되었습니다!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file